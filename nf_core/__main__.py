@@ -30,6 +30,7 @@ from nf_core.commands_modules import (
 )
 from nf_core.commands_pipelines import (
     pipelines_bump_version,
+    pipelines_config,
     pipelines_create,
     pipelines_create_logo,
     pipelines_create_params_file,
@@ -37,6 +38,7 @@ from nf_core.commands_pipelines import (
     pipelines_launch,
     pipelines_lint,
     pipelines_list,
+    pipelines_nextflow_helper,
     pipelines_rocrate,
     pipelines_schema_build,
     pipelines_schema_docs,
@@ -190,7 +192,18 @@ def nf_core_cli(ctx, verbose, hide_progress, log_file):
 @nf_core_cli.group(aliases=["p", "pipeline"])
 @click.command_panel("For users", commands=["download", "create-params-file", "launch", "list"])
 @click.command_panel(
-    "For developers", commands=["bump-version", "create", "create-logo", "lint", "rocrate", "schema", "sync"]
+    "For developers",
+    commands=[
+        "bump-version",
+        "config",
+        "create",
+        "create-logo",
+        "lint",
+        "nextflow-helper",
+        "rocrate",
+        "schema",
+        "sync",
+    ],
 )
 @click.pass_context
 def pipelines(ctx):
@@ -292,6 +305,22 @@ def command_pipelines_create(ctx, name, description, author, version, force, out
     envvar="NF_CORE_LINT_OUTPUT",
     help="Print results in plain text format without Rich formatting (easier to copy). Can also be enabled with env var NF_CORE_LINT_OUTPUT.",
 )
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Number of lint tests, modules and subworkflows to lint in parallel",
+)
+@click.option(
+    "--cache",
+    is_flag=True,
+    help="Reuse the results of pipeline lint tests whose input files have not changed since the last run",
+)
+@click.option(
+    "--show-cached", is_flag=True, help="List the pipeline lint tests whose results were taken from the cache"
+)
 @click.pass_context
 def command_pipelines_lint(
     ctx,
@@ -306,12 +335,29 @@ def command_pipelines_lint(
     json,
     sort_by,
     plain_text,
+    jobs,
+    cache,
+    show_cached,
 ):
     """
     Check pipeline code against nf-core guidelines.
     """
     pipelines_lint(
-        ctx, directory, release, fix, key, show_passed, fail_ignored, fail_warned, markdown, json, sort_by, plain_text
+        ctx,
+        directory,
+        release,
+        fix,
+        key,
+        show_passed,
+        fail_ignored,
+        fail_warned,
+        markdown,
+        json,
+        sort_by,
+        plain_text,
+        jobs,
+        cache,
+        show_cached,
     )
 
 
@@ -333,7 +379,7 @@ def command_pipelines_lint(
 @click.option(
     "-x",
     "--compress",
-    type=click.Choice(["tar.gz", "tar.bz2", "zip", "none"]),
+    type=click.Choice(["tar.gz", "tar.bz2", "tar.zst", "zip", "none"]),
     help="Archive compression type",
 )
 @click.option("-f", "--force", is_flag=True, default=False, help="Overwrite existing files")
@@ -633,6 +679,41 @@ def command_pipelines_sync(
     )
 
 
+# nf-core pipelines config
+@pipelines.command("config")
+@click.pass_context
+@click.option(
+    "-d",
+    "--dir",
+    "directory",
+    type=click.Path(exists=True),
+    default=".",
+    help=r"Pipeline directory. [dim]\[default: current working directory][/]",
+)
+@click.option(
+    "--warm",
+    is_flag=True,
+    default=False,
+    help="Only fill the config cache, without printing the config. Useful at the start of CI jobs.",
+)
+def command_pipelines_config(ctx, directory, warm):
+    """
+    Show the Nextflow config of a pipeline, as used by nf-core/tools.
+    """
+    pipelines_config(ctx, directory, warm)
+
+
+# nf-core pipelines nextflow-helper
+@pipelines.command("nextflow-helper")
+@click.pass_context
+@click.option("--stop", is_flag=True, default=False, help="Stop the running Nextflow helper.")
+def command_pipelines_nextflow_helper(ctx, stop):
+    """
+    Run a helper that answers the Nextflow queries of other nf-core commands.
+    """
+    pipelines_nextflow_helper(ctx, stop)
+
+
 # nf-core pipelines bump-version
 @pipelines.command("bump-version")
 @click.pass_context
@@ -1035,6 +1116,14 @@ def command_modules_install(ctx, tool, directory, prompt, force, sha):
     default=False,
     help="Automatically update all linked modules and subworkflows without asking for confirmation",
 )
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Number of modules to update in parallel",
+)
 def command_modules_update(
     ctx,
     tool,
@@ -1047,11 +1136,14 @@ def command_modules_update(
     save_diff,
     update_deps,
     limit_output,
+    jobs,
 ):
     """
     Update DSL2 modules within a pipeline.
     """
-    modules_update(ctx, tool, directory, force, prompt, sha, install_all, preview, save_diff, update_deps, limit_output)
+    modules_update(
+        ctx, tool, directory, force, prompt, sha, install_all, preview, save_diff, update_deps, limit_output, jobs
+    )
 
 
 # nf-core modules patch
@@ -1327,14 +1419,35 @@ def command_modules_test(ctx, tool, directory, no_prompts, update, once, profile
     envvar="NF_CORE_LINT_OUTPUT",
     help="Print results in plain text format without Rich formatting (easier to copy). Can also be enabled with env var NF_CORE_LINT_OUTPUT.",
 )
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Number of modules to lint in parallel",
+)
 def command_modules_lint(
-    ctx, tool, directory, registry, key, all, fail_warned, local, passed, sort_by, fix_version, fix, plain_text
+    ctx, tool, directory, registry, key, all, fail_warned, local, passed, sort_by, fix_version, fix, plain_text, jobs
 ):
     """
     Lint one or more modules in a directory.
     """
     modules_lint(
-        ctx, tool, directory, registry, key, all, fail_warned, local, passed, sort_by, fix_version, fix, plain_text
+        ctx,
+        tool,
+        directory,
+        registry,
+        key,
+        all,
+        fail_warned,
+        local,
+        passed,
+        sort_by,
+        fix_version,
+        fix,
+        plain_text,
+        jobs,
     )
 
 
@@ -1614,14 +1727,22 @@ def command_subworkflows_list_local(ctx, keywords, json, directory):  # pylint:
     envvar="NF_CORE_LINT_OUTPUT",
     help="Print results in plain text format without Rich formatting (easier to copy). Can also be enabled with env var NF_CORE_LINT_OUTPUT.",
 )
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Number of subworkflows to lint in parallel",
+)
 def command_subworkflows_lint(
-    ctx, subworkflow, directory, registry, key, all, fail_warned, local, passed, sort_by, fix, plain_text
+    ctx, subworkflow, directory, registry, key, all, fail_warned, local, passed, sort_by, fix, plain_text, jobs
 ):
     """
     Lint one or more subworkflows in a directory.
     """
     subworkflows_lint(
-        ctx, subworkflow, directory, registry, key, all, fail_warned, local, passed, sort_by, fix, plain_text
+        ctx, subworkflow, directory, registry, key, all, fail_warned, local, passed, sort_by, fix, plain_text, jobs
     )
 
 
@@ -1840,6 +1961,14 @@ def command_subworkflows_remove(ctx, directory, subworkflow):
     default=False,
     help="Automatically update all linked modules and subworkflows without asking for confirmation",
 )
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Number of subworkflows to update in parallel",
+)
 def command_subworkflows_update(
     ctx,
     subworkflow,
@@ -1852,12 +1981,24 @@ def command_subworkflows_update(
     save_diff,
     update_deps,
     limit_output,
+    jobs,
 ):
     """
     Update DSL2 subworkflow within a pipeline.
     """
     subworkflows_update(
-        ctx, subworkflow, directory, force, prompt, sha, install_all, preview, save_diff, update_deps, limit_output
+        ctx,
+        subworkflow,
+        directory,
+        force,
+        prompt,
+        sha,
+        install_all,
+        preview,
+        save_diff,
+        update_deps,
+        limit_output,
+        jobs,
     )
 
 
@@ -2311,7 +2452,7 @@ def command_create_params_file(pipeline, revision, output, force, show_hidden):
 @click.option(
     "-x",
     "--compress",
-    type=click.Choice(["tar.gz", "tar.bz2", "zip", "none"]),
+    type=click.Choice(["tar.gz", "tar.bz2", "tar.zst", "zip", "none"]),
     help="Archive compression type",
 )
 @click.option("-f", "--force", is_flag=True, default=False, help="Overwrite existing files")
@@ -87,6 +87,7 @@ def modules_update(
     save_diff,
     update_deps,
     limit_output,
+    jobs=1,
 ):
     """
     Update DSL2 modules within a pipeline.
@@ -109,6 +110,7 @@ def modules_update(
             ctx.obj["modules_repo_branch"],
             ctx.obj["modules_repo_no_pull"],
             limit_output,
+            jobs,
         )
         exit_status = module_install.update(tool)
         if not exit_status and install_all:
@@ -262,7 +264,7 @@ def modules_test(ctx, tool, directory, no_prompts, update, once, profile, migrat
 
 
 def modules_lint(
-    ctx, tool, directory, registry, key, all, fail_warned, local, passed, sort_by, fix_version, fix, plain_text
+    ctx, tool, directory, registry, key, all, fail_warned, local, passed, sort_by, fix_version, fix, plain_text, jobs=1
 ):
     """
     Lint one or more modules in a directory.
@@ -286,6 +288,7 @@ def modules_lint(
             branch=ctx.obj["modules_repo_branch"],
             no_pull=ctx.obj["modules_repo_no_pull"],
             hide_progress=ctx.obj["hide_progress"],
+            jobs=jobs,
         )
         module_lint.lint(
             module=tool,
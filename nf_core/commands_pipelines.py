@@ -108,6 +108,9 @@ def pipelines_lint(
     json,
     sort_by,
     plain_text,
+    jobs=1,
+    cache=False,
+    show_cached=False,
 ):
     """
     Check pipeline code against nf-core guidelines.
@@ -144,6 +147,9 @@ def pipelines_lint(
             json,
             ctx.obj["hide_progress"],
             plain_text,
+            jobs,
+            cache,
+            show_cached,
         )
         swf_failed = 0
         module_failed = 0
@@ -339,6 +345,63 @@ def pipelines_sync(
         sys.exit(1)
 
 
+# nf-core pipelines config
+def pipelines_config(ctx, directory, warm):
+    """
+    Show the Nextflow config of a pipeline, as used by nf-core/tools.
+
+    Runs [cyan i]nextflow config[/] on the pipeline, unless the result is already cached.
+    The cache is invalidated when [cyan i]nextflow.config[/], [cyan i]main.nf[/] or any
+    of the included config files change.
+    """
+    from nf_core.utils import fetch_wf_config, is_pipeline_directory
+
+    try:
+        is_pipeline_directory(directory)
+    except UserWarning as e:
+        log.error(e)
+        sys.exit(1)
+
+    config = fetch_wf_config(Path(directory))
+    if warm:
+        log.info(f"Config cache is ready for pipeline: [magenta]{directory}")
+    else:
+        for key, value in config.items():
+            stdout.print(f"{key} = {value}", markup=False, highlight=False)
+
+
+# nf-core pipelines nextflow-helper
+def pipelines_nextflow_helper(ctx, stop):
+    """
+    Run a helper that answers the Nextflow queries of other nf-core commands.
+
+    Every Nextflow command has to start a Java virtual machine, which takes several seconds.
+    While the helper runs, nf-core commands send their [cyan i]nextflow -version[/],
+    [cyan i]nextflow config[/] and [cyan i]nextflow inspect[/] calls to it, and it reuses
+    the output until the Nextflow files of the pipeline change.
+    Start it in the background at the beginning of a CI job, for example. Without
+    the helper, nf-core commands run Nextflow themselves.
+    """
+    from nf_core.nextflow_helper import NextflowHelper, stop_helper
+
+    if stop:
+        if stop_helper():
+            log.info("Stopped the Nextflow helper")
+        else:
+            log.info("The Nextflow helper is not running")
+        return
+
+    try:
+        helper = NextflowHelper()
+    except UserWarning as e:
+        log.error(e)
+        sys.exit(1)
+    try:
+        helper.serve()
+    except KeyboardInterrupt:
+        log.info("Stopped the Nextflow helper")
+
+
 # nf-core pipelines create-logo
 def pipelines_create_logo(logo_text, directory, name, theme, width, format, force):
     """
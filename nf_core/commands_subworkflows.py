@@ -105,7 +105,7 @@ def subworkflows_list_local(ctx, keywords, json, directory):  # pylint: disable=
 
 
 def subworkflows_lint(
-    ctx, subworkflow, directory, registry, key, all, fail_warned, local, passed, sort_by, fix, plain_text
+    ctx, subworkflow, directory, registry, key, all, fail_warned, local, passed, sort_by, fix, plain_text, jobs=1
 ):
     """
     Lint one or more subworkflows in a directory.
@@ -129,6 +129,7 @@ def subworkflows_lint(
             branch=ctx.obj["modules_repo_branch"],
             no_pull=ctx.obj["modules_repo_no_pull"],
             hide_progress=ctx.obj["hide_progress"],
+            jobs=jobs,
         )
         subworkflow_lint.lint(
             subworkflow=subworkflow,
@@ -236,6 +237,7 @@ def subworkflows_update(
     save_diff,
     update_deps,
     limit_output,
+    jobs=1,
 ):
     """
     Update DSL2 subworkflow within a pipeline.
@@ -258,6 +260,7 @@ def subworkflows_update(
             ctx.obj["modules_repo_branch"],
             ctx.obj["modules_repo_no_pull"],
             limit_output,
+            jobs,
         )
         exit_status = subworkflow_install.update(subworkflow)
         if not exit_status and install_all:
@@ -21,7 +21,7 @@ import nf_core
 import nf_core.utils
 from nf_core.components.components_command import ComponentCommand
 from nf_core.components.components_utils import get_biotools_id, get_biotools_response, get_channel_info_from_biotools
-from nf_core.pipelines.lint_utils import run_prettier_on_file
+from nf_core.pipelines.lint_utils import deferred_prettier, run_prettier_on_file
 
 log = logging.getLogger(__name__)
 
@@ -186,15 +186,17 @@ class ComponentCreate(ComponentCommand):
             # Generate meta.yml inputs and outputs
             self.generate_meta_yml_file()
 
-        if self.migrate_pytest:
-            self._copy_old_files(component_old_path)
-            log.info("Migrate pytest tests: Copied original module files to new module")
-            shutil.rmtree(component_old_path)
-            self._print_and_delete_pytest_files()
-
         new_files = [str(path) for path in self.file_paths.values()]
 
-        run_prettier_on_file(new_files)
+        # Format the new files and the changed pytest config in one prettier run
+        with deferred_prettier():
+            if self.migrate_pytest:
+                self._copy_old_files(component_old_path)
+                log.info("Migrate pytest tests: Copied original module files to new module")
+                shutil.rmtree(component_old_path)
+                self._print_and_delete_pytest_files()
+
+            run_prettier_on_file(new_files)
 
         log.info("Created following files:\n  " + "\n  ".join(new_files))
         return True
@@ -0,0 +1,99 @@
+"""Include relationships between the subworkflows and modules of a pipeline.
+
+Subworkflows include modules and other subworkflows in their ``main.nf`` file.
+Parsing these includes can be expensive, as includes from other remotes need
+the ``org_path`` of that remote, so a graph parses the includes of each
+subworkflow once per content of its files.
+"""
+
+import hashlib
+import logging
+from collections.abc import Iterator
+from pathlib import Path
+
+from nf_core.components.components_utils import get_components_to_install
+
+log = logging.getLogger(__name__)
+
+# Files of a subworkflow that define its includes
+INCLUDE_FILES = ["main.nf", "meta.yml"]
+
+
+class ComponentGraph:
+    """The includes of the subworkflows in a pipeline, or in a clone of a modules repository.
+
+    The includes are read from the subworkflow files when they are needed, and are not stored
+    as edges, as installs change the files. The reverse relationships are stored in the
+    'installed_by' entries of 'modules.json'.
+
+    Args:
+        directory (Path): The pipeline directory, or the modules repository directory
+    """
+
+    def __init__(self, directory: str | Path) -> None:
+        self.directory = Path(directory)
+        # Includes of subworkflows, by the hash of the subworkflow files
+        self._parsed_includes: dict[str, tuple[list[dict[str, str]], list[dict[str, str]]]] = {}
+
+    def __repr__(self) -> str:
+        return f"<ComponentGraph of {self.directory}>"
+
+    def includes(self, subworkflow_dir: str | Path) -> tuple[list[dict[str, str]], list[dict[str, str]]]:
+        """
+        Get the modules and subworkflows included by a subworkflow.
+
+        Args:
+            subworkflow_dir (Path): The directory of the subworkflow
+
+        Returns:
+            (list, list): The included modules and subworkflows, as returned by `get_components_to_install`
+        """
+        content_hash = hashlib.sha256()
+        for fn in INCLUDE_FILES:
+            try:
+                content_hash.update(Path(subworkflow_dir, fn).read_bytes())
+            except FileNotFoundError:
+                if fn == "main.nf":
+                    raise
+            content_hash.update(b"\0")
+        key = content_hash.hexdigest()
+        if key not in self._parsed_includes:
+            self._parsed_includes[key] = get_components_to_install(subworkflow_dir)
+        else:
+            log.debug(f"Using the parsed includes of '{subworkflow_dir}'")
+        modules, subworkflows = self._parsed_includes[key]
+        # Callers add missing details to the includes, don't let them change the parsed ones
+        return [dict(module) for module in modules], [dict(subworkflow) for subworkflow in subworkflows]
+
+    def walk_includes(self, subworkflow_dir: str | Path) -> Iterator[tuple[Path, str, dict[str, str]]]:
+        """
+        Walk the includes of a subworkflow and of all subworkflows that it includes, directly or indirectly.
+
+        Every subworkflow comes before the components that it includes, and the includes of
+        each subworkflow are walked once. A subworkflow is only read after its own include
+        has been yielded, so the walk can be used to install the components that it yields.
+
+        Args:
+            subworkflow_dir (Path): The directory of the subworkflow
+
+        Yields:
+            (Path, str, dict): The directory of the including subworkflow, the component type
+                and the include, as returned by `get_components_to_install`
+        """
+        pending = [Path(subworkflow_dir)]
+        walked = set()
+        while pending:
+            current_dir = pending.pop(0)
+            if current_dir in walked:
+                continue
+            walked.add(current_dir)
+            modules, subworkflows = self.includes(current_dir)
+            for subworkflow in subworkflows:
+                yield current_dir, "subworkflows", subworkflow
+                org_path = subworkflow.get("org_path", current_dir.parent.name)
+                included_dir = Path(self.directory, "subworkflows", org_path, subworkflow["name"])
+                # Skip subworkflows that could not be installed
+                if Path(included_dir, "main.nf").is_file():
+                    pending.append(included_dir)
+            for module in modules:
+                yield current_dir, "modules", module
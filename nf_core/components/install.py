@@ -13,13 +13,11 @@ import nf_core.components
 import nf_core.modules.modules_utils
 import nf_core.utils
 from nf_core.components.components_command import ComponentCommand
-from nf_core.components.components_utils import (
-    get_components_to_install,
-    prompt_component_version_sha,
-)
+from nf_core.components.components_utils import prompt_component_version_sha
 from nf_core.components.constants import (
     NF_CORE_MODULES_NAME,
 )
+from nf_core.components.dependency_graph import ComponentGraph
 from nf_core.modules.modules_json import ModulesJson
 from nf_core.modules.modules_repo import ModulesRepo
 
@@ -50,6 +48,8 @@ class ComponentInstall(ComponentCommand):
             self.installed_by = installed_by
         else:
             self.installed_by = [self.component_type]
+        # Set while the includes of a subworkflow are installed
+        self.installing_includes = False
 
     def install(self, component: str | dict[str, str], silent: bool = False) -> bool:
         if isinstance(component, dict):
@@ -169,7 +169,7 @@ class ComponentInstall(ComponentCommand):
 
         if not silent:
             modules_json.load()
-            modules_json.dump(run_prettier=True)
+            modules_json.dump()
             # Print include statement
             component_name = "_".join(component.upper().split("/"))
             log.info(f"Use the following statement to include this {self.component_type[:-1]}:")
@@ -193,24 +193,29 @@ class ComponentInstall(ComponentCommand):
     def install_included_components(self, subworkflow_dir):
         """
         Install included modules and subworkflows
+
+        The includes of nested subworkflows are installed in the same walk over the dependency graph,
+        so the installs of included subworkflows don't install their own includes.
         """
+        if self.installing_includes:
+            return
         ini_modules_repo = self.modules_repo
-        modules_to_install, subworkflows_to_install = get_components_to_install(subworkflow_dir)
-        for s_install in subworkflows_to_install:
-            original_installed = self.installed_by
-            self.installed_by = [Path(subworkflow_dir).parts[-1]]
-            self.install(s_install, silent=True)
-            self.installed_by = original_installed
-        for m_install in modules_to_install:
-            original_component_type = self.component_type
-            self.component_type = "modules"
-            original_installed = self.installed_by
-            self.installed_by = [Path(subworkflow_dir).parts[-1]]
-            self.install(m_install, silent=True)
+        original_component_type = self.component_type
+        original_installed = self.installed_by
+        self.installing_includes = True
+        try:
+            for including_dir, component_type, component in ComponentGraph(self.directory).walk_includes(
+                subworkflow_dir
+            ):
+                self.component_type = component_type
+                self.installed_by = [including_dir.name]
+                self.install(component, silent=True)
+        finally:
+            self.installing_includes = False
             self.component_type = original_component_type
             self.installed_by = original_installed
-        # self.install will have modified self.modules_repo. Restore its original value
-        self.modules_repo = ini_modules_repo
+            # self.install will have modified self.modules_repo. Restore its original value
+            self.modules_repo = ini_modules_repo
 
     def collect_and_verify_name(
         self, component: str | None, modules_repo: "nf_core.modules.modules_repo.ModulesRepo"
@@ -3,13 +3,16 @@ Code for linting modules and subworkflows in the nf-core/modules repository and
 in nf-core pipelines
 """
 
+import concurrent.futures
 import logging
 import operator
 import os
+from collections.abc import Callable
 from pathlib import Path
 
 import rich.box
 import rich.panel
+import rich.progress
 import rich.repr
 from rich.markdown import Markdown
 from rich.table import Table
@@ -64,6 +67,7 @@ class ComponentLint(ComponentCommand):
         no_pull: bool = False,
         registry: str | None = None,
         hide_progress: bool = False,
+        jobs: int = 1,
     ):
         super().__init__(
             component_type,
@@ -76,6 +80,7 @@ class ComponentLint(ComponentCommand):
 
         self.fail_warned = fail_warned
         self.fix = fix
+        self.jobs = jobs
         self.passed: list[LintResult] = []
         self.warned: list[LintResult] = []
         self.failed: list[LintResult] = []
@@ -224,6 +229,38 @@ class ComponentLint(ComponentCommand):
         # If -k supplied, only run these tests
         self.lint_tests = [k for k in self.lint_tests if k in key]
 
+    def _lint_components_parallel(
+        self,
+        components: list[NFCoreComponent],
+        lint_component: Callable[[NFCoreComponent], None],
+        progress_bar: rich.progress.Progress,
+        lint_progress: rich.progress.TaskID,
+    ) -> None:
+        """
+        Lint a list of components on a thread pool of ``self.jobs`` workers.
+
+        Results are reordered afterwards, so that they are in the same order
+        as when the components are linted one after another.
+
+        Args:
+            components ([NFCoreComponent]): A list of component objects
+            lint_component (callable): Function linting a single component
+            progress_bar (rich.progress.Progress): Progress bar to advance for each linted component
+            lint_progress (rich.progress.TaskID): Task of the progress bar to advance
+        """
+        n_results = {"passed": len(self.passed), "warned": len(self.warned), "failed": len(self.failed)}
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.jobs) as pool:
+            future_components = {pool.submit(lint_component, component): component for component in components}
+            for future in concurrent.futures.as_completed(future_components):
+                progress_bar.update(lint_progress, advance=1, test_name=future_components[future].component_name)
+                future.result()
+
+        # Each component adds its results in one go, so a stable sort restores the serial order
+        component_order = {id(component): idx for idx, component in enumerate(components)}
+        for results_type, n in n_results.items():
+            results: list[LintResult] = getattr(self, results_type)
+            results[n:] = sorted(results[n:], key=lambda result: component_order[id(result.component)])
+
     def _print_results(self, show_passed=False, sort_by="test", plain_text=False):
         """Print linting results to the command line.
 
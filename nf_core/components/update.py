@@ -1,7 +1,9 @@
+import concurrent.futures
 import logging
 import os
 import shutil
 import tempfile
+from collections.abc import Iterable
 from pathlib import Path
 
 import questionary
@@ -10,10 +12,8 @@ import nf_core.modules.modules_utils
 import nf_core.utils
 from nf_core.components.components_command import ComponentCommand
 from nf_core.components.components_differ import ComponentsDiffer
-from nf_core.components.components_utils import (
-    get_components_to_install,
-    prompt_component_version_sha,
-)
+from nf_core.components.components_utils import prompt_component_version_sha
+from nf_core.components.dependency_graph import ComponentGraph
 from nf_core.components.install import ComponentInstall
 from nf_core.components.remove import ComponentRemove
 from nf_core.modules.modules_json import ModulesJson
@@ -39,6 +39,7 @@ class ComponentUpdate(ComponentCommand):
         branch=None,
         no_pull=False,
         limit_output=False,
+        jobs=1,
     ):
         super().__init__(component_type, pipeline_dir, remote_url, branch, no_pull)
         self.current_remote = ModulesRepo(remote_url, branch)
@@ -50,11 +51,13 @@ class ComponentUpdate(ComponentCommand):
         self.show_diff = show_diff
         self.save_diff_fn = save_diff_fn
         self.limit_output = limit_output
+        self.jobs = jobs
         self.update_deps = update_deps
         self.component = None
         self.update_config = None
         self.modules_json = ModulesJson(self.directory)
         self.branch = branch
+        self.component_graph = ComponentGraph(self.directory)
 
     def _parameter_checks(self):
         """Checks the compatibility of the supplied parameters.
@@ -158,61 +161,63 @@ class ComponentUpdate(ComponentCommand):
         if self.save_diff_fn:  # True or a string
             self.setup_diff_file(check_diff_exist)
 
-        # Loop through all components to be updated
+        for modules_repo, component, sha, patch_relpath in components_info:
+            if component is not None and patch_relpath is not None:
+                # Updating the paths in old patch files can write 'modules.json', so it is not done in parallel
+                self.check_patch_paths(Path(self.directory, patch_relpath), component)
+
+        # Resolve the new versions and install them into temporary directories,
+        # which does not change the pipeline, so it can be done for several components at the same time
+        prepared_updates: Iterable[dict | None]
+        if self.jobs > 1 and not self.prompt and len(components_info) > 1:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=self.jobs) as pool:
+                prepared_updates = list(pool.map(lambda info: self.prepare_component_update(*info), components_info))
+        else:
+            prepared_updates = (self.prepare_component_update(*info) for info in components_info)
+
+        # Loop through all components to be updated in order
         # and do the requested action on them
         exit_value = True
         all_patches_successful = True
-        for modules_repo, component, sha, patch_relpath in components_info:
-            if component is None:
+        for (modules_repo, component, sha, patch_relpath), prepared in zip(components_info, prepared_updates):
+            if prepared is None:
                 # The entry from .nf-core.yml is set to false, skip update of this component
                 continue
             component_fullname = str(Path(self.component_type, modules_repo.repo_path, component))
             # Are we updating the files in place or not?
             dry_run = self.show_diff or self.save_diff_fn
 
-            current_version = self.modules_json.get_component_version(
-                self.component_type, component, modules_repo.remote_url, modules_repo.repo_path
-            )
-
-            # Set the temporary installation folder
-            install_tmp_dir = Path(tempfile.mkdtemp())
+            current_version = prepared["current_version"]
+            version = prepared["version"]
+            install_tmp_dir = prepared["install_tmp_dir"]
             component_install_dir = install_tmp_dir / component
 
             # Compute the component directory
             component_dir = Path(self.directory, self.component_type, modules_repo.repo_path, component)
 
-            if sha is not None:
-                version = sha
-            elif self.prompt:
-                version = prompt_component_version_sha(
-                    component, self.component_type, modules_repo=modules_repo, installed_sha=current_version
-                )
-            else:
-                version = modules_repo.get_latest_component_version(component, self.component_type)
-
-            if current_version is not None and not self.force:
-                if current_version == version:
-                    if self.sha or self.prompt:
-                        log.info(f"'{component_fullname}' is already installed at {version}")
-                    else:
-                        log.info(f"'{component_fullname}' is already up to date")
-                    continue
+            if prepared["up_to_date"]:
+                if self.sha or self.prompt:
+                    log.info(f"'{component_fullname}' is already installed at {version}")
+                else:
+                    log.info(f"'{component_fullname}' is already up to date")
+                continue
 
-            # Download component files
-            if not self.install_component_files(component, version, modules_repo, str(install_tmp_dir)):
+            if not prepared["installed"]:
                 exit_value = False
                 continue
 
             if patch_relpath is not None:
-                patch_successful = self.try_apply_patch(
-                    component,
-                    modules_repo.repo_path,
-                    patch_relpath,
-                    component_dir,
-                    component_install_dir,
-                    write_file=False,
-                )
+                patch_successful = prepared["patch_successful"]
                 if patch_successful:
+                    # Add the patch file to the modules.json file
+                    self.modules_json.add_patch_entry(
+                        self.component_type,
+                        component,
+                        self.modules_repo.remote_url,
+                        modules_repo.repo_path,
+                        patch_relpath,
+                        write_file=False,
+                    )
                     log.info(f"{self.component_type[:-1].title()} '{component_fullname}' patched successfully")
                 else:
                     log.warning(
@@ -337,14 +342,75 @@ class ComponentUpdate(ComponentCommand):
         elif not all_patches_successful and not silent:
             log.info(f"Updates complete. Please apply failed patch{plural_es(components_info)} manually.")
             self.modules_json.load()
-            self.modules_json.dump(run_prettier=True)
+            self.modules_json.dump()
         elif not silent:
             log.info("Updates complete :sparkles:")
             self.modules_json.load()
-            self.modules_json.dump(run_prettier=True)
+            self.modules_json.dump()
 
         return exit_value
 
+    def prepare_component_update(self, modules_repo, component, sha, patch_relpath):
+        """Resolves the new version of a module/subworkflow and installs it into a temporary directory.
+
+        The patch of the component is applied to the new files, but neither the pipeline
+        nor 'modules.json' are changed, so this can be run for several components at the same time.
+
+        Args:
+            modules_repo (ModulesRepo): The repository to update the component from
+            component (str): The name of the module/subworkflow, ``None`` if it should not be updated
+            sha (str): The version to update to, or ``None`` for the latest version
+            patch_relpath (Path | str): The path to the patch file in the pipeline, if there is one
+
+        Returns:
+            (dict | None): The current and new versions, the temporary installation directory,
+                whether the component is already up to date or could not be installed,
+                and whether the patch was applied. ``None`` if the component should not be updated.
+        """
+        if component is None:
+            return None
+
+        current_version = self.modules_json.get_component_version(
+            self.component_type, component, modules_repo.remote_url, modules_repo.repo_path
+        )
+        if sha is not None:
+            version = sha
+        elif self.prompt:
+            version = prompt_component_version_sha(
+                component, self.component_type, modules_repo=modules_repo, installed_sha=current_version
+            )
+        else:
+            version = modules_repo.get_latest_component_version(component, self.component_type)
+
+        # Set the temporary installation folder
+        install_tmp_dir = Path(tempfile.mkdtemp())
+        prepared = {
+            "current_version": current_version,
+            "version": version,
+            "install_tmp_dir": install_tmp_dir,
+            "up_to_date": current_version is not None and not self.force and current_version == version,
+            "installed": False,
+            "patch_successful": None,
+        }
+        if prepared["up_to_date"]:
+            return prepared
+
+        # Download component files
+        if not self.install_component_files(component, version, modules_repo, str(install_tmp_dir)):
+            return prepared
+        prepared["installed"] = True
+
+        if patch_relpath is not None:
+            prepared["patch_successful"] = self.try_apply_patch(
+                component,
+                modules_repo.repo_path,
+                patch_relpath,
+                Path(self.directory, self.component_type, modules_repo.repo_path, component),
+                install_tmp_dir / component,
+                add_patch_entry=False,
+            )
+        return prepared
+
     def get_single_component_info(self, component):
         """Collects the modules repository, version and sha for a component.
 
@@ -794,7 +860,14 @@ class ComponentUpdate(ComponentCommand):
         log.debug(f"Updating {self.component_type[:-1]} '{component}' to {new_version} from {repo_path}")
 
     def try_apply_patch(
-        self, component, repo_path, patch_relpath, component_dir, component_install_dir, write_file=True
+        self,
+        component,
+        repo_path,
+        patch_relpath,
+        component_dir,
+        component_install_dir,
+        write_file=True,
+        add_patch_entry=True,
     ):
         """
         Try applying a patch file to the new module/subworkflow files
@@ -807,6 +880,8 @@ class ComponentUpdate(ComponentCommand):
             component_dir (Path | str): The module/subworkflow directory in the pipeline
             component_install_dir (Path | str): The directory where the new component
                                             file have been installed
+            write_file (bool): Whether to write 'modules.json' after adding the patch entry
+            add_patch_entry (bool): Whether to add the patch entry to 'modules.json'
 
         Returns:
             (bool): Whether the patch application was successful
@@ -865,14 +940,15 @@ class ComponentUpdate(ComponentCommand):
         shutil.copytree(temp_component_dir, component_install_dir)
 
         # Add the patch file to the modules.json file
-        self.modules_json.add_patch_entry(
-            self.component_type,
-            component,
-            self.modules_repo.remote_url,
-            repo_path,
-            patch_relpath,
-            write_file=write_file,
-        )
+        if add_patch_entry:
+            self.modules_json.add_patch_entry(
+                self.component_type,
+                component,
+                self.modules_repo.remote_url,
+                repo_path,
+                patch_relpath,
+                write_file=write_file,
+            )
 
         return True
 
@@ -967,7 +1043,7 @@ class ComponentUpdate(ComponentCommand):
             org_path = self.current_remote.repo_path
 
             subworkflow_directory = Path(self.directory, self.component_type, org_path, component)
-            included_modules, included_subworkflows = get_components_to_install(subworkflow_directory)
+            included_modules, included_subworkflows = self.component_graph.includes(subworkflow_directory)
             # If a module/subworkflow has been removed from the subworkflow
             for module in modules_to_update:
                 module_name = module["name"]
@@ -71,6 +71,7 @@ class ModuleLint(ComponentLint):
         no_pull: bool = False,
         registry: str | None = None,
         hide_progress: bool = False,
+        jobs: int = 1,
     ):
         super().__init__(
             component_type="modules",
@@ -82,6 +83,7 @@ class ModuleLint(ComponentLint):
             no_pull=no_pull,
             registry=registry,
             hide_progress=hide_progress,
+            jobs=jobs,
         )
         self.meta_schema: Mapping[str, Any] | None = None
 
@@ -211,9 +213,17 @@ class ModuleLint(ComponentLint):
                 test_name=modules[0].component_name,
             )
 
-            for mod in modules:
-                progress_bar.update(lint_progress, advance=1, test_name=mod.component_name)
-                self.lint_module(mod, progress_bar, local=local, fix_version=fix_version)
+            if self.jobs > 1:
+                self._lint_components_parallel(
+                    modules,
+                    lambda mod: self.lint_module(mod, progress_bar, local=local, fix_version=fix_version),
+                    progress_bar,
+                    lint_progress,
+                )
+            else:
+                for mod in modules:
+                    progress_bar.update(lint_progress, advance=1, test_name=mod.component_name)
+                    self.lint_module(mod, progress_bar, local=local, fix_version=fix_version)
 
     def lint_module(
         self,
@@ -312,8 +322,10 @@ class ModuleLint(ComponentLint):
         if self.modules_repo.local_repo_dir is None:
             raise LookupError("Local module cache not found")
 
-        with open(Path(self.modules_repo.local_repo_dir, "modules/meta-schema.json")) as fh:
-            self.meta_schema = json.load(fh)
+        meta_schema = self.modules_repo.read_file("modules/meta-schema.json")
+        if meta_schema is None:
+            raise LookupError(f"'modules/meta-schema.json' not found in '{self.modules_repo.remote_url}'")
+        self.meta_schema = json.loads(meta_schema)
         return self.meta_schema
 
     def update_meta_yml_file(self, mod):
@@ -697,4 +709,4 @@ class ModuleLint(ComponentLint):
         with open(mod.meta_yml, "w") as fh:
             log.info(f"Updating {mod.meta_yml}")
             yaml.dump(corrected_meta_yml, fh)
-            run_prettier_on_file(fh.name)
+            run_prettier_on_file(fh.name, defer=False)
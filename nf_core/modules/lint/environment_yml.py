@@ -101,8 +101,12 @@ def environment_yml(module_lint_object: ComponentLint, module: NFCoreComponent,
     if env_yml:
         valid_env_yml = False
         try:
-            with open(Path(module_lint_object.modules_repo.local_repo_dir, "modules/environment-schema.json")) as fh:
-                schema = json.load(fh)
+            schema_contents = module_lint_object.modules_repo.read_file("modules/environment-schema.json")
+            if schema_contents is None:
+                raise LookupError(
+                    f"'modules/environment-schema.json' not found in '{module_lint_object.modules_repo.remote_url}'"
+                )
+            schema = json.loads(schema_contents)
             validators.validate(instance=env_yml, schema=schema)
             module.passed.append(
                 (
@@ -39,10 +39,18 @@ def module_version(module_lint_object: "nf_core.modules.lint.ModuleLint", module
         module.branch = module_lint_object.modules_json.get_component_branch(
             "modules", module.component_name, module.repo_url, module.org
         )
-        modules_repo = nf_core.modules.modules_repo.ModulesRepo(remote_url=module.repo_url, branch=module.branch)
+        if (module.repo_url, module.branch) == (
+            module_lint_object.modules_repo.remote_url,
+            module_lint_object.modules_repo.branch,
+        ):
+            modules_repo = module_lint_object.modules_repo
+        else:
+            modules_repo = nf_core.modules.modules_repo.ModulesRepo(remote_url=module.repo_url, branch=module.branch)
 
-        module_git_log = list(modules_repo.get_component_git_log(module.component_name, "modules"))
-        if version == module_git_log[0]["git_sha"]:
+        latest_version = modules_repo.get_latest_component_version(module.component_name, "modules")
+        if latest_version is None:
+            raise UserWarning(f"Could not find the latest version of '{module.component_name}'")
+        if version == latest_version:
             module.passed.append(
                 ("module_version", "module_version", "Module is the latest version", module.component_dir)
             )
@@ -1,10 +1,12 @@
 import copy
 import datetime
+import hashlib
 import json
 import logging
 import os
 import shutil
 import tempfile
+import time
 from pathlib import Path
 
 import git
@@ -14,15 +16,18 @@ from git.exc import GitCommandError
 from typing_extensions import NotRequired, TypedDict  # for py<3.11
 
 import nf_core.utils
-from nf_core.components.components_utils import get_components_to_install
 from nf_core.components.constants import NF_CORE_MODULES_NAME, NF_CORE_MODULES_REMOTE
+from nf_core.components.dependency_graph import ComponentGraph
 from nf_core.modules.modules_repo import ModulesRepo
-from nf_core.pipelines.lint_utils import dump_json_with_prettier
+from nf_core.pipelines.lint_utils import format_json_like_prettier
 
 from ..components.components_differ import ComponentsDiffer
 
 log = logging.getLogger(__name__)
 
+# Files changed less than this many seconds before a check may change again without a new modification time
+RACY_CHANGE_SECONDS = 2
+
 
 class ModulesJsonModuleEntry(TypedDict):
     branch: str
@@ -37,9 +42,16 @@ class ModulesJsonType(TypedDict):
     repos: dict[str, dict[str, dict[str, dict[str, ModulesJsonModuleEntry]]]]
 
 
+# Key of a module/subworkflow entry: (component_type, repo_url, install_dir, name)
+ComponentKey = tuple[str, str, str, str]
+
+
 class ModulesJson:
     """
     An object for handling a 'modules.json' file in a pipeline
+
+    Lookups of single modules/subworkflows go through an index of the entries, which is built
+    from the loaded 'modules.json' when first needed and dropped whenever the entries are changed.
     """
 
     def __init__(self, pipeline_dir: str | Path) -> None:
@@ -53,7 +65,10 @@ class ModulesJson:
         self.modules_dir = self.directory / "modules"
         self.subworkflows_dir = self.directory / "subworkflows"
         self.modules_json_path = self.directory / "modules.json"
-        self.modules_json: ModulesJsonType | None = None
+        self._modules_json: ModulesJsonType | None = None
+        self._entries: dict[ComponentKey, ModulesJsonModuleEntry] | None = None
+        self._entries_by_name: dict[tuple[str, str], list[ComponentKey]] = {}
+        self._installed_by: dict[str, list[ComponentKey]] = {}
         self.pipeline_modules = None
         self.pipeline_subworkflows = None
         self.pipeline_components: dict[str, list[tuple[str, str]]] | None = None
@@ -66,6 +81,61 @@ class ModulesJson:
     def __repr__(self):
         return self.__str__()
 
+    @property
+    def modules_json(self) -> ModulesJsonType | None:
+        """
+        The contents of the 'modules.json' file
+        """
+        return self._modules_json
+
+    @modules_json.setter
+    def modules_json(self, modules_json: ModulesJsonType | None) -> None:
+        self._modules_json = modules_json
+        self.invalidate_index()
+
+    def invalidate_index(self) -> None:
+        """
+        Drops the index of the module/subworkflow entries, so that it is rebuilt on the next lookup.
+        Needs to be called after adding or removing entries, or changing their 'installed_by' entries.
+        """
+        self._entries = None
+
+    def get_index(self) -> dict[ComponentKey, ModulesJsonModuleEntry]:
+        """
+        Returns the index of the module/subworkflow entries, building it if needed
+
+        Returns:
+            (dict): The entries, indexed by (component_type, repo_url, install_dir, name)
+        """
+        if self.modules_json is None:
+            self.load()
+            assert self.modules_json is not None  # mypy
+        if self._entries is None:
+            entries: dict[ComponentKey, ModulesJsonModuleEntry] = {}
+            entries_by_name: dict[tuple[str, str], list[ComponentKey]] = {}
+            installed_by: dict[str, list[ComponentKey]] = {}
+            for repo_url, repo_entry in self.modules_json.get("repos", {}).items():
+                if not isinstance(repo_entry, dict):
+                    continue
+                for component_type, install_dirs in repo_entry.items():
+                    if not isinstance(install_dirs, dict):
+                        continue
+                    for install_dir, components in install_dirs.items():
+                        if not isinstance(components, dict):
+                            continue
+                        for name, entry in components.items():
+                            if not isinstance(entry, dict):
+                                continue
+                            key = (component_type, repo_url, install_dir, name)
+                            entries[key] = entry
+                            entries_by_name.setdefault((component_type, name), []).append(key)
+                            for installer in entry.get("installed_by", []):
+                                installed_by.setdefault(installer, []).append(key)
+            self._entries_by_name = entries_by_name
+            self._installed_by = installed_by
+            self._entries = entries
+        return self._entries
+
     def create(self) -> None:
         """
         Creates the modules.json file from the modules and subworkflows installed in the pipeline directory
@@ -393,18 +463,7 @@ class ModulesJson:
         # Find the correct commit SHA for the local module/subworkflow files.
         # We iterate over the commit history for the module/subworkflow until we find
         # a revision that matches the file contents
-        commit_shas = (
-            commit["git_sha"]
-            for commit in modules_repo.get_component_git_log(component_name, component_type, depth=1000)
-        )
-        for commit_sha in commit_shas:
-            if all(
-                modules_repo.component_files_identical(
-                    component_name, component_path, commit_sha, component_type
-                ).values()
-            ):
-                return commit_sha
-        return None
+        return modules_repo.find_component_commit(component_name, component_path, component_type, depth=1000)
 
     def move_component_to_local(self, component_type: str, component: str, repo_name: str):
         """
@@ -606,6 +665,12 @@ class ModulesJson:
         Check that we have the "installed_by" value in 'modules.json', otherwise add it.
         Assume that the modules/subworkflows were installed by an nf-core command (don't track installed by subworkflows).
         """
+        fingerprint = self.get_fingerprint()
+        if fingerprint is not None and fingerprint == self.get_checked_fingerprint():
+            log.debug("Nothing changed since 'modules.json' was last checked")
+            self.load()
+            return True
+
         dump_modules_json = False
         try:
             self.load()
@@ -624,6 +689,7 @@ class ModulesJson:
                                     log.debug(f"Updating {component} in modules.json")
                                     dump_modules_json = True
                                     component["installed_by"] = [component["installed_by"]]
+            self.invalidate_index()
         except UserWarning:
             log.info("The 'modules.json' file is not up to date. Recreating the 'modules.json' file.")
             dump_modules_json = True
@@ -667,6 +733,7 @@ class ModulesJson:
                             self.modules_json["repos"][repo][component_type][install_dir][component]["installed_by"] = [
                                 component_type
                             ]
+        self.invalidate_index()
 
         # Recreate "installed_by" entry
         original_pipeline_components = self.pipeline_components
@@ -674,15 +741,88 @@ class ModulesJson:
         subworkflows_dict = self.get_all_components("subworkflows")
         if subworkflows_dict:
             dump_modules_json = True
+            graph = ComponentGraph(self.directory)
             for repo, subworkflows in subworkflows_dict.items():
                 for org, subworkflow in subworkflows:
-                    self.recreate_dependencies(repo, org, {"name": subworkflow})
+                    self.recreate_dependencies(repo, org, {"name": subworkflow}, graph)
         self.pipeline_components = original_pipeline_components
 
         if dump_modules_json:
-            self.dump(run_prettier=True)
+            self.dump()
+        self.save_checked_fingerprint()
         return True
 
+    @property
+    def fingerprint_path(self) -> Path:
+        """
+        The file with the fingerprint of the pipeline when 'modules.json' was last checked
+        """
+        pipeline_hash = hashlib.sha256(str(self.directory.resolve()).encode()).hexdigest()[:25]
+        return Path(nf_core.utils.NFCORE_CACHE_DIR, "modules-json-check", f"{pipeline_hash}.json")
+
+    def get_fingerprint(self, max_mtime: float | None = None) -> str | None:
+        """
+        Computes a fingerprint of the contents of 'modules.json', the directories in the
+        modules and subworkflows directories, and the modification times and sizes of their files
+
+        Args:
+            max_mtime (float): If given, return None if any file was modified after this time
+
+        Returns:
+            (str | None): The fingerprint, or None if there is no 'modules.json' file
+        """
+        fingerprint = hashlib.sha256(nf_core.__version__.encode())
+        try:
+            fingerprint.update(self.modules_json_path.read_bytes())
+        except FileNotFoundError:
+            return None
+        for directory in [self.modules_dir, self.subworkflows_dir]:
+            for root, dirs, files in os.walk(directory):
+                dirs.sort()
+                fingerprint.update(f"{Path(root).relative_to(self.directory)}/\n".encode())
+                for file in sorted(files):
+                    try:
+                        file_stat = Path(root, file).stat()
+                    except FileNotFoundError:
+                        # E.g. a broken symlink
+                        continue
+                    if max_mtime is not None and file_stat.st_mtime > max_mtime:
+                        return None
+                    fingerprint.update(f"{file}\0{file_stat.st_mtime_ns}\0{file_stat.st_size}\n".encode())
+        return fingerprint.hexdigest()
+
+    def get_checked_fingerprint(self) -> str | None:
+        """
+        Returns the fingerprint saved by the last successful :meth:`check_up_to_date`, if any
+        """
+        try:
+            with open(self.fingerprint_path) as fh:
+                return json.load(fh).get("fingerprint")
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, AttributeError) as e:
+            log.debug(f"Ignoring unreadable fingerprint file '{self.fingerprint_path}': {e}")
+            return None
+
+    def save_checked_fingerprint(self) -> None:
+        """
+        Saves the fingerprint of the pipeline after a successful :meth:`check_up_to_date`.
+
+        Nothing is saved if a file was changed very recently, as it could be changed again
+        without changing its modification time.
+        """
+        fingerprint = self.get_fingerprint(max_mtime=time.time() - RACY_CHANGE_SECONDS)
+        if fingerprint is None:
+            return
+        try:
+            self.fingerprint_path.parent.mkdir(parents=True, exist_ok=True)
+            nf_core.utils.atomic_write(
+                self.fingerprint_path,
+                json.dumps({"directory": str(self.directory.resolve()), "fingerprint": fingerprint}),
+            )
+        except OSError as e:
+            log.debug(f"Could not write fingerprint file '{self.fingerprint_path}': {e}")
+
     def load(self) -> None:
         """
         Loads the modules.json file into the variable 'modules_json'
@@ -754,6 +894,7 @@ class ModulesJson:
 
         # Sort the 'modules.json' repo entries
         self.modules_json["repos"] = nf_core.utils.sort_dictionary(self.modules_json["repos"])
+        self.invalidate_index()
         if write_file:
             self.dump()
         return True
@@ -790,9 +931,11 @@ class ModulesJson:
                             self.modules_json["repos"][repo_url].pop(component_type)
                             if len(repo_entry) == 0:
                                 self.modules_json["repos"].pop(repo_url)
+                        self.invalidate_index()
                         # write the updated modules.json file
                         self.dump()
                         return True
+                    self.invalidate_index()
                     self.dump()
                     return False
             else:
@@ -822,6 +965,7 @@ class ModulesJson:
                 f"{component_type[:-1].title()} '{install_dir}/{component_name}' not present in 'modules.json'"
             )
         self.modules_json["repos"][repo_url][component_type][install_dir][component_name]["patch"] = str(patch_filename)
+        self.invalidate_index()
         if write_file:
             self.dump()
 
@@ -834,6 +978,7 @@ class ModulesJson:
             del self.modules_json["repos"][repo_url]["modules"][install_dir][module_name]["patch"]
         except KeyError:
             log.warning("No patch entry in 'modules.json' to remove")
+        self.invalidate_index()
         if write_file:
             self.dump()
 
@@ -928,12 +1073,7 @@ class ModulesJson:
         Returns:
             (bool): Whether the module is present in the 'modules.json' file
         """
-        if self.modules_json is None:
-            self.load()
-            assert self.modules_json is not None  # mypy
-        return module_name in self.modules_json.get("repos", {}).get(repo_url, {}).get(component_type, {}).get(
-            install_dir, {}
-        )
+        return (component_type, repo_url, install_dir, module_name) in self.get_index()
 
     def get_modules_json(self) -> ModulesJsonType:
         """
@@ -959,17 +1099,8 @@ class ModulesJson:
         Returns:
             (str): The git SHA of the module/subworkflow if it exists, None otherwise
         """
-        if self.modules_json is None:
-            self.load()
-            assert self.modules_json is not None  # mypy
-        return (
-            self.modules_json.get("repos", {})
-            .get(repo_url, {})
-            .get(component_type, {})
-            .get(install_dir, {})
-            .get(component_name, {})
-            .get("git_sha", None)
-        )
+        entry = self.get_index().get((component_type, repo_url, install_dir, component_name))
+        return entry.get("git_sha") if entry is not None else None
 
     def get_module_version(self, module_name: str, repo_url: str, install_dir: str) -> str | None:
         """
@@ -983,14 +1114,7 @@ class ModulesJson:
         Returns:
             (str): The git SHA of the module if it exists, None otherwise
         """
-        if self.modules_json is None:
-            self.load()
-            assert self.modules_json is not None  # mypy
-        try:
-            sha = self.modules_json["repos"][repo_url]["modules"][install_dir][module_name]["git_sha"]
-        except KeyError:
-            sha = None
-        return sha
+        return self.get_component_version("modules", module_name, repo_url, install_dir)
 
     def get_subworkflow_version(self, subworkflow_name, repo_url, install_dir):
         """
@@ -1004,17 +1128,7 @@ class ModulesJson:
         Returns:
             (str): The git SHA of the subworkflow if it exists, None otherwise
         """
-        if self.modules_json is None:
-            self.load()
-            assert self.modules_json is not None  # mypy
-        return (
-            self.modules_json.get("repos", {})
-            .get(repo_url, {})
-            .get("subworkflows", {})
-            .get(install_dir, {})
-            .get(subworkflow_name, {})
-            .get("git_sha", None)
-        )
+        return self.get_component_version("subworkflows", subworkflow_name, repo_url, install_dir)
 
     def get_all_components(self, component_type: str) -> dict[str, list[tuple[(str, str)]]]:
         """
@@ -1055,23 +1169,19 @@ class ModulesJson:
             (dict[str: str,]): Dictionary indexed with the component names, with component_type as value
         """
 
-        if self.modules_json is None:
-            self.load()
-            assert self.modules_json is not None  # mypy
+        self.get_index()
         component_types = ["modules"] if component_type == "modules" else ["modules", "subworkflows"]
-        # Find all components that have an entry of install by of  a given component, recursively call this function for subworkflows
+        # Dependents are only looked up in the install dir (org path) of each repo
+        repo_paths: dict[str, str | None] = {}
+        # Find all components that have an entry of install by of  a given component
         for type in component_types:
-            for repo_url in self.modules_json["repos"].keys():
-                modules_repo = ModulesRepo(repo_url)
-                install_dir = modules_repo.repo_path
-                try:
-                    for comp in self.modules_json["repos"][repo_url][type][install_dir]:
-                        if name in self.modules_json["repos"][repo_url][type][install_dir][comp]["installed_by"]:
-                            dependent_components[comp] = (repo_url, install_dir, type)
-                except KeyError as e:
-                    # This exception will raise when there are only modules installed
-                    log.debug(f"Trying to retrieve all {type}. There aren't {type} installed. Failed with error {e}")
+            for comp_type, repo_url, install_dir, comp in self._installed_by.get(name, []):
+                if comp_type != type:
                     continue
+                if repo_url not in repo_paths:
+                    repo_paths[repo_url] = ModulesRepo(repo_url).repo_path
+                if install_dir == repo_paths[repo_url]:
+                    dependent_components[comp] = (repo_url, install_dir, type)
 
         return dependent_components
 
@@ -1087,18 +1197,13 @@ class ModulesJson:
             (list): The list of installed_by entries
 
         """
-        if self.modules_json is None:
-            self.load()
-            assert self.modules_json is not None  # mypy
-        installed_by_entries = {}
-        for _, repo_entry in self.modules_json.get("repos", {}).items():
-            if component_type in repo_entry:
-                for _, components in repo_entry[component_type].items():
-                    if name in components:
-                        installed_by_entries = components[name]["installed_by"]
-                        break
-
-        return installed_by_entries
+        entries = self.get_index()
+        keys = self._entries_by_name.get((component_type, name), [])
+        if not keys:
+            return {}
+        # Use the first install directory of the last repository with a component of this name
+        repo_url = keys[-1][1]
+        return entries[next(key for key in keys if key[1] == repo_url)]["installed_by"]
 
     def get_component_branch(self, component_type: str, component: str, repo_url: str, install_dir: str) -> str:
         """
@@ -1109,13 +1214,8 @@ class ModulesJson:
         Raises:
             LookupError: If there is no branch entry in the `modules.json`
         """
-        if self.modules_json is None:
-            self.load()
-            assert self.modules_json is not None  # mypy
-        try:
-            branch = self.modules_json["repos"][repo_url][component_type][install_dir][component]["branch"]
-        except (KeyError, TypeError):
-            branch = None
+        entry = self.get_index().get((component_type, repo_url, install_dir, component))
+        branch = entry.get("branch") if entry is not None else None
         if branch is None:
             raise LookupError(
                 f"Could not find branch information for component '{Path(install_dir, component)}'."
@@ -1123,20 +1223,28 @@ class ModulesJson:
             )
         return branch
 
-    def dump(self, run_prettier: bool = False) -> None:
+    def dump(self) -> None:
         """
         Sort the modules.json, and write it to file
+
+        The file is always formatted the way prettier formats it, without running prettier.
+        It is replaced in one step, so that it is never left half written, and is not written
+        at all if its contents would not change.
         """
         # Sort the modules.json
         if self.modules_json is None:
             self.load()
         if self.modules_json is not None:
             self.modules_json["repos"] = nf_core.utils.sort_dictionary(self.modules_json["repos"])
-            if run_prettier:
-                dump_json_with_prettier(self.modules_json_path, self.modules_json)
-            else:
-                with open(self.modules_json_path, "w") as fh:
-                    json.dump(self.modules_json, fh, indent=4)
+            self.invalidate_index()
+            content = format_json_like_prettier(self.modules_json).encode()
+            try:
+                if self.modules_json_path.read_bytes() == content:
+                    log.debug("'modules.json' is unchanged, not writing it")
+                    return
+            except FileNotFoundError:
+                pass
+            nf_core.utils.atomic_write(self.modules_json_path, content)
 
     def resolve_missing_installation(self, missing_installation: dict, component_type: str) -> None:
         missing_but_in_mod_json = [
@@ -1176,6 +1284,7 @@ class ModulesJson:
                     self.modules_json["repos"][repo_url][component_type][install_dir].pop(component)
                 if len(self.modules_json["repos"][repo_url][component_type][install_dir]) == 0:
                     self.modules_json["repos"].pop(repo_url)
+            self.invalidate_index()
 
     def resolve_missing_from_modules_json(self, missing_from_modules_json, component_type):
         format_missing = [f"'{dir}'" for dir in missing_from_modules_json]
@@ -1251,35 +1360,28 @@ class ModulesJson:
                                 }
                             }
                         )
+        self.invalidate_index()
 
-    def recreate_dependencies(self, repo, org, subworkflow):
+    def recreate_dependencies(self, repo, org, subworkflow, graph=None):
         """
         Try to recreate the installed_by entries for subworkflows.
         Remove self installation entry from dependencies, assuming that the modules.json has been freshly created,
-        i.e., no module or subworkflow has been installed by the user in the meantime
+        i.e., no module or subworkflow has been installed by the user in the meantime.
+        Nested includes are not followed, as the entries of every installed subworkflow are recreated separately.
         """
-
+        if graph is None:
+            graph = ComponentGraph(self.directory)
         sw_name = subworkflow["name"]
         sw_path = Path(self.subworkflows_dir, org, sw_name)
-        dep_mods, dep_subwfs = get_components_to_install(sw_path)
+        dep_mods, dep_subwfs = graph.includes(sw_path)
         assert self.modules_json is not None  # mypy
-        for dep_mod in dep_mods:
-            name = dep_mod["name"]
-            current_repo = dep_mod.get("git_remote", repo)
-            current_org = dep_mod.get("org_path", org)
-            installed_by = self.modules_json["repos"][current_repo]["modules"][current_org][name]["installed_by"]
-            if installed_by == ["modules"]:
-                self.modules_json["repos"][repo]["modules"][org][name]["installed_by"] = []
-            if sw_name not in installed_by:
-                self.modules_json["repos"][repo]["modules"][org][name]["installed_by"].append(sw_name)
-
-        for dep_subwf in dep_subwfs:
-            name = dep_subwf["name"]
-            current_repo = dep_subwf.get("git_remote", repo)
-            current_org = dep_subwf.get("org_path", org)
-            installed_by = self.modules_json["repos"][current_repo]["subworkflows"][current_org][name]["installed_by"]
-            if installed_by == ["subworkflows"]:
-                self.modules_json["repos"][repo]["subworkflows"][org][name]["installed_by"] = []
-            if sw_name not in installed_by:
-                self.modules_json["repos"][repo]["subworkflows"][org][name]["installed_by"].append(sw_name)
-            self.recreate_dependencies(repo, org, dep_subwf)
+        for component_type, dependencies in [("modules", dep_mods), ("subworkflows", dep_subwfs)]:
+            for dependency in dependencies:
+                current_repo = dependency.get("git_remote", repo)
+                current_org = dependency.get("org_path", org)
+                entry = self.modules_json["repos"][current_repo][component_type][current_org][dependency["name"]]
+                if entry["installed_by"] == [component_type]:
+                    entry["installed_by"] = []
+                if sw_name not in entry["installed_by"]:
+                    entry["installed_by"].append(sw_name)
+        self.invalidate_index()
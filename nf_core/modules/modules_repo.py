@@ -1,6 +1,7 @@
+import json
 import logging
 import os
-import shutil
+import time
 from pathlib import Path
 
 import git
@@ -11,11 +12,21 @@ from git.exc import GitCommandError, InvalidGitRepositoryError
 
 import nf_core.modules.modules_utils
 from nf_core.components.constants import NF_CORE_MODULES_NAME, NF_CORE_MODULES_REMOTE
-from nf_core.synced_repo import RemoteProgressbar, SyncedRepo
-from nf_core.utils import NFCORE_CACHE_DIR, NFCORE_DIR, load_tools_config
+from nf_core.synced_repo import RemoteProgressbar, SyncedRepo, clone_lock, remove_clone, with_repo_lock
+from nf_core.utils import NFCORE_CACHE_DIR, NFCORE_DIR, atomic_write, load_tools_config
 
 log = logging.getLogger(__name__)
 
+# Only download the files of the components that are used, and only check out the files at the root.
+# Set the NFCORE_MODULES_FULL_CLONE environment variable to clone the full repository instead.
+PARTIAL_CLONE_OPTIONS = ["--filter=blob:none", "--sparse"]
+
+# Seconds after a fetch during which the local clone is used without checking the remote for changes.
+# By default, every command checks the remote. Can be changed with the NFCORE_MODULES_SYNC_TTL environment variable.
+DEFAULT_SYNC_TTL = 0
+# File in the git directory of the clone that records when the remote was last checked
+SYNC_STATUS_FILE = "nf-core-sync.json"
+
 
 class ModulesRepo(SyncedRepo):
     """
@@ -31,6 +42,8 @@ class ModulesRepo(SyncedRepo):
 
     local_repo_statuses = {}
     no_pull_global = False
+    # Names of the repos that were fetched from their remote in this process
+    fetched_repos: set[str] = set()
 
     def __init__(
         self,
@@ -81,73 +94,236 @@ class ModulesRepo(SyncedRepo):
             gitless_repo_url = gitless_repo_url[:-4]
         return gitless_repo_url
 
+    @with_repo_lock
     def setup_local_repo(self, remote, branch, hide_progress=True, in_cache=False):
         """
         Sets up the local git repository. If the repository has been cloned previously, it
         returns a git.Repo object of that clone. Otherwise it tries to clone the repository from
         the provided remote URL and returns a git.Repo of the new clone.
 
+        If the ``NFCORE_MODULES_WORKTREES`` environment variable is set, the branch is not checked out
+        in the clone. Instead, self.local_repo_dir points to a worktree at the tip of the branch, in
+        ``<clone>-worktrees/<commit>``. Worktrees are never changed once created, so several nf-core
+        commands can use the same clone at the same time, even with different branches.
+
         Args:
             remote (str): git url of remote
             branch (str): name of branch to use
         Sets self.repo
         """
         self.local_repo_dir = Path(NFCORE_DIR if not in_cache else NFCORE_CACHE_DIR, self.fullname)
+        clone_dir = self.clone_dir = self.local_repo_dir
+        self.worktree_sha = None
+        use_worktree = bool(os.environ.get("NFCORE_MODULES_WORKTREES"))
         try:
-            if not os.path.exists(self.local_repo_dir):
-                try:
-                    pbar = rich.progress.Progress(
-                        "[bold blue]{task.description}",
-                        rich.progress.BarColumn(bar_width=None),
-                        "[bold yellow]{task.fields[state]}",
-                        transient=True,
-                        disable=hide_progress or os.environ.get("HIDE_PROGRESS", None) is not None,
-                    )
-                    with pbar:
-                        self.repo = git.Repo.clone_from(
-                            remote,
-                            self.local_repo_dir,
-                            progress=RemoteProgressbar(pbar, self.fullname, self.remote_url, "Cloning"),
+            # Other nf-core commands may be updating the same clone at the same time
+            with clone_lock(clone_dir):
+                if not os.path.exists(clone_dir):
+                    try:
+                        pbar = rich.progress.Progress(
+                            "[bold blue]{task.description}",
+                            rich.progress.BarColumn(bar_width=None),
+                            "[bold yellow]{task.fields[state]}",
+                            transient=True,
+                            disable=hide_progress or os.environ.get("HIDE_PROGRESS", None) is not None,
                         )
-                    ModulesRepo.update_local_repo_status(self.fullname, True)
-                except GitCommandError:
-                    raise LookupError(f"Failed to clone from the remote: `{remote}`")
-                # Verify that the requested branch exists by checking it out
-                self.setup_branch(branch)
-            else:
-                self.repo = git.Repo(self.local_repo_dir)
-
-                if ModulesRepo.no_pull_global:
-                    ModulesRepo.update_local_repo_status(self.fullname, True)
-                # If the repo is already cloned, fetch the latest changes from the remote
-                if not ModulesRepo.local_repo_synced(self.fullname):
-                    pbar = rich.progress.Progress(
-                        "[bold blue]{task.description}",
-                        rich.progress.BarColumn(bar_width=None),
-                        "[bold yellow]{task.fields[state]}",
-                        transient=True,
-                        disable=hide_progress or os.environ.get("HIDE_PROGRESS", None) is not None,
-                    )
-                    with pbar:
-                        self.repo.remotes.origin.fetch(
-                            progress=RemoteProgressbar(pbar, self.fullname, self.remote_url, "Pulling")
-                        )
-                    ModulesRepo.update_local_repo_status(self.fullname, True)
+                        with pbar:
+                            self.repo = self.clone_repo = self.clone_local_repo(
+                                remote, RemoteProgressbar(pbar, self.fullname, self.remote_url, "Cloning")
+                            )
+                        self.save_sync_status(self.get_remote_refs())
+                        ModulesRepo.fetched_repos.add(self.fullname)
+                        ModulesRepo.update_local_repo_status(self.fullname, True)
+                    except GitCommandError:
+                        raise LookupError(f"Failed to clone from the remote: `{remote}`")
+                    # Verify that the requested branch exists by checking it out
+                    self.setup_branch(branch, worktree=use_worktree)
+                else:
+                    self.repo = self.clone_repo = git.Repo(clone_dir)
+
+                    if ModulesRepo.no_pull_global:
+                        ModulesRepo.update_local_repo_status(self.fullname, True)
+                    # If the repo is already cloned, fetch the latest changes from the remote,
+                    # unless it was fetched recently or the remote has not changed since
+                    if not ModulesRepo.local_repo_synced(self.fullname) and self.remote_unchanged():
+                        ModulesRepo.update_local_repo_status(self.fullname, True)
+                    if not ModulesRepo.local_repo_synced(self.fullname):
+                        self.fetch_remote(hide_progress)
 
-                # Before verifying the branch, fetch the changes
-                # Verify that the requested branch exists by checking it out
-                self.setup_branch(branch)
+                    # Before verifying the branch, fetch the changes
+                    # Verify that the requested branch exists by checking it out
+                    self.setup_branch(branch, worktree=use_worktree)
 
-                # Now merge the changes
-                tracking_branch = self.repo.active_branch.tracking_branch()
-                if tracking_branch is None:
-                    raise LookupError(f"There is no remote tracking branch '{self.branch}' in '{self.remote_url}'")
-                self.repo.git.merge(tracking_branch.name)
+                    # Now merge the changes
+                    if not use_worktree:
+                        self.merge_tracking_branch()
         except (GitCommandError, InvalidGitRepositoryError) as e:
             log.error(f"[red]Could not set up local cache of modules repository:[/]\n{e}\n")
-            if rich.prompt.Confirm.ask(f"[violet]Delete local cache '{self.local_repo_dir}' and try again?"):
-                log.info(f"Removing '{self.local_repo_dir}'")
-                shutil.rmtree(self.local_repo_dir)
+            if rich.prompt.Confirm.ask(f"[violet]Delete local cache '{clone_dir}' and try again?"):
+                log.info(f"Removing '{clone_dir}'")
+                with clone_lock(clone_dir):
+                    remove_clone(clone_dir)
                 self.setup_local_repo(remote, branch, hide_progress)
             else:
                 raise LookupError("Exiting due to error with local modules git repo")
+
+    def fetch_remote(self, hide_progress: bool = True) -> None:
+        """
+        Fetches the remote into the local clone, and records the fetched branches.
+        Branches that were deleted from the remote are pruned, so that they are not recorded.
+        """
+        if self.clone_repo is None:
+            raise ValueError("Repository not initialized")
+        pbar = rich.progress.Progress(
+            "[bold blue]{task.description}",
+            rich.progress.BarColumn(bar_width=None),
+            "[bold yellow]{task.fields[state]}",
+            transient=True,
+            disable=hide_progress or os.environ.get("HIDE_PROGRESS", None) is not None,
+        )
+        with pbar:
+            self.clone_repo.remotes.origin.fetch(
+                progress=RemoteProgressbar(pbar, self.fullname, self.remote_url, "Pulling"), prune=True
+            )
+        self.save_sync_status(self.get_remote_refs())
+        ModulesRepo.fetched_repos.add(self.fullname)
+        ModulesRepo.update_local_repo_status(self.fullname, True)
+
+    def merge_tracking_branch(self) -> None:
+        """
+        Merges the fetched changes of the remote branch into the checked out branch
+        """
+        tracking_branch = self.repo.active_branch.tracking_branch()
+        if tracking_branch is None:
+            raise LookupError(f"There is no remote tracking branch '{self.branch}' in '{self.remote_url}'")
+        self.repo.git.merge(tracking_branch.name)
+
+    @with_repo_lock
+    def fetch_missing_commit(self, commit: str) -> bool:
+        """
+        Fetches the remote when a requested commit is not in the local clone, e.g. because it was
+        pushed after the last fetch and the clone was used within the TTL. The remote is fetched
+        at most once per run.
+
+        Args:
+            commit (str): The requested commit
+
+        Returns:
+            (bool): True if the remote was fetched, so that the commit can be looked up again
+        """
+        if ModulesRepo.no_pull_global or self.fullname in ModulesRepo.fetched_repos or self.clone_dir is None:
+            return False
+        log.debug(f"Commit '{commit}' not found in the local clone of '{self.remote_url}', fetching the remote")
+        try:
+            with clone_lock(self.clone_dir):
+                self.fetch_remote()
+                # Move to the fetched tip of the branch
+                if self.worktree_sha is not None:
+                    self.setup_branch(self.branch)
+                else:
+                    self.merge_tracking_branch()
+        except (GitCommandError, LookupError) as e:
+            log.debug(f"Could not fetch '{self.remote_url}': {e}")
+            return False
+        return True
+
+    def get_sync_ttl(self) -> float:
+        """
+        Returns the number of seconds during which a fetched clone is used without checking the remote
+
+        Set with the ``NFCORE_MODULES_SYNC_TTL`` environment variable, e.g. to run several commands in a row
+        without listing the branches of the remote each time. Defaults to 0, so the remote is always checked.
+        """
+        ttl = os.environ.get("NFCORE_MODULES_SYNC_TTL")
+        if ttl is None:
+            return DEFAULT_SYNC_TTL
+        try:
+            return float(ttl)
+        except ValueError:
+            log.warning(f"Invalid value for NFCORE_MODULES_SYNC_TTL: '{ttl}', using {DEFAULT_SYNC_TTL} seconds")
+            return DEFAULT_SYNC_TTL
+
+    def get_remote_refs(self) -> dict[str, str]:
+        """
+        Returns the commit SHAs of the branches of the remote, as last fetched into the local clone
+        """
+        if self.clone_repo is None:
+            raise ValueError("Repository not initialized")
+        return {
+            f"refs/heads/{ref.remote_head}": ref.commit.hexsha
+            for ref in self.clone_repo.remotes.origin.refs
+            if ref.remote_head != "HEAD"
+        }
+
+    def remote_unchanged(self) -> bool:
+        """
+        Checks whether the local clone is up to date with the remote, without fetching it.
+
+        The clone is considered up to date if it was last checked within the TTL (see :meth:`get_sync_ttl`).
+        Otherwise, the branches of the remote are listed with ``git ls-remote``, which is much cheaper than
+        a fetch, and compared with the branches recorded at the last fetch.
+
+        Returns:
+            (bool): True if there is nothing new to fetch
+        """
+        sync_status_path = Path(self.repo.git_dir, SYNC_STATUS_FILE)
+        try:
+            with open(sync_status_path) as fh:
+                sync_status = json.load(fh)
+            last_checked = float(sync_status["last_checked"])
+            remote_refs = sync_status["remote_refs"]
+        except (OSError, ValueError, KeyError, TypeError):
+            return False
+        if time.time() - last_checked < self.get_sync_ttl():
+            log.debug(f"Using '{self.fullname}' as it was checked less than {self.get_sync_ttl():.0f} seconds ago")
+            return True
+        try:
+            ls_remote = self.repo.git.ls_remote("origin", heads=True)
+        except GitCommandError as e:
+            log.debug(f"Could not list the branches of '{self.remote_url}': {e}")
+            return False
+        current_refs = {ref: sha for sha, ref in (line.split("\t") for line in ls_remote.splitlines())}
+        if current_refs != remote_refs:
+            return False
+        log.debug(f"No changes in '{self.remote_url}' since the last fetch")
+        self.save_sync_status(current_refs)
+        return True
+
+    def save_sync_status(self, remote_refs: dict[str, str]) -> None:
+        """
+        Records that the local clone is up to date with the given branches of the remote
+
+        Args:
+            remote_refs (dict[str, str]): Commit SHAs of the branches of the remote, by ref name
+        """
+        sync_status_path = Path(self.repo.git_dir, SYNC_STATUS_FILE)
+        try:
+            atomic_write(sync_status_path, json.dumps({"last_checked": time.time(), "remote_refs": remote_refs}))
+        except OSError as e:
+            log.debug(f"Could not save the sync status of '{self.fullname}': {e}")
+
+    def clone_local_repo(self, remote, progress):
+        """
+        Clones the remote into the local cache directory.
+
+        Unless the ``NFCORE_MODULES_FULL_CLONE`` environment variable is set, the clone is blobless and sparse:
+        all commits and directory listings are downloaded, but the files of a module or subworkflow are only
+        downloaded when they are read, and only the files at the root of the repository are checked out.
+        Falls back to a full clone if the git client or the remote does not support this.
+
+        Args:
+            remote (str): git url of remote
+            progress (RemoteProgressbar): Progress bar for the clone
+
+        Returns:
+            (git.Repo): The cloned repository
+        """
+        if not os.environ.get("NFCORE_MODULES_FULL_CLONE"):
+            try:
+                return git.Repo.clone_from(
+                    remote, self.local_repo_dir, progress=progress, multi_options=PARTIAL_CLONE_OPTIONS
+                )
+            except GitCommandError as e:
+                log.debug(f"Partial clone of '{remote}' failed, cloning the full repository instead: {e}")
+                remove_clone(self.local_repo_dir)
+        return git.Repo.clone_from(remote, self.local_repo_dir, progress=progress)
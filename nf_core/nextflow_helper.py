@@ -0,0 +1,217 @@
+"""Resident helper that answers Nextflow queries for other nf-core commands.
+
+Every ``nextflow`` call pays for the startup of a Java virtual machine.
+The helper is a long-running process that listens on a local socket and
+answers read-only Nextflow queries (``-version``, ``config`` and ``inspect``).
+Answers are kept in memory until one of the Nextflow files of the queried
+workflow changes, so a CI job that runs several nf-core commands starts
+Nextflow only once per query.
+
+:func:`nf_core.utils.run_cmd` uses the helper if it is running and falls
+back to running Nextflow itself otherwise.
+"""
+
+import base64
+import collections
+import fnmatch
+import json
+import logging
+import os
+import socket
+import socketserver
+import subprocess
+import threading
+from pathlib import Path
+
+from nf_core.utils import NFCORE_CACHE_DIR
+
+log = logging.getLogger(__name__)
+
+SOCKET_PATH = Path(NFCORE_CACHE_DIR, "nextflow-helper.sock")
+
+# Nextflow commands that only read files, so their output can be reused
+HELPER_COMMANDS = ["-v", "-version", "config", "inspect"]
+
+# Files that can change the output of the Nextflow commands above
+NEXTFLOW_FILE_PATTERNS = ["*.nf", "*.config", "*.json"]
+
+# Number of query outputs kept in memory, least recently used are removed first
+MAX_RESULTS = 256
+
+
+def query_helper(args: list[str]) -> tuple[int, bytes, bytes] | None:
+    """Run a Nextflow command through the helper.
+
+    Args:
+        args (list[str]): Arguments for ``nextflow``
+
+    Returns:
+        tuple: The return code, stdout and stderr of the command,
+            or ``None`` if the helper is not running or can't run this command.
+    """
+    if not hasattr(socket, "AF_UNIX") or not args or args[0] not in HELPER_COMMANDS or not SOCKET_PATH.exists():
+        return None
+    request = {
+        "args": args,
+        "cwd": str(Path.cwd()),
+        "env": {k: v for k, v in os.environ.items() if k.startswith("NXF_")},
+    }
+    try:
+        response = _send(request)
+        if "error" in response:
+            log.debug(f"Nextflow helper could not run the command: {response['error']}")
+            return None
+        return (
+            response["returncode"],
+            base64.b64decode(response["stdout"]),
+            base64.b64decode(response["stderr"]),
+        )
+    except (OSError, ValueError, KeyError) as e:
+        log.debug(f"Nextflow helper is not available: {e}")
+        return None
+
+
+def stop_helper(socket_path: Path | None = None) -> bool:
+    """Ask a running helper to shut down.
+
+    Args:
+        socket_path (Path): Path of the socket that the helper listens on. Defaults to :data:`SOCKET_PATH`.
+
+    Returns:
+        bool: ``True`` if a helper was running
+    """
+    try:
+        _send({"shutdown": True}, socket_path)
+        return True
+    except (OSError, ValueError):
+        return False
+
+
+def _send(request: dict, socket_path: Path | None = None) -> dict:
+    """Send one request to the helper and wait for the response"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(1)
+        sock.connect(str(socket_path or SOCKET_PATH))
+        # Nextflow queries can take a long time
+        sock.settimeout(None)
+        sock.sendall(json.dumps(request).encode() + b"\n")
+        with sock.makefile("rb") as fh:
+            return json.loads(fh.readline())
+
+
+class NextflowHelper(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Server that runs Nextflow queries and remembers their output.
+
+    Args:
+        socket_path (Path): Path of the socket to listen on. Defaults to :data:`SOCKET_PATH`.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: Path | None = None) -> None:
+        self.socket_path = Path(socket_path or SOCKET_PATH)
+        self.results: collections.OrderedDict[str, dict] = collections.OrderedDict()
+        self.query_locks: dict[str, threading.Lock] = {}
+        self.lock = threading.Lock()
+        self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+        if self.socket_path.exists():
+            try:
+                _send({"ping": True}, self.socket_path)
+            except (OSError, ValueError):
+                # Left behind by a helper that did not shut down cleanly
+                self.socket_path.unlink()
+            else:
+                raise UserWarning(f"A Nextflow helper is already running at '{self.socket_path}'")
+        super().__init__(str(self.socket_path), _RequestHandler)
+        os.chmod(self.socket_path, 0o600)
+
+    def __repr__(self) -> str:
+        return f"<NextflowHelper at {self.socket_path}>"
+
+    def serve(self) -> None:
+        """Answer queries until interrupted or asked to shut down"""
+        log.info(f"Nextflow helper listening on: [magenta]{self.socket_path}")
+        try:
+            self.serve_forever()
+        finally:
+            self.server_close()
+            self.socket_path.unlink(missing_ok=True)
+
+    def run_query(self, args: list[str], cwd: str, env: dict[str, str]) -> dict:
+        """Run a Nextflow command, or return the output of an earlier successful run with the same inputs"""
+        if not args or args[0] not in HELPER_COMMANDS:
+            return {"error": f"Unsupported command: nextflow {' '.join(args)}"}
+        key = json.dumps([args, cwd, env, self._fingerprint(args, cwd)])
+        with self.lock:
+            query_lock = self.query_locks.setdefault(key, threading.Lock())
+        # Run identical concurrent queries only once
+        with query_lock:
+            try:
+                with self.lock:
+                    result = self.results.get(key)
+                    if result is not None:
+                        self.results.move_to_end(key)
+                if result is not None:
+                    log.debug(f"Reusing output of: nextflow {' '.join(args)}")
+                    return result
+                log.info(f"Running: nextflow {' '.join(args)}")
+                run_env = {k: v for k, v in os.environ.items() if not k.startswith("NXF_")}
+                try:
+                    proc = subprocess.run(["nextflow", *args], cwd=cwd, env={**run_env, **env}, capture_output=True)
+                except OSError as e:
+                    return {"error": str(e)}
+                result = {
+                    "returncode": proc.returncode,
+                    "stdout": base64.b64encode(proc.stdout).decode(),
+                    "stderr": base64.b64encode(proc.stderr).decode(),
+                }
+                # Failures can be temporary, e.g. a plugin that could not be downloaded
+                if proc.returncode == 0:
+                    with self.lock:
+                        self.results[key] = result
+                        while len(self.results) > MAX_RESULTS:
+                            self.results.popitem(last=False)
+                return result
+            finally:
+                # Queries that are waiting hold on to the lock, later queries find the result
+                with self.lock:
+                    self.query_locks.pop(key, None)
+
+    @staticmethod
+    def _fingerprint(args: list[str], cwd: str) -> list:
+        """Modification times and sizes of the Nextflow files of all workflows in the command arguments"""
+        fingerprint = []
+        for arg in args[1:]:
+            path = Path(cwd, arg)
+            if not path.exists():
+                continue
+            for root, dirs, files in os.walk(path if path.is_dir() else path.parent):
+                # Skip Nextflow run directories
+                dirs[:] = sorted(d for d in dirs if d not in ["work", ".nextflow", ".git"])
+                for fn in sorted(files):
+                    if any(fnmatch.fnmatch(fn, pattern) for pattern in NEXTFLOW_FILE_PATTERNS):
+                        stat = Path(root, fn).stat()
+                        fingerprint.append((str(Path(root, fn)), stat.st_mtime_ns, stat.st_size))
+        return fingerprint
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Handle one request to the Nextflow helper"""
+
+    server: NextflowHelper
+
+    def handle(self) -> None:
+        try:
+            request = json.loads(self.rfile.readline())
+        except ValueError as e:
+            response = {"error": f"Invalid request: {e}"}
+        else:
+            if request.get("shutdown"):
+                log.info("Shutting down the Nextflow helper")
+                threading.Thread(target=self.server.shutdown).start()
+                response = {}
+            elif request.get("ping"):
+                response = {}
+            else:
+                response = self.server.run_query(request["args"], request["cwd"], request.get("env", {}))
+        self.wfile.write(json.dumps(response).encode() + b"\n")
@@ -7,6 +7,7 @@ import logging
 import os
 import re
 import shutil
+from collections.abc import Collection
 from pathlib import Path
 
 import git
@@ -283,7 +284,7 @@ class PipelineCreate:
             ):
                 current_dir = Path.cwd()
                 os.chdir(self.outdir)
-                run_prettier_on_file([str(f) for f in self.outdir.glob("**/*")])
+                run_prettier_on_file([str(f) for f in self.outdir.glob("**/*")], defer=False)
                 os.chdir(current_dir)
 
         if self.config.is_nfcore and not self.is_interactive:
@@ -295,9 +296,18 @@ class PipelineCreate:
                 "https://nf-co.re/docs/tutorials/adding_a_pipeline/overview#join-the-community[/link]"
             )
 
-    def render_template(self) -> None:
-        """Runs Jinja to create a new nf-core pipeline."""
+    def render_template(self, only_files: Collection[str | Path] | None = None) -> bool:
+        """Runs Jinja to create a new nf-core pipeline.
+
+        Args:
+            only_files (list[str|Path]): Only render these files (paths relative to the pipeline directory).
+                The RO-Crate and the template settings in ``.nf-core.yml`` are not created in this case.
+
+        Returns:
+            bool: Whether prettier formatted the rendered files
+        """
         log.info(f"Creating new pipeline: '{self.name}'")
+        render_only = None if only_files is None else {Path(f) for f in only_files}
 
         # Check if the output directory exists
         if self.outdir.exists():
@@ -346,6 +356,8 @@ class PipelineCreate:
 
                 if str(template_fn) in rename_files:
                     output_path = self.outdir / rename_files[str(template_fn)]
+                if render_only is not None and output_path.relative_to(self.outdir) not in render_only:
+                    continue
                 output_path.parent.mkdir(parents=True, exist_ok=True)
 
                 try:
@@ -381,15 +393,16 @@ class PipelineCreate:
             # Make a logo and save it, if it is a nf-core pipeline
             self.make_pipeline_logo()
 
-        if self.config.skip_features is None or "rocrate" not in self.config.skip_features:
+        if render_only is None and (self.config.skip_features is None or "rocrate" not in self.config.skip_features):
             # Create the RO-Crate metadata file
             rocrate_obj = ROCrate(self.outdir)
             rocrate_obj.create_rocrate(json_path=self.outdir / "ro-crate-metadata.json")
 
         # Update the .nf-core.yml with linting configurations
-        self.fix_linting()
+        if render_only is None:
+            self.fix_linting()
 
-        if self.config:
+        if self.config and render_only is None:
             config_fn, config_yml = nf_core.utils.load_tools_config(self.outdir)
             if config_fn is not None and config_yml is not None:
                 with open(str(config_fn), "w") as fh:
@@ -399,7 +412,7 @@ class PipelineCreate:
 
         # Run prettier on files for pipelines sync
         log.debug("Running prettier on pipeline files")
-        run_prettier_on_file([str(f) for f in self.outdir.glob("**/*")])
+        return run_prettier_on_file([str(f) for f in self.outdir.glob("**/*")], defer=False)
 
     def fix_linting(self):
         """
@@ -0,0 +1,377 @@
+"""Compressed archives of downloaded pipelines, written while the pipeline is downloaded."""
+
+import bz2
+import collections
+import concurrent.futures
+import fnmatch
+import hashlib
+import logging
+import os
+import queue
+import shutil
+import struct
+import subprocess
+import tarfile
+import threading
+import time
+import zlib
+from abc import ABC, abstractmethod
+from pathlib import Path
+from zipfile import ZipFile
+
+from nf_core.pipelines.download.utils import IMAGE_MANIFEST_FILENAME, DownloadError
+
+log = logging.getLogger(__name__)
+
+# The archive formats, and the command to extract them
+COMPRESSION_TYPES = {
+    "tar.gz": "tar -xzf",
+    "tar.bz2": "tar -xjf",
+    "tar.zst": "tar --zstd -xf",
+    "zip": "unzip",
+}
+
+# Size of the blocks that are compressed in parallel
+BLOCK_SIZE = 1024 * 1024
+# Gzip blocks are compressed with the end of the previous block as dictionary, see pigz
+GZIP_DICT_SIZE = 32 * 1024
+
+# Files of the download directory that are not archived: the image manifest and its lock file, as the
+# manifest is only valid for the images in this directory, and the partial files of interrupted image downloads
+EXCLUDED_FILES = [IMAGE_MANIFEST_FILENAME, f"{IMAGE_MANIFEST_FILENAME}.lock", "*.partial.*"]
+
+
+class HashingFile:
+    """A file that is written to sequentially, computing the MD5 checksum of its content on the way.
+
+    Args:
+        path (Path): The file to write
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.fh = open(path, "wb")
+        self.md5 = hashlib.md5()
+
+    def write(self, data: bytes) -> int:
+        self.md5.update(data)
+        return self.fh.write(data)
+
+    def flush(self) -> None:
+        self.fh.flush()
+
+    def close(self) -> None:
+        self.fh.close()
+
+
+class ParallelBlockWriter(ABC):
+    """Compresses the data written to it in blocks, on a thread pool, and writes the compressed blocks in order.
+
+    The compression libraries release the GIL, so the blocks are compressed in parallel.
+    Subclasses define the compression of a block and the header and trailer of the stream.
+
+    Args:
+        sink (HashingFile): The file to write the compressed data to
+        threads (int): The number of blocks to compress in parallel
+    """
+
+    def __init__(self, sink: HashingFile, threads: int) -> None:
+        self.sink = sink
+        self.pool = concurrent.futures.ThreadPoolExecutor(max_workers=threads)
+        # Limit the memory used by blocks that are waiting to be written
+        self.max_pending = 2 * threads
+        self.pending: collections.deque[concurrent.futures.Future] = collections.deque()
+        self.buffer = bytearray()
+        self.previous_block = b""
+        self.aborted = False
+        self.sink.write(self.header())
+
+    def header(self) -> bytes:
+        return b""
+
+    def trailer(self) -> bytes:
+        return b""
+
+    @abstractmethod
+    def compress_block(self, block: bytes, previous_block: bytes, last: bool) -> bytes:
+        """Compress a block of data
+
+        Args:
+            block (bytes): The block to compress
+            previous_block (bytes): The block before it, empty for the first block
+            last (bool): Whether this is the last block of the stream
+
+        Returns:
+            bytes: The compressed block
+        """
+        pass
+
+    def write(self, data: bytes) -> int:
+        if self.aborted:
+            return len(data)
+        self.buffer += data
+        while len(self.buffer) >= BLOCK_SIZE:
+            self.submit(bytes(self.buffer[:BLOCK_SIZE]), last=False)
+            del self.buffer[:BLOCK_SIZE]
+        return len(data)
+
+    def submit(self, block: bytes, last: bool) -> None:
+        self.pending.append(self.pool.submit(self.compress_block, block, self.previous_block, last))
+        self.previous_block = block
+        while len(self.pending) > (0 if last else self.max_pending):
+            self.sink.write(self.pending.popleft().result())
+
+    def close(self) -> None:
+        """Compress the remaining data and write the trailer"""
+        try:
+            self.submit(bytes(self.buffer), last=True)
+            self.sink.write(self.trailer())
+        finally:
+            self.pool.shutdown(cancel_futures=True)
+
+    def abort(self) -> None:
+        """Discard the data that is written from now on, and the blocks that are waiting"""
+        self.aborted = True
+        self.pool.shutdown(cancel_futures=True)
+
+
+class ParallelGzipWriter(ParallelBlockWriter):
+    """Writes a single gzip stream, which is compressed in parallel blocks like `pigz` does it.
+
+    Each block is deflated with the end of the previous block as dictionary and flushed to
+    a byte boundary, so that the compressed blocks join into one deflate stream.
+    """
+
+    def __init__(self, sink: HashingFile, threads: int) -> None:
+        self.crc = 0
+        self.size = 0
+        super().__init__(sink, threads)
+
+    def header(self) -> bytes:
+        # Magic number, deflate, no flags, modification time, no extra flags, unknown OS
+        return b"\x1f\x8b\x08\x00" + struct.pack("<I", int(time.time())) + b"\x00\xff"
+
+    def trailer(self) -> bytes:
+        return struct.pack("<II", self.crc, self.size & 0xFFFFFFFF)
+
+    def write(self, data: bytes) -> int:
+        self.crc = zlib.crc32(data, self.crc)
+        self.size += len(data)
+        return super().write(data)
+
+    def compress_block(self, block: bytes, previous_block: bytes, last: bool) -> bytes:
+        if previous_block:
+            compressor = zlib.compressobj(6, zlib.DEFLATED, -zlib.MAX_WBITS, zdict=previous_block[-GZIP_DICT_SIZE:])
+        else:
+            compressor = zlib.compressobj(6, zlib.DEFLATED, -zlib.MAX_WBITS)
+        return compressor.compress(block) + compressor.flush(zlib.Z_FINISH if last else zlib.Z_SYNC_FLUSH)
+
+
+class ParallelBzip2Writer(ParallelBlockWriter):
+    """Writes a bzip2 file of independently compressed streams, like `pbzip2` does it"""
+
+    def compress_block(self, block: bytes, previous_block: bytes, last: bool) -> bytes:
+        # An empty last block would add an empty stream
+        if not block and previous_block:
+            return b""
+        return bz2.compress(block, 9)
+
+
+class ZstdProcessWriter:
+    """Compresses the data written to it with a multithreaded `zstd` process.
+
+    Args:
+        sink (HashingFile): The file to write the compressed data to
+        threads (int): The number of compression threads of `zstd`
+    """
+
+    def __init__(self, sink: HashingFile, threads: int) -> None:
+        zstd_binary = shutil.which("zstd")
+        if zstd_binary is None:
+            raise DownloadError("'zstd' is required for 'tar.zst' archives, but it is not installed")
+        self.sink = sink
+        self.proc = subprocess.Popen(
+            [zstd_binary, f"-T{threads}", "-q", "-c"], stdin=subprocess.PIPE, stdout=subprocess.PIPE
+        )
+        self.error: BaseException | None = None
+        self.aborted = False
+        # Read the compressed data while it is written, so that the pipes don't fill up
+        self.reader = threading.Thread(target=self.read_output, daemon=True)
+        self.reader.start()
+
+    def read_output(self) -> None:
+        stdout = self.proc.stdout
+        assert stdout is not None  # mypy
+        try:
+            for data in iter(lambda: stdout.read(BLOCK_SIZE), b""):
+                self.sink.write(data)
+        except BaseException as e:
+            # Stop the writes to zstd, instead of letting them fill up the pipe
+            self.error = e
+            self.proc.kill()
+
+    def write(self, data: bytes) -> int:
+        if self.aborted:
+            return len(data)
+        assert self.proc.stdin is not None  # mypy
+        return self.proc.stdin.write(data)
+
+    def close(self) -> None:
+        """Wait for `zstd` to compress the remaining data"""
+        assert self.proc.stdin is not None  # mypy
+        self.proc.stdin.close()
+        self.reader.join()
+        if self.error is not None:
+            raise self.error
+        if self.proc.wait() != 0:
+            raise DownloadError(f"'zstd' failed with exit code {self.proc.returncode}")
+
+    def abort(self) -> None:
+        """Discard the data that is written from now on"""
+        self.aborted = True
+        self.proc.kill()
+        self.reader.join()
+        self.proc.wait()
+
+
+class DownloadArchive:
+    """A compressed archive of a download, which is written while the files are being downloaded.
+
+    Files and directories that are complete are added with `add`, and written to the archive on
+    a background thread, e.g. while container images are still being fetched. When the archive is
+    closed, it adds the files of the download directory that have not been added yet.
+    Tar archives are compressed in parallel blocks, and the MD5 checksum of the archive
+    is computed while it is written.
+
+    Args:
+        output_filename (Path): The archive file
+        compress_type (str): The type of archive, one of `COMPRESSION_TYPES`
+        download_dir (Path): The directory of the download, which is archived under its name
+        threads (int | None): The number of compression threads, defaults to the number of CPUs
+    """
+
+    def __init__(self, output_filename: Path, compress_type: str, download_dir: Path, threads: int | None = None):
+        if compress_type not in COMPRESSION_TYPES:
+            raise DownloadError(f"Unknown compression type '{compress_type}'")
+        self.output_filename = output_filename
+        self.compress_type = compress_type
+        self.download_dir = download_dir
+        threads = threads or os.cpu_count() or 1
+
+        self.sink = HashingFile(output_filename)
+        self.compressor: ParallelBlockWriter | ZstdProcessWriter | None = None
+        self.tar: tarfile.TarFile | None = None
+        self.zip: ZipFile | None = None
+        try:
+            if compress_type == "zip":
+                # The sink can't seek, so the sizes of the files follow their data
+                self.zip = ZipFile(self.sink, "w")  # type: ignore[arg-type]
+            else:
+                if compress_type == "tar.gz":
+                    self.compressor = ParallelGzipWriter(self.sink, threads)
+                elif compress_type == "tar.bz2":
+                    self.compressor = ParallelBzip2Writer(self.sink, threads)
+                else:
+                    self.compressor = ZstdProcessWriter(self.sink, threads)
+                self.tar = tarfile.open(fileobj=self.compressor, mode="w|")  # type: ignore[call-overload]
+        except BaseException:
+            self.sink.close()
+            self.output_filename.unlink()
+            raise
+
+        # The paths that have been archived, relative to the download directory
+        self.archived: set[Path] = set()
+        self.queue: queue.Queue[Path | None] = queue.Queue()
+        self.error: BaseException | None = None
+        self.writer = threading.Thread(target=self.write_queued, daemon=True)
+        self.writer.start()
+
+    def __repr__(self) -> str:
+        return f"<DownloadArchive {self.output_filename}>"
+
+    @property
+    def extract_command(self) -> str:
+        """The command to extract the archive"""
+        return f"{COMPRESSION_TYPES[self.compress_type]} {self.output_filename}"
+
+    def add(self, path: Path) -> None:
+        """Add a complete file or directory of the download to the archive. May be called from any thread.
+
+        Args:
+            path (Path): The file or directory, which must not change anymore
+        """
+        self.queue.put(path)
+
+    def write_queued(self) -> None:
+        """Write the queued paths to the archive, until None is queued"""
+        while (path := self.queue.get()) is not None:
+            if self.error is None:
+                try:
+                    self.write_path(path)
+                except BaseException as e:
+                    # Raised by close, as the queue can't be left unconsumed
+                    self.error = e
+
+    def write_path(self, path: Path) -> None:
+        """Write a file or directory to the archive, with the directories that contain it"""
+        try:
+            relative_path = path.absolute().relative_to(self.download_dir.absolute())
+        except ValueError:
+            log.debug(f"Not archiving '{path}', as it is outside of '{self.download_dir}'")
+            return
+        for parent in reversed(relative_path.parents):
+            self.write_entry(parent)
+        self.write_entry(relative_path)
+        if path.is_dir() and not path.is_symlink():
+            for dirpath, dirnames, filenames in os.walk(path):
+                dirnames.sort()
+                for name in [*dirnames, *sorted(filenames)]:
+                    self.write_entry(relative_path / Path(dirpath, name).relative_to(path))
+
+    def write_entry(self, relative_path: Path) -> None:
+        """Write a single file, link or directory to the archive, unless it was written before or is excluded"""
+        if relative_path in self.archived or any(
+            fnmatch.fnmatch(relative_path.name, pattern) for pattern in EXCLUDED_FILES
+        ):
+            return
+        self.archived.add(relative_path)
+        path = self.download_dir / relative_path
+        if self.tar is not None:
+            self.tar.add(path, arcname=str(Path(self.download_dir.name, relative_path)), recursive=False)
+        elif self.zip is not None and not path.is_dir():
+            # Zip archives only have files, with their path as given on the command line
+            self.zip.write(path)
+
+    def close(self) -> str:
+        """Add the rest of the download directory and finish the archive
+
+        Returns:
+            str: The MD5 checksum of the archive
+        """
+        self.add(self.download_dir)
+        self.queue.put(None)
+        self.writer.join()
+        try:
+            if self.error is not None:
+                raise self.error
+            if self.tar is not None:
+                self.tar.close()
+            if self.zip is not None:
+                self.zip.close()
+            if self.compressor is not None:
+                self.compressor.close()
+        except BaseException:
+            self.abort()
+            raise
+        self.sink.close()
+        return self.sink.md5.hexdigest()
+
+    def abort(self) -> None:
+        """Stop writing the archive and delete it"""
+        # Writes to the closed archive fail, which stops the writer thread
+        self.sink.close()
+        if self.compressor is not None:
+            self.compressor.abort()
+        if self.writer.is_alive():
+            self.queue.put(None)
+            self.writer.join()
+        self.output_filename.unlink(missing_ok=True)
@@ -1,7 +1,9 @@
+import concurrent.futures
 import contextlib
 import logging
+import os
 import re
-import shutil
+import threading
 from abc import ABC, abstractmethod
 from collections.abc import Callable, Collection, Container, Generator, Iterable
 from pathlib import Path
@@ -9,7 +11,8 @@ from pathlib import Path
 import rich.progress
 
 import nf_core.utils
-from nf_core.pipelines.download.utils import intermediate_file
+from nf_core.pipelines.download.utils import DownloadError, ImageManifest, intermediate_file
+from nf_core.utils import copy_file_data
 
 log = logging.getLogger(__name__)
 
@@ -220,6 +223,18 @@ class ContainerFetcher(ABC):
         self.cache_dir = cache_dir
         self.amend_cachedir = amend_cachedir
         self.parallel = parallel
+        # Set NFCORE_DOWNLOAD_IMAGE_LINKS to 'hardlink' to hard link the images instead of copying them,
+        # so that the cache and the output share the images on disk
+        self.hardlink_images = os.environ.get("NFCORE_DOWNLOAD_IMAGE_LINKS") == "hardlink"
+
+        # Called with each image that is complete in the output directory, e.g. to archive it
+        self.image_ready_callback: Callable[[Path], None] | None = None
+
+        # The copy stage of fetch_containers, see container_fetched
+        self.copy_pool: concurrent.futures.ThreadPoolExecutor | None = None
+        self.copy_futures: list[concurrent.futures.Future] = []
+        self.copies_after_fetch: dict[Path, list[tuple[str, Path, Path]]] = {}
+        self.copy_lock = threading.Lock()
 
         self.hide_progress = hide_progress
         self.progress_factory = progress_factory
@@ -410,7 +425,7 @@ class ContainerFetcher(ABC):
                 cache_path = self.cache_dir / container_filename if self.cache_dir is not None else None
 
                 # Get the container from the library
-                if library_path and library_path.exists():
+                if library_path and library_path.exists() and self.image_unchanged(library_path):
                     # Update the cache if needed
                     if cache_path and not cache_path.exists() and self.amend_cachedir:
                         containers_copy.append((container, library_path, cache_path))
@@ -420,7 +435,9 @@ class ContainerFetcher(ABC):
                         containers_copy.append((container, library_path, output_path))
 
                 # Get the container from the cache
-                elif cache_path and cache_path.exists() and not self.amend_cachedir:
+                elif (
+                    cache_path and cache_path.exists() and not self.amend_cachedir and self.image_unchanged(cache_path)
+                ):
                     log.debug(f"Container '{container_filename}' found in cache at '{cache_path}'.")
                     containers_copy.append((container, cache_path, output_path))
 
@@ -443,30 +460,101 @@ class ContainerFetcher(ABC):
 
             self.progress.update_main_task(total=total_tasks)
 
-            # Fetch containers from a remote location
-            if containers_remote_fetch:
-                self.progress.add_remote_fetch_task(
-                    total=len(containers_remote_fetch),
-                    description=f"Fetch remote {self.implementation} images",
-                )
-                self.fetch_remote_containers(containers_remote_fetch, parallel=self.parallel)
-                self.progress.remove_remote_fetch_task()
-
-            # Copy containers
+            # Copy containers while the remote containers are fetched. Images that are fetched
+            # into the cache are copied from there as soon as their fetch has finished
+            fetch_paths = {output_path for _, output_path in containers_remote_fetch}
+            self.copies_after_fetch = {}
+            self.copy_futures = []
+            with concurrent.futures.ThreadPoolExecutor(max_workers=self.parallel) as self.copy_pool:
+                try:
+                    if containers_copy:
+                        self.progress.add_copy_task(
+                            total=len(containers_copy),
+                            description="Copy container images from/to cache",
+                        )
+                    for container, src_path, dest_path in containers_copy:
+                        if src_path in fetch_paths:
+                            self.copies_after_fetch.setdefault(src_path, []).append((container, src_path, dest_path))
+                        else:
+                            self.submit_copy(container, src_path, dest_path)
+
+                    # Fetch containers from a remote location
+                    if containers_remote_fetch:
+                        # Images that are replaced by the fetch lose their recorded checksums
+                        for directory in {output_path.parent for output_path in fetch_paths}:
+                            ImageManifest(directory).discard(
+                                output_path for output_path in fetch_paths if output_path.parent == directory
+                            )
+                        self.progress.add_remote_fetch_task(
+                            total=len(containers_remote_fetch),
+                            description=f"Fetch remote {self.implementation} images",
+                        )
+                        self.fetch_remote_containers(containers_remote_fetch, parallel=self.parallel)
+                        self.progress.remove_remote_fetch_task()
+
+                    # Copy the images whose fetch was not reported, e.g. as it failed
+                    for fetch_path in list(self.copies_after_fetch):
+                        self.container_fetched(fetch_path)
+                    for future in self.copy_futures:
+                        future.result()
+                except BaseException:
+                    # Don't start the copies that are still waiting, e.g. after ctrl-c
+                    self.copy_pool.shutdown(cancel_futures=True)
+                    raise
             if containers_copy:
-                self.progress.add_copy_task(
-                    total=len(containers_copy),
-                    description="Copy container images from/to cache",
-                )
-                for container, src_path, dest_path in containers_copy:
-                    self.copy_image(container, src_path, dest_path)
-                    self.progress.advance_copy_task()
                 self.progress.remove_copy_task()
+            self.copy_pool = None
 
             self.progress.remove_main_task()
         # Unset the progress bar, so that we get an AssertionError if we access it after it is closed
         self.progress = None
 
+    def image_unchanged(self, image_path: Path) -> bool:
+        """
+        Check an image in the library or cache against the checksums recorded when it was downloaded.
+
+        The check compares the size and modification time of the image with the `ImageManifest`
+        of its directory, and only reads the image if its modification time has changed, see
+        `ImageManifest.verify`. Images without a recorded checksum are trusted.
+        """
+        if ImageManifest.verify(image_path) is False:
+            log.warning(f"Ignoring '{image_path}', as it has changed since it was downloaded.")
+            return False
+        return True
+
+    def submit_copy(self, container: str, src_path: Path, dest_path: Path) -> None:
+        """Copy a container image in the copy stage of `fetch_containers`"""
+
+        assert self.copy_pool is not None  # mypy
+
+        def copy() -> None:
+            self.copy_image(container, src_path, dest_path)
+            self.progress.advance_copy_task()
+
+        self.copy_futures.append(self.copy_pool.submit(copy))
+
+    def container_fetched(self, output_path: Path) -> None:
+        """
+        Start the copies of an image that has been fetched from a remote location.
+
+        Subclasses call this from `fetch_remote_containers` when an image is complete,
+        so that it is copied while the other images are still being fetched.
+        It may be called from any thread.
+
+        Args:
+            output_path (Path): The path that the image was fetched to
+        """
+        self.image_ready(output_path)
+        with self.copy_lock:
+            copies = self.copies_after_fetch.pop(output_path, [])
+            for container, src_path, dest_path in copies:
+                self.submit_copy(container, src_path, dest_path)
+
+    def image_ready(self, image_path: Path) -> None:
+        """Pass an image to `image_ready_callback` if it is a complete image in the output directory"""
+        if self.image_ready_callback is not None and image_path.parent == self.get_container_output_dir():
+            self.image_ready_callback(image_path)
+
     @abstractmethod
     def fetch_remote_containers(self, containers: list[tuple[str, Path]], parallel: int = 4) -> None:
         """
@@ -480,14 +568,49 @@ class ContainerFetcher(ABC):
         pass
 
     def copy_image(self, container: str, src_path: Path, dest_path: Path) -> None:
-        """Copy container image from one directory to another."""
+        """
+        Copy container image from one directory to another.
+
+        The image is hard linked instead if `self.hardlink_images` is set and both directories
+        are on the same file system. Otherwise the copy shares the data copy-on-write where the
+        file system supports it, and is copied in the kernel where possible, see `copy_file_data`.
+        """
         # Check that the source path exists
         if not src_path.exists():
             log.error(f"Image '{container}' does not exist")
             return
 
-        with intermediate_file(dest_path) as dest_path_tmp:
-            shutil.copyfile(src_path, dest_path_tmp.name)
+        if not (self.hardlink_images and self.link_image(src_path, dest_path)):
+            with intermediate_file(dest_path) as dest_path_tmp, open(src_path, "rb") as src:
+                copy_file_data(src, dest_path_tmp.file)
+
+        # The copy has the same checksum as its source
+        resolved_src_path = src_path.resolve()
+        sha256 = ImageManifest(resolved_src_path.parent).checksum(resolved_src_path)
+        if sha256 is not None:
+            ImageManifest(dest_path.parent).add(dest_path, sha256)
+        else:
+            ImageManifest(dest_path.parent).discard([dest_path])
+        self.image_ready(dest_path)
+
+    @staticmethod
+    def link_image(src_path: Path, dest_path: Path) -> bool:
+        """
+        Hard link a container image into another directory.
+
+        Returns:
+            bool: Whether the image was linked. Images can not be linked across file systems
+        """
+        if dest_path.is_dir():
+            raise DownloadError(f"Output path '{dest_path}' is a directory")
+        tmp_path = dest_path.with_name(f".{dest_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            os.link(src_path.resolve(), tmp_path)
+        except OSError as e:
+            log.debug(f"Could not hard link '{src_path}' to '{dest_path}', copying it instead: {e}")
+            return False
+        os.replace(tmp_path, dest_path)
+        return True
 
     def cleanup(self) -> None:
         """
@@ -197,6 +197,7 @@ class DockerFetcher(ContainerFetcher):
             # Update progress bar
             self.progress.advance(task)
             self.progress.remove_task(task)
+            self.container_fetched(output_path)
 
         except (DockerError.InvalidTagError, DockerError.ImageNotFoundError) as e:
             log.error(e.message)
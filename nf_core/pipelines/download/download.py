@@ -6,10 +6,9 @@ import logging
 import os
 import re
 import shutil
-import tarfile
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Literal
+from typing import Any
 from zipfile import ZipFile
 
 import questionary
@@ -19,6 +18,7 @@ import rich
 import nf_core
 import nf_core.pipelines.list
 import nf_core.utils
+from nf_core.pipelines.download.archive import COMPRESSION_TYPES, DownloadArchive
 from nf_core.pipelines.download.container_fetcher import ContainerFetcher
 from nf_core.pipelines.download.docker import DockerFetcher
 from nf_core.pipelines.download.singularity import SINGULARITY_CACHE_DIR_ENV_VAR, SingularityFetcher
@@ -102,6 +102,8 @@ class DownloadWorkflow:
         self.output_filename: Path | None = None
 
         self.compress_type = compress_type
+        # The archive is written while the files are downloaded
+        self.archive: DownloadArchive | None = None
         self.force = force
         self.hide_progress = hide_progress
         self.platform = platform
@@ -309,32 +311,50 @@ class DownloadWorkflow:
     def download_workflow_static(self) -> None:
         """Downloads a nf-core workflow from GitHub to the local file system in a self-contained manner."""
 
-        # Download the centralised configs first
-        if self.include_configs:
-            log.info("Downloading centralised configs from GitHub")
-            self.download_configs()
-
-        # Download the pipeline files for each selected revision
-        log.info("Downloading workflow files from GitHub")
-
-        for revision, wf_sha, download_url in zip(self.revision, self.wf_sha.values(), self.wf_download_url.values()):
-            revision_dirname = self.download_wf_files(revision=revision, wf_sha=wf_sha, download_url=download_url)
+        # Compress the files into an archive while the rest is downloaded
+        if self.compress_type is not None:
+            self.start_archive()
 
+        try:
+            # Download the centralised configs first
             if self.include_configs:
-                try:
-                    self.wf_use_local_configs(revision_dirname)
-                except FileNotFoundError as e:
-                    raise DownloadError("Error editing pipeline config file to use local configs!") from e
+                log.info("Downloading centralised configs from GitHub")
+                self.download_configs()
+                if self.archive is not None:
+                    self.archive.add(self.outdir / "configs")
 
-            # Collect all required container images
-            if self.container_system in {"singularity", "docker"}:
-                workflow_directory = self.outdir / revision_dirname
-                self.find_container_images(workflow_directory, revision)
+            # Download the pipeline files for each selected revision
+            log.info("Downloading workflow files from GitHub")
 
-                try:
-                    self.download_container_images(workflow_directory, revision)
-                except OSError as e:
-                    raise DownloadError(f"[red]{e}[/]") from e
+            for revision, wf_sha, download_url in zip(
+                self.revision, self.wf_sha.values(), self.wf_download_url.values()
+            ):
+                revision_dirname = self.download_wf_files(revision=revision, wf_sha=wf_sha, download_url=download_url)
+
+                if self.include_configs:
+                    try:
+                        self.wf_use_local_configs(revision_dirname)
+                    except FileNotFoundError as e:
+                        raise DownloadError("Error editing pipeline config file to use local configs!") from e
+
+                # Collect all required container images
+                if self.container_system in {"singularity", "docker"}:
+                    workflow_directory = self.outdir / revision_dirname
+                    self.find_container_images(workflow_directory, revision)
+
+                    try:
+                        self.download_container_images(workflow_directory, revision)
+                    except OSError as e:
+                        raise DownloadError(f"[red]{e}[/]") from e
+
+                # Looking for the containers can write to the workflow files, so they are archived afterwards
+                if self.archive is not None:
+                    self.archive.add(self.outdir / revision_dirname)
+        except BaseException:
+            if self.archive is not None:
+                self.archive.abort()
+                self.archive = None
+            raise
 
         # Compress into an archive
         if self.compress_type is not None:
@@ -554,12 +574,7 @@ class DownloadWorkflow:
                 )
             self.compress_type = questionary.select(
                 "Choose compression type:",
-                choices=[
-                    "none",
-                    "tar.gz",
-                    "tar.bz2",
-                    "zip",
-                ],
+                choices=["none", *COMPRESSION_TYPES],
                 style=nf_core.utils.nfcore_question_style,
             ).unsafe_ask()
 
@@ -722,38 +737,31 @@ class DownloadWorkflow:
             if self.container_fetcher is not None:
                 self.container_fetcher.fetch_containers(self.containers, self.containers_remote, workflow_directory)
 
-    def compress_download(self) -> None:
-        """Take the downloaded files and make a compressed .tar.gz archive."""
+    def start_archive(self) -> None:
+        """Start the compressed archive, and add the container images to it as they are fetched."""
+        assert self.output_filename is not None and self.compress_type is not None  # mypy
         log.debug(f"Creating archive: {self.output_filename}")
+        self.archive = DownloadArchive(self.output_filename, self.compress_type, self.outdir)
+        if self.container_fetcher is not None:
+            self.container_fetcher.image_ready_callback = self.archive.add
 
-        # .tar.gz and .tar.bz2 files
-        if self.compress_type in ["tar.gz", "tar.bz2"]:
-            ctype_and_mode: dict[str, tuple[Literal["gz", "bz2"], Literal["w:gz", "w:bz2"]]] = {
-                "tar.gz": ("gz", "w:gz"),
-                "tar.bz2": ("bz2", "w:bz2"),
-            }  # This ugly thing is required for typing
-            ctype, mode = ctype_and_mode[self.compress_type]
-            with tarfile.open(self.output_filename, mode) as tar:
-                tar.add(self.outdir, arcname=self.outdir.name)
-            tar_flags = "xzf" if ctype == "gz" else "xjf"
-            log.info(f"Command to extract files: [bright_magenta]tar -{tar_flags} {self.output_filename}[/]")
-
-        # .zip files
-        if self.compress_type == "zip":
-            assert self.output_filename is not None  # mypy
-            with ZipFile(self.output_filename, "w") as zip_file:
-                # Iterate over all the files in directory
-                for folder_name, _, filenames in os.walk(self.outdir):
-                    for filename in filenames:
-                        # create complete filepath of file in directory
-                        file_path = Path(folder_name) / filename
-                        # Add file to zip
-                        zip_file.write(file_path)
-            log.info(f"Command to extract files: [bright_magenta]unzip {self.output_filename}[/]")
+    def compress_download(self) -> None:
+        """Finish the compressed archive of the downloaded files, and delete the files.
+
+        The archive is written in parallel compressed blocks (or by a multithreaded `zstd` for
+        .tar.zst files), and its MD5 checksum is computed while it is written.
+        """
+        if self.archive is None:
+            self.start_archive()
+        assert self.archive is not None  # mypy
+        archive, self.archive = self.archive, None
+        if self.container_fetcher is not None:
+            self.container_fetcher.image_ready_callback = None
+        md5 = archive.close()
+        log.info(f"Command to extract files: [bright_magenta]{archive.extract_command}[/]")
 
         # Delete original files
         log.debug(f"Deleting uncompressed files: '{self.outdir}'")
         shutil.rmtree(self.outdir)
 
-        # Calculate md5sum for output file
-        log.info(f"MD5 checksum for '{self.output_filename}': [blue]{nf_core.utils.file_md5(self.output_filename)}[/]")
+        log.info(f"MD5 checksum for '{self.output_filename}': [blue]{md5}[/]")
@@ -7,6 +7,7 @@ import os
 import re
 import shutil
 import subprocess
+import time
 from collections.abc import Callable, Iterable
 from pathlib import Path
 
@@ -20,7 +21,8 @@ from nf_core.pipelines.download.container_fetcher import ContainerFetcher, Conta
 from nf_core.pipelines.download.utils import (
     ContainerRegistryUrls,
     DownloadError,
-    intermediate_file,
+    ImageManifest,
+    PartialDownload,
     intermediate_file_no_creation,
 )
 
@@ -35,6 +37,13 @@ stderr = rich.console.Console(
 SINGULARITY_CACHE_DIR_ENV_VAR = "NXF_SINGULARITY_CACHEDIR"
 SINGULARITY_LIBRARY_DIR_ENV_VAR = "NXF_SINGULARITY_LIBRARYDIR"
 
+# Number of times an interrupted download is resumed before giving up
+DOWNLOAD_RETRIES = 3
+# Seconds to wait before resuming an interrupted download, doubled with every attempt
+DOWNLOAD_RETRY_DELAY = 2.0
+# Files of at least this size are downloaded as several byte ranges in parallel, if enabled
+RANGED_DOWNLOAD_MIN_SIZE = 256 * 1024 * 1024
+
 
 class SingularityProgress(ContainerProgress):
     def get_task_types_and_columns(self):
@@ -492,6 +501,7 @@ class SingularityFetcher(ContainerFetcher):
 
             if status == FileDownloader.Status.DONE:
                 self.symlink_registries(output_path)
+                self.container_fetched(output_path)
 
         downloader.download_files_in_parallel(containers_download, parallel_downloads, callback=update_file_progress)
 
@@ -509,6 +519,7 @@ class SingularityFetcher(ContainerFetcher):
             for library in self.container_library[:]:
                 try:
                     self.pull_image(container, output_path, library)
+                    self.container_fetched(output_path)
                     # Pulling the image was successful, no SingularityError was raised, break the library loop
                     break
 
@@ -776,14 +787,26 @@ class FileDownloader:
     # Enum to report the status of a download thread
     Status = enum.Enum("Status", "CANCELLED PENDING RUNNING DONE ERROR")
 
-    def __init__(self, progress: ContainerProgress) -> None:
+    def __init__(self, progress: ContainerProgress, parallel_ranges: int | None = None) -> None:
         """Initialise the FileDownloader object.
 
         Args:
             progress (DownloadProgress): The progress bar object to use for tracking downloads.
+            parallel_ranges (int): The number of byte ranges to download large files in.
+                Defaults to the NFCORE_DOWNLOAD_PARALLEL_RANGES environment variable, or 1.
         """
         self.progress = progress
         self.kill_with_fire = False
+        if parallel_ranges is None:
+            parallel_ranges = int(os.environ.get("NFCORE_DOWNLOAD_PARALLEL_RANGES", 1))
+        self.parallel_ranges = parallel_ranges
+        # All downloads share one session, so that connections to the same server are reused
+        with requests_cache.disabled():
+            # Caching breaks streamed downloads
+            self.session = requests.Session()
+        # Size of the connection pool of each server, see set_connection_limit
+        self.pool_maxsize: int | None = None
+        self.set_connection_limit(1)
 
     def parse_future_status(self, future: concurrent.futures.Future) -> Status:
         """Parse the status of a future object."""
@@ -806,6 +829,34 @@ class FileDownloader:
         else:
             return parts[-1][:50]
 
+    def set_connection_limit(self, parallel_downloads: int) -> None:
+        """Size the connection pools of the session for a number of parallel downloads.
+
+        urllib3 keeps a separate pool of keep-alive connections for each server (scheme, host and port),
+        so `pool_maxsize` is a per-host limit: one connection for each byte range of each parallel download.
+        With `pool_block`, downloads wait for a free connection instead of opening more connections to the
+        same server. At least one pool is kept for each parallel download, so that the pools of the servers
+        that are downloaded from are not dropped, together with their limit, while they are in use.
+
+        The pools are kept if their size does not change, so that later downloads reuse the connections.
+
+        Args:
+            parallel_downloads (int): Number of parallel downloads
+        """
+        pool_maxsize = parallel_downloads * self.parallel_ranges
+        if self.pool_maxsize == pool_maxsize:
+            return
+        self.pool_maxsize = pool_maxsize
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=max(parallel_downloads, requests.adapters.DEFAULT_POOLSIZE),
+            pool_maxsize=pool_maxsize,
+            pool_block=True,
+        )
+        for prefix in ["https://", "http://"]:
+            if prefix in self.session.adapters:
+                self.session.adapters[prefix].close()
+            self.session.mount(prefix, adapter)
+
     def download_files_in_parallel(
         self,
         download_files: Iterable[tuple[str, Path]],
@@ -823,6 +874,7 @@ class FileDownloader:
 
         # Make ctrl-c work with multi-threading
         self.kill_with_fire = False
+        self.set_connection_limit(parallel_downloads)
 
         # Track the download threads
         future_downloads: dict[concurrent.futures.Future, tuple[str, Path]] = {}
@@ -877,6 +929,16 @@ class FileDownloader:
         Use native Python to download the file. Progress is shown in the progress bar
         as a new task (of type "download").
 
+        If the server supports range requests, interrupted downloads are resumed: up to
+        `DOWNLOAD_RETRIES` times during this call, with exponential backoff, and by later calls
+        for the same URL and output path. Responses of busy or failing servers are retried as well.
+        The partial download is only discarded if the file has changed on the server.
+        Files of at least `RANGED_DOWNLOAD_MIN_SIZE` bytes are downloaded as `self.parallel_ranges`
+        byte ranges in parallel.
+
+        The SHA-256 checksum of the file is computed while it is downloaded and recorded
+        in the `ImageManifest` of the output directory.
+
         This method is integrated with the above `download_files_in_parallel` method. The
         `self.kill_with_fire` variable is a sentinel used to check if the user has hit ctrl-c.
 
@@ -890,30 +952,165 @@ class FileDownloader:
         nice_name = self.nice_name(remote_path)
 
         with self.progress.sub_task(nice_name, start=False, total=False, progress_type="download") as task:
-            # Open file handle and download
-            # This temporary will be automatically renamed to the target if there are no errors
-            with intermediate_file(output_path) as fh:
-                # Disable caching as this breaks streamed downloads
-                with requests_cache.disabled():
-                    r = requests.get(remote_path, allow_redirects=True, stream=True, timeout=60 * 5)
-                    filesize = r.headers.get("Content-length")
-                    if filesize:
-                        self.progress.update(task, total=int(filesize))
-                        self.progress.start_task(task)
-
-                    # Stream download
-                    has_content = False
-                    for data in r.iter_content(chunk_size=io.DEFAULT_BUFFER_SIZE):
-                        # Check that the user didn't hit ctrl-c
+            # The downloaded data is kept in partial files until the download is complete
+            download = PartialDownload(output_path, remote_path)
+            try:
+                for attempt in itertools.count():
+                    try:
+                        self.download_parts(download, task)
+                        break
+                    except (
+                        requests.exceptions.ConnectionError,
+                        requests.exceptions.ChunkedEncodingError,
+                        requests.exceptions.Timeout,
+                        requests.exceptions.HTTPError,
+                    ) as e:
+                        # Downloads that can't be resumed can only be retried if nothing was downloaded yet
+                        if (
+                            attempt >= DOWNLOAD_RETRIES
+                            or (download.parts and not download.resumable)
+                            or not self.is_transient_error(e)
+                        ):
+                            raise
+                        delay = self.retry_delay(e, attempt)
+                        log.debug(f"Download of '{remote_path}' was interrupted, resuming in {delay:.0f}s: {e}")
+                        time.sleep(delay)
+                        # Check that the user didn't hit ctrl-c while waiting
                         if self.kill_with_fire:
                             raise KeyboardInterrupt
-                        self.progress.update(task, advance=len(data))
-                        fh.write(data)
-                        has_content = True
+                sha256 = download.join()
+            except DownloadError:
+                download.discard()
+                raise
+            except BaseException:
+                # Keep the downloaded data if the download can be resumed later
+                if not download.resumable:
+                    download.discard()
+                raise
+            ImageManifest(output_path.parent).add(output_path, sha256)
+
+    @staticmethod
+    def is_transient_error(e: requests.exceptions.RequestException) -> bool:
+        """Whether a download that failed with this error can be retried.
+
+        Interrupted connections can be retried, and so can responses of busy or failing servers.
+        """
+        if isinstance(e, requests.exceptions.HTTPError):
+            return e.response is not None and (e.response.status_code == 429 or e.response.status_code >= 500)
+        return True
+
+    @staticmethod
+    def retry_delay(e: requests.exceptions.RequestException, attempt: int) -> float:
+        """The seconds to wait before retrying a download: as asked for by the server, or with exponential backoff"""
+        response = e.response if isinstance(e, requests.exceptions.HTTPError) else None
+        if response is not None and response.headers.get("Retry-After", "").isdigit():
+            return float(response.headers["Retry-After"])
+        return DOWNLOAD_RETRY_DELAY * 2**attempt
+
+    def download_parts(self, download: PartialDownload, task: rich.progress.TaskID) -> None:
+        """Download the parts of a file that are missing, starting a new download if there are none.
+
+        Args:
+            download (PartialDownload): The state of the download
+            task (rich.progress.TaskID): The progress bar task of the download
+        """
+        if download.parts:
+            # Resume an interrupted download
+            missing = [
+                index
+                for index, (start, end) in enumerate(download.parts)
+                if end is None or start + download.downloaded(index) <= end
+            ]
+            completed = sum(download.downloaded(index) for index in range(len(download.parts)))
+            self.progress.update(task, total=download.size, completed=completed)
+            self.progress.start_task(task)
+        else:
+            with self.session.get(download.url, allow_redirects=True, stream=True, timeout=60 * 5) as r:
+                # Error pages must not be written to the image
+                r.raise_for_status()
+                filesize = r.headers.get("Content-length")
+                size = int(filesize) if filesize else None
+                if size:
+                    self.progress.update(task, total=size)
+                    self.progress.start_task(task)
+                # Byte ranges refer to the encoded content, so can only be used for unencoded files of known size.
+                # Weak ETags can't be used with If-Range, so the Last-Modified date is used instead.
+                etag = r.headers.get("ETag")
+                if etag is not None and etag.startswith("W/"):
+                    etag = None
+                validator = etag or r.headers.get("Last-Modified")
+                if (
+                    not size
+                    or r.headers.get("Accept-Ranges") != "bytes"
+                    or r.headers.get("Content-Encoding", "identity") != "identity"
+                ):
+                    validator = None
+                if (
+                    validator is not None
+                    and size is not None
+                    and self.parallel_ranges > 1
+                    and size >= RANGED_DOWNLOAD_MIN_SIZE
+                ):
+                    part_size = -(-size // self.parallel_ranges)
+                    download.start(
+                        size,
+                        validator,
+                        [(start, min(start + part_size, size) - 1) for start in range(0, size, part_size)],
+                    )
+                    missing = list(range(len(download.parts)))
+                else:
+                    download.start(size, validator, [(0, size - 1 if size else None)])
+                    self.write_part(download, 0, r, task)
+                    return
+
+        def download_part(index: int) -> None:
+            start, end = download.parts[index]
+            with self.session.get(
+                download.url,
+                headers={"Range": f"bytes={start + download.downloaded(index)}-{end}", "If-Range": download.validator},
+                allow_redirects=True,
+                stream=True,
+                timeout=60 * 5,
+            ) as r:
+                # The full file is sent instead of the range if it no longer matches the validator
+                if r.status_code in (200, 412):
+                    raise DownloadError(
+                        f"'{download.url}' has changed since it was partially downloaded, please try again"
+                    )
+                # Other errors keep the downloaded parts, to retry them
+                r.raise_for_status()
+                if r.status_code != 206:
+                    raise requests.exceptions.HTTPError(
+                        f"Unexpected status code {r.status_code} for a range of '{download.url}'", response=r
+                    )
+                self.write_part(download, index, r, task)
 
-                    # Check that we actually downloaded something
-                    if not has_content:
-                        raise DownloadError(f"Downloaded file '{remote_path}' is empty")
+        if len(missing) > 1:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=len(missing)) as pool:
+                # Raise the first exception of the parts
+                list(pool.map(download_part, missing))
+        elif missing:
+            download_part(missing[0])
 
-                # Set image file permissions to user=read,write,execute group/all=read,execute
-                os.chmod(fh.name, 0o755)
+    def write_part(
+        self, download: PartialDownload, index: int, r: requests.Response, task: rich.progress.TaskID
+    ) -> None:
+        """Append the content of a response to a part of a download.
+
+        Args:
+            download (PartialDownload): The state of the download
+            index (int): The index of the part
+            r (requests.Response): The streamed response with the content of the part
+            task (rich.progress.TaskID): The progress bar task of the download
+        """
+        if index == 0:
+            download.catch_up_checksum()
+        with open(download.part_path(index), "ab") as fh:
+            for data in r.iter_content(chunk_size=io.DEFAULT_BUFFER_SIZE):
+                # Check that the user didn't hit ctrl-c
+                if self.kill_with_fire:
+                    raise KeyboardInterrupt
+                self.progress.update(task, advance=len(data))
+                fh.write(data)
+                if index == 0:
+                    download.update_checksum(data)
@@ -1,15 +1,29 @@
 import contextlib
+import glob
+import hashlib
 import importlib.resources
+import io
+import json
 import logging
 import os
 import shutil
+import sys
 import tempfile
-from collections.abc import Generator
+import threading
+from collections.abc import Generator, Iterable
 from enum import Enum
 from pathlib import Path
 
+from nf_core.utils import atomic_write
+
+if sys.platform != "win32":
+    import fcntl
+
 log = logging.getLogger(__name__)
 
+# File in each image directory with the checksums of the downloaded images, see ImageManifest
+IMAGE_MANIFEST_FILENAME = ".nf-core-images.json"
+
 
 class ContainerRegistryUrls(Enum):
     SEQERA_DOCKER = "community.wave.seqera.io/library"
@@ -59,6 +73,276 @@ def intermediate_file(output_path: Path) -> Generator[tempfile._TemporaryFileWra
         raise
 
 
+class PartialDownload:
+    """The state of a download that can be resumed after it was interrupted.
+
+    The file is downloaded as one or more byte ranges (parts) to '<output_path>.partial.<part>' files,
+    which are joined into the output file once they are complete. The URL, size and validator (ETag or
+    Last-Modified header) of the remote file and the byte ranges of the parts are kept in
+    '<output_path>.partial.json', so that a later download of the same URL continues where this one stopped.
+    The state is only kept if the server supports range requests.
+
+    The SHA-256 checksum of the file is computed while the first part is downloaded,
+    and completed with the other parts while they are joined.
+
+    Args:
+        output_path (Path): The path of the downloaded file
+        url (str): The URL of the remote file
+    """
+
+    def __init__(self, output_path: Path, url: str) -> None:
+        if output_path.is_dir():
+            raise DownloadError(f"Output path '{output_path}' is a directory")
+        if output_path.is_symlink():
+            raise DownloadError(f"Output path '{output_path}' is a symbolic link")
+        self.output_path = output_path
+        self.url = url
+        self.state_path = output_path.with_name(f"{output_path.name}.partial.json")
+        self.size: int | None = None
+        self.validator: str | None = None
+        self.parts: list[tuple[int, int | None]] = []
+        # Checksum of the first part, and the number of bytes it covers
+        self.sha256 = hashlib.sha256()
+        self.hashed = 0
+        try:
+            with open(self.state_path) as fh:
+                state = json.load(fh)
+            if state["url"] == url:
+                self.size, self.validator = state["size"], state["validator"]
+                self.parts = [(start, end) for start, end in state["parts"]]
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            log.debug(f"Ignoring unreadable download state '{self.state_path}': {e}")
+        if not self.parts:
+            # Remove the leftovers of an earlier download of another URL
+            self.discard()
+
+    def __repr__(self) -> str:
+        return f"<PartialDownload of {self.url} to {self.output_path}>"
+
+    @property
+    def resumable(self) -> bool:
+        """Whether the download can be resumed with range requests"""
+        return self.validator is not None and bool(self.parts)
+
+    def part_path(self, index: int) -> Path:
+        """The file that a part is downloaded to"""
+        return self.output_path.with_name(f"{self.output_path.name}.partial.{index}")
+
+    def downloaded(self, index: int) -> int:
+        """The number of bytes of a part that have been downloaded"""
+        try:
+            return self.part_path(index).stat().st_size
+        except FileNotFoundError:
+            return 0
+
+    def start(self, size: int | None, validator: str | None, parts: list[tuple[int, int | None]]) -> None:
+        """Start a new download, discarding any earlier state
+
+        Args:
+            size (int | None): The size of the remote file, if known
+            validator (str | None): The ETag or Last-Modified header of the remote file,
+                or None if the download can not be resumed
+            parts (list[tuple[int, int | None]]): The first and last byte of each part
+        """
+        self.discard()
+        self.size, self.validator, self.parts = size, validator, parts
+        self.sha256, self.hashed = hashlib.sha256(), 0
+        if self.resumable:
+            atomic_write(
+                self.state_path, json.dumps({"url": self.url, "size": size, "validator": validator, "parts": parts})
+            )
+
+    def update_checksum(self, data: bytes) -> None:
+        """Add data that was appended to the first part to the checksum"""
+        self.sha256.update(data)
+        self.hashed += len(data)
+
+    def catch_up_checksum(self) -> None:
+        """Add the data of the first part that was downloaded before, e.g. by an interrupted run, to the checksum"""
+        if self.hashed == self.downloaded(0):
+            return
+        self.sha256, self.hashed = hashlib.sha256(), 0
+        with contextlib.suppress(FileNotFoundError), open(self.part_path(0), "rb") as fh:
+            for data in iter(lambda: fh.read(1024 * 1024), b""):
+                self.update_checksum(data)
+
+    def join(self) -> str:
+        """Join the downloaded parts into the output file
+
+        Returns:
+            str: The SHA-256 checksum of the output file
+        """
+        downloaded = sum(self.downloaded(index) for index in range(len(self.parts)))
+        if downloaded == 0:
+            raise DownloadError(f"Downloaded file '{self.url}' is empty")
+        if self.size is not None and downloaded != self.size:
+            raise DownloadError(f"Downloaded file '{self.url}' has {downloaded} bytes instead of {self.size}")
+        self.catch_up_checksum()
+        with open(self.part_path(0), "ab") as fh:
+            for index in range(1, len(self.parts)):
+                with open(self.part_path(index), "rb") as part_fh:
+                    for data in iter(lambda: part_fh.read(1024 * 1024), b""):
+                        fh.write(data)
+                        self.update_checksum(data)
+        # Set image file permissions to user=read,write,execute group/all=read,execute
+        self.part_path(0).chmod(0o755)
+        self.part_path(0).rename(self.output_path)
+        self.discard()
+        return self.sha256.hexdigest()
+
+    def discard(self) -> None:
+        """Remove the downloaded parts and the state of the download"""
+        for path in self.output_path.parent.glob(f"{glob.escape(self.output_path.name)}.partial.*"):
+            path.unlink(missing_ok=True)
+        self.parts = []
+
+
+class ImageManifest:
+    """The checksums of the container images in a directory.
+
+    The SHA-256 checksum of each downloaded image is recorded in '<directory>/.nf-core-images.json',
+    together with the size and modification time of the image. As long as these match the image,
+    it has not been changed since it was downloaded, and it can be reused without reading it again.
+
+    The directory can be shared by several nf-core commands, e.g. as the singularity cache, so the
+    manifest is locked with '<directory>/.nf-core-images.json.lock' while it is updated.
+
+    Args:
+        directory (Path): The directory with the images
+    """
+
+    # Serializes the updates of manifests by the download threads, other processes are locked out by process_lock
+    lock = threading.Lock()
+
+    def __init__(self, directory: Path) -> None:
+        self.path = Path(directory, IMAGE_MANIFEST_FILENAME)
+        self.lock_path = Path(f"{self.path}.lock")
+
+    def __repr__(self) -> str:
+        return f"<ImageManifest {self.path}>"
+
+    def load(self) -> dict[str, dict]:
+        """Read the entries of the manifest, by image file name"""
+        try:
+            with open(self.path) as fh:
+                entries = json.load(fh)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            log.debug(f"Ignoring unreadable image manifest '{self.path}': {e}")
+            return {}
+        return entries if isinstance(entries, dict) else {}
+
+    def add(self, image_path: Path, sha256: str) -> None:
+        """Record the checksum of an image in the directory
+
+        Args:
+            image_path (Path): The image
+            sha256 (str): The SHA-256 checksum of the image
+        """
+        stat = image_path.stat()
+        self.update({image_path.name: {"sha256": sha256, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}})
+
+    def discard(self, image_paths: Iterable[Path]) -> None:
+        """Remove the checksums of images that are about to be replaced
+
+        Args:
+            image_paths (Iterable[Path]): The images
+        """
+        self.update({image_path.name: None for image_path in image_paths})
+
+    @contextlib.contextmanager
+    def process_lock(self) -> Generator[None, None, None]:
+        """Locks the manifest against updates by other processes. Does not lock between processes on Windows."""
+        fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if sys.platform != "win32":
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            # Closing the file releases the lock
+            os.close(fd)
+
+    def update(self, changes: dict[str, dict | None]) -> None:
+        """Change the entries of the manifest, removing the entries that are set to None"""
+        try:
+            with self.lock, self.process_lock():
+                # Other processes may have changed the manifest, so merge with the current manifest
+                entries = self.load()
+                if all(entries.get(name) == entry for name, entry in changes.items()):
+                    return
+                for name, entry in changes.items():
+                    if entry is None:
+                        entries.pop(name, None)
+                    else:
+                        entries[name] = entry
+                atomic_write(self.path, json.dumps(entries, indent=2, sort_keys=True))
+        except OSError as e:
+            # The manifest is only an optimization, the images themselves are complete
+            log.debug(f"Could not update image manifest '{self.path}': {e}")
+
+    def checksum(self, image_path: Path) -> str | None:
+        """The recorded checksum of an image, if the image has not changed since it was recorded
+
+        Args:
+            image_path (Path): The image
+
+        Returns:
+            str | None: The SHA-256 checksum, or None if it is unknown or out of date
+        """
+        entry = self.load().get(image_path.name)
+        if not isinstance(entry, dict):
+            return None
+        try:
+            stat = image_path.stat()
+        except FileNotFoundError:
+            return None
+        if entry.get("size") != stat.st_size or entry.get("mtime_ns") != stat.st_mtime_ns:
+            return None
+        return entry.get("sha256")
+
+    @classmethod
+    def verify(cls, image_path: Path) -> bool | None:
+        """Check an image against the manifest of the directory that it is in
+
+        An image with the recorded size and modification time is taken to be unchanged without reading it,
+        so an image that was changed in place while keeping its size and modification time is not noticed.
+        An image with the recorded size but another modification time, e.g. one that was copied without
+        keeping its times, is checked against the recorded SHA-256 checksum, and its entry is updated if it matches.
+
+        Symbolic links, e.g. for other registries, are checked against the entry of their target.
+
+        Args:
+            image_path (Path): The image
+
+        Returns:
+            bool | None: Whether the image matches its entry, or None if the image has no entry
+        """
+        image_path = image_path.resolve()
+        manifest = cls(image_path.parent)
+        entry = manifest.load().get(image_path.name)
+        if entry is None:
+            return None
+        if manifest.checksum(image_path) is not None:
+            return True
+        try:
+            size = image_path.stat().st_size
+        except FileNotFoundError:
+            return False
+        if not isinstance(entry, dict) or entry.get("size") != size or "sha256" not in entry:
+            return False
+        sha256 = hashlib.sha256()
+        with open(image_path, "rb") as fh:
+            for chunk in iter(lambda: fh.read(io.DEFAULT_BUFFER_SIZE), b""):
+                sha256.update(chunk)
+        if sha256.hexdigest() != entry["sha256"]:
+            return False
+        manifest.add(image_path, entry["sha256"])
+        return True
+
+
 @contextlib.contextmanager
 def intermediate_file_no_creation(output_path: Path) -> Generator[Path, None, None]:
     """
@@ -4,10 +4,14 @@ Tests Nextflow-based pipelines to check that they adhere to
 the nf-core community guidelines.
 """
 
+import concurrent.futures
 import datetime
 import json
 import logging
 import os
+import threading
+from collections.abc import Generator
+from contextlib import contextmanager
 from pathlib import Path
 
 import git
@@ -25,6 +29,7 @@ import nf_core.subworkflows.lint
 import nf_core.utils
 from nf_core import __version__
 from nf_core.components.lint import ComponentLint
+from nf_core.pipelines.lint_cache import LintCache
 from nf_core.pipelines.lint_utils import console
 from nf_core.utils import NFCoreYamlLintConfig, strip_ansi_codes
 from nf_core.utils import plural_s as _s
@@ -61,6 +66,36 @@ from .version_consistency import version_consistency
 log = logging.getLogger(__name__)
 
 
+class _ThreadLogBuffer(logging.Filter):
+    """Log handler filter that holds back the log records of threads that are buffering them.
+
+    Used to print the log messages of lint tests that are run concurrently in the order of the lint tests.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._local = threading.local()
+
+    @contextmanager
+    def buffering(self) -> Generator[list[logging.LogRecord], None, None]:
+        """Collect the log records of the current thread, instead of passing them on to the log handlers"""
+        records: list[logging.LogRecord] = []
+        self._local.records = records
+        try:
+            yield records
+        finally:
+            self._local.records = None
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        records = getattr(self._local, "records", None)
+        if records is None:
+            return True
+        # The filter is called once for each handler
+        if not records or records[-1] is not record:
+            records.append(record)
+        return False
+
+
 class PipelineLint(nf_core.utils.Pipeline):
     """Object to hold linting information and results.
 
@@ -78,8 +113,33 @@ class PipelineLint(nf_core.utils.Pipeline):
         passed (list): A list of tuples of the form: ``(<test-name>, <reason>)``
         release_mode (bool): `True`, if you the to linting was run in release mode, `False` else.
         warned (list): A list of tuples of the form: ``(<warned no>, <reason>)``
+        jobs (int): Number of lint tests to run concurrently. ``1`` runs them one after another.
+        cache (bool): Reuse the results of lint tests whose inputs have not changed since the last run.
+        cached_tests (list): Names of the lint tests whose results were taken from the cache.
     """
 
+    # Lint tests that write files or change the lint object (they set ``self.schema_obj``).
+    # These are never run concurrently, even when ``jobs > 1``. All other lint tests must only read
+    # from the lint object, apart from ``self.file_index`` and ``self.lint_cache``, which are thread-safe.
+    serial_lint_tests = ["rocrate_readme_sync", "schema_lint", "schema_params", "schema_description"]
+
+    # Lint tests that read all of their inputs through ``self.file_index``, so that their
+    # cached results only depend on the files they read. Only the results of these tests are cached,
+    # as the other lint tests read files directly, or depend on remote resources.
+    indexed_lint_tests = [
+        "actions_awsfulltest",
+        "actions_awstest",
+        "actions_nf_test",
+        "files_exist",
+        "files_unchanged",
+        "included_configs",
+        "merge_markers",
+        "nfcore_yml",
+        "pipeline_todos",
+        "readme",
+        "template_strings",
+    ]
+
     # Import all linting tests as methods for this class
     actions_awsfulltest = actions_awsfulltest
     actions_awstest = actions_awstest
@@ -113,7 +173,16 @@ class PipelineLint(nf_core.utils.Pipeline):
     included_configs = included_configs
 
     def __init__(
-        self, wf_path, release_mode=False, fix=(), key=None, fail_ignored=False, fail_warned=False, hide_progress=False
+        self,
+        wf_path,
+        release_mode=False,
+        fix=(),
+        key=None,
+        fail_ignored=False,
+        fail_warned=False,
+        hide_progress=False,
+        jobs=1,
+        cache=False,
     ):
         """Initialise linting object"""
 
@@ -134,6 +203,10 @@ class PipelineLint(nf_core.utils.Pipeline):
         self.lint_tests = self._get_all_lint_tests(self.release_mode)
         self.fix = fix
         self.key = key
+        self.jobs = jobs
+        self.cache = cache
+        self.lint_cache: LintCache | None = None
+        self.cached_tests: list[str] = []
         self.progress_bar = None
 
     @staticmethod
@@ -250,6 +323,24 @@ class PipelineLint(nf_core.utils.Pipeline):
                     "Uncommitted changes found in pipeline directory!\nPlease commit these before running with '--fix'"
                 )
 
+        # Start every lint run with a fresh view of the files on disk
+        self.file_index = nf_core.utils.PipelineFiles(self.wf_path)
+        if self.cache:
+            if len(self.fix):
+                # Fixes change files that the cached results of other tests depend on
+                log.info("Not using the lint cache when running with '--fix'")
+            else:
+                self.lint_cache = LintCache(
+                    self.wf_path,
+                    {
+                        "lint_config": self.lint_config.model_dump() if self.lint_config is not None else None,
+                        "release_mode": self.release_mode,
+                        "nf_config": self.nf_config,
+                        # Read by the version_consistency lint test
+                        "github_env": {var: os.environ.get(var) for var in ["GITHUB_REF", "GITHUB_REPOSITORY"]},
+                    },
+                )
+
         self.progress_bar = rich.progress.Progress(
             "[bold blue]{task.description}",
             rich.progress.BarColumn(bar_width=None),
@@ -257,19 +348,39 @@ class PipelineLint(nf_core.utils.Pipeline):
             transient=True,
             disable=self.hide_progress or os.environ.get("HIDE_PROGRESS", None) is not None,
         )
+        # Lint tests disabled in the config are reported as ignored, in their usual place
+        tests_to_run = [
+            test_name
+            for test_name in self.lint_tests
+            if (self.lint_config.get(test_name, {}) if self.lint_config is not None else {}) is not False
+        ]
+        cached_results = self._get_cached_results(tests_to_run)
+        tests_to_run = [test_name for test_name in tests_to_run if test_name not in cached_results]
         with self.progress_bar:
             lint_progress = self.progress_bar.add_task(
-                "Running lint checks", total=len(self.lint_tests), test_name=self.lint_tests[0]
+                "Running lint checks",
+                total=len(self.lint_tests),
+                completed=len(cached_results),
+                test_name=self.lint_tests[0],
             )
+            if self.jobs > 1:
+                all_results = self._run_lint_tests_parallel(tests_to_run, lint_progress)
+            else:
+                all_results = {}
+                for test_name in tests_to_run:
+                    self.progress_bar.update(lint_progress, advance=1, test_name=test_name)
+                    all_results[test_name] = self._run_lint_test(test_name)
+            all_results.update(cached_results)
+            if self.lint_cache is not None:
+                self.lint_cache.save()
+
+            # Merge results in the order of the lint tests, regardless of the order they finished in
             for test_name in self.lint_tests:
-                lint_test = self.lint_config.get(test_name, {}) if self.lint_config is not None else {}
-                if lint_test is False:
+                if test_name not in all_results:
                     log.debug(f"Skipping lint test '{test_name}'")
                     self.ignored.append((test_name, test_name))
                     continue
-                self.progress_bar.update(lint_progress, advance=1, test_name=test_name)
-                log.debug(f"Running lint test: {test_name}")
-                test_results = getattr(self, test_name)()
+                test_results = all_results[test_name]
                 for test in test_results.get("passed", []):
                     self.passed.append((test_name, test))
                 for test in test_results.get("ignored", []):
@@ -289,6 +400,93 @@ class PipelineLint(nf_core.utils.Pipeline):
                 if test_results.get("could_fix", False):
                     self.could_fix.append(test_name)
 
+    def _run_lint_tests_parallel(self, tests_to_run: list[str], lint_progress) -> dict[str, dict]:
+        """Run lint tests on a thread pool of ``self.jobs`` workers.
+
+        Tests that write files or change the lint object (any test given to ``--fix``, plus
+        :attr:`serial_lint_tests`) are run one after another once all concurrent tests have finished.
+        The log messages of the concurrent tests are held back until they have all finished,
+        and then printed in the order of the tests.
+
+        Returns:
+            dict: Lint results, keyed by test name
+        """
+        assert self.progress_bar is not None
+        serial_tests = [t for t in tests_to_run if t in self.fix or t in self.serial_lint_tests]
+        parallel_tests = [t for t in tests_to_run if t not in serial_tests]
+        all_results: dict[str, dict] = {}
+
+        log_buffer = _ThreadLogBuffer()
+        test_logs: dict[str, list[logging.LogRecord]] = {}
+
+        def run_lint_test(test_name: str) -> dict:
+            with log_buffer.buffering() as records:
+                test_logs[test_name] = records
+                return self._run_lint_test(test_name)
+
+        log.debug(f"Running {len(parallel_tests)} lint tests with {self.jobs} workers")
+        log_handlers = {
+            handler
+            for logger in [logging.getLogger(), *logging.Logger.manager.loggerDict.values()]
+            if isinstance(logger, logging.Logger)
+            for handler in logger.handlers
+        }
+        for handler in log_handlers:
+            handler.addFilter(log_buffer)
+        try:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=self.jobs) as pool:
+                future_tests = {pool.submit(run_lint_test, test_name): test_name for test_name in parallel_tests}
+                for future in concurrent.futures.as_completed(future_tests):
+                    test_name = future_tests[future]
+                    self.progress_bar.update(lint_progress, advance=1, test_name=test_name)
+                    all_results[test_name] = future.result()
+        finally:
+            for handler in log_handlers:
+                handler.removeFilter(log_buffer)
+            for test_name in parallel_tests:
+                for record in test_logs.get(test_name, []):
+                    logging.getLogger(record.name).handle(record)
+
+        for test_name in serial_tests:
+            self.progress_bar.update(lint_progress, advance=1, test_name=test_name)
+            all_results[test_name] = self._run_lint_test(test_name)
+
+        return all_results
+
+    def _get_cached_results(self, tests_to_run: list[str]) -> dict[str, dict]:
+        """Look up the lint tests whose results can be taken from the lint cache.
+
+        Returns:
+            dict: Cached lint results, keyed by test name
+        """
+        cached_results: dict[str, dict] = {}
+        if self.lint_cache is None:
+            return cached_results
+        for test_name in tests_to_run:
+            if test_name not in self.indexed_lint_tests:
+                continue
+            results = self.lint_cache.get(test_name, self.file_index)
+            if results is not None:
+                log.debug(f"Using cached results for lint test: {test_name}")
+                cached_results[test_name] = results
+                self.cached_tests.append(test_name)
+        return cached_results
+
+    def _run_lint_test(self, test_name: str) -> dict:
+        """Run a single lint test and store its results in the lint cache, if enabled.
+
+        Returns:
+            dict: The lint test results
+        """
+        log.debug(f"Running lint test: {test_name}")
+        if self.lint_cache is None or test_name not in self.indexed_lint_tests:
+            return getattr(self, test_name)()
+
+        with self.file_index.record_reads() as inputs:
+            test_results = getattr(self, test_name)()
+        self.lint_cache.put(test_name, self.file_index, inputs, test_results)
+        return test_results
+
     def _print_results(self, show_passed, plain_text=False):
         """Print linting results to the command line.
 
@@ -574,6 +772,9 @@ def run_linting(
     json_fn=None,
     hide_progress: bool = False,
     plain_text: bool = False,
+    jobs: int = 1,
+    cache: bool = False,
+    show_cached: bool = False,
 ) -> tuple[PipelineLint, ComponentLint | None, ComponentLint | None]:
     """Runs all nf-core linting checks on a given Nextflow pipeline project
     in either `release` mode or `normal` mode (default). Returns an object
@@ -584,6 +785,9 @@ def run_linting(
         release_mode (bool): Set this to `True`, if the linting should be run in the `release` mode.
                              See :class:`PipelineLint` for more information.
         plain_text (bool): Print output in plain text without rich formatting
+        jobs (int): Number of pipeline lint tests, modules and subworkflows to lint concurrently
+        cache (bool): Reuse the results of pipeline lint tests whose inputs have not changed since the last run
+        show_cached (bool): List the pipeline lint tests whose results were taken from the cache
 
     Returns:
         An object of type :class:`PipelineLint` that contains all the linting results.
@@ -614,7 +818,9 @@ def run_linting(
         pipeline_keys = None
 
     # Create the lint object
-    lint_obj = PipelineLint(pipeline_dir, release_mode, fix, pipeline_keys, fail_ignored, fail_warned, hide_progress)
+    lint_obj = PipelineLint(
+        pipeline_dir, release_mode, fix, pipeline_keys, fail_ignored, fail_warned, hide_progress, jobs, cache
+    )
 
     # Load the various pipeline configs
     lint_obj._load_lint_config()
@@ -625,10 +831,12 @@ def run_linting(
         subworkflow_lint_obj = None
     else:
         # Create the modules lint object
-        module_lint_obj = nf_core.modules.lint.ModuleLint(pipeline_dir, hide_progress=hide_progress)
+        module_lint_obj = nf_core.modules.lint.ModuleLint(pipeline_dir, hide_progress=hide_progress, jobs=jobs)
         # Create the subworkflows lint object
         try:
-            subworkflow_lint_obj = nf_core.subworkflows.lint.SubworkflowLint(pipeline_dir, hide_progress=hide_progress)
+            subworkflow_lint_obj = nf_core.subworkflows.lint.SubworkflowLint(
+                pipeline_dir, hide_progress=hide_progress, jobs=jobs
+            )
         except LookupError:
             subworkflow_lint_obj = None
 
@@ -668,6 +876,12 @@ def run_linting(
         log.info("Stopping tests...")
         return lint_obj, module_lint_obj, subworkflow_lint_obj
 
+    if len(lint_obj.cached_tests) > 0:
+        log.info(
+            f"Using cached results for {len(lint_obj.cached_tests)} pipeline lint test{_s(lint_obj.cached_tests)}"
+            + (": '{}'".format("', '".join(lint_obj.cached_tests)) if show_cached else "")
+        )
+
     if module_lint_obj is not None:
         # Run the module lint tests
         if len(module_lint_obj.all_local_components) > 0:
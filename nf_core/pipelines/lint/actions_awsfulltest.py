@@ -30,10 +30,9 @@ def actions_awsfulltest(self) -> dict[str, list[str]]:
     failed = []
 
     fn = Path(self.wf_path, ".github", "workflows", "awsfulltest.yml")
-    if fn.is_file():
+    if self.file_index.is_file(fn):
         try:
-            with open(fn) as fh:
-                wf = yaml.safe_load(fh)
+            wf = yaml.safe_load(self.file_index.read_bytes(fn))
         except Exception as e:
             return {"failed": [f"Could not parse yaml file: {fn}, {e}"]}
 
@@ -23,12 +23,11 @@ def actions_awstest(self):
 
     """
     fn = Path(self.wf_path, ".github", "workflows", "awstest.yml")
-    if not fn.is_file():
+    if not self.file_index.is_file(fn):
         return {"ignored": [f"'awstest.yml' workflow not found: `{fn}`"]}
 
     try:
-        with open(fn) as fh:
-            wf = yaml.safe_load(fh)
+        wf = yaml.safe_load(self.file_index.read_bytes(fn))
     except Exception as e:
         return {"failed": [f"Could not parse yaml file: {fn}, {e}"]}
 
@@ -39,12 +39,11 @@ def actions_nf_test(self):
     fn = Path(self.wf_path, ".github", "workflows", "nf-test.yml")
 
     # Return an ignored status if we can't find the file
-    if not fn.is_file():
+    if not self.file_index.is_file(fn):
         return {"ignored": ["'.github/workflows/nf-test.yml' not found"]}
 
     try:
-        with open(fn) as fh:
-            ciwf = yaml.safe_load(fh)
+        ciwf = yaml.safe_load(self.file_index.read_bytes(fn))
     except Exception as e:
         return {"failed": [f"Could not parse yaml file: {fn}, {e}"]}
 
@@ -214,11 +214,8 @@ def files_exist(self) -> dict[str, list[str]]:
     # Remove files that should be ignored according to the linting config
     ignore_files = self.lint_config.get("files_exist", []) if self.lint_config is not None else []
 
-    def pf(file_path: str | Path) -> Path:
-        return Path(self.wf_path, file_path)
-
     # First - critical files. Check that this is actually a Nextflow pipeline
-    if not pf("nextflow.config").is_file() and not pf("main.nf").is_file():
+    if not self.file_index.is_file("nextflow.config") and not self.file_index.is_file("main.nf"):
         failed.append("File not found: nextflow.config or main.nf")
         raise AssertionError("Neither nextflow.config or main.nf found! Is this a Nextflow pipeline?")
 
@@ -226,7 +223,7 @@ def files_exist(self) -> dict[str, list[str]]:
     for files in files_fail:
         if any([str(f) in ignore_files for f in files]):
             continue
-        if any([pf(f).is_file() for f in files]):
+        if any([self.file_index.is_file(f) for f in files]):
             passed.append(f"File found: {self._wrap_quotes(files)}")
         else:
             failed.append(f"File not found: {self._wrap_quotes(files)}")
@@ -235,7 +232,7 @@ def files_exist(self) -> dict[str, list[str]]:
     for files in files_warn:
         if any([str(f) in ignore_files for f in files]):
             continue
-        if any([pf(f).is_file() for f in files]):
+        if any([self.file_index.is_file(f) for f in files]):
             passed.append(f"File found: {self._wrap_quotes(files)}")
         else:
             hint = ""
@@ -248,7 +245,7 @@ def files_exist(self) -> dict[str, list[str]]:
     for file in files_fail_ifexists:
         if str(file) in ignore_files:
             continue
-        if pf(file).is_file():
+        if self.file_index.is_file(file):
             failed.append(f"File must be removed: {self._wrap_quotes(file)}")
         else:
             passed.append(f"File not found check: {self._wrap_quotes(file)}")
@@ -257,7 +254,7 @@ def files_exist(self) -> dict[str, list[str]]:
     for file in files_warn_ifexists:
         if str(file) in ignore_files:
             continue
-        if pf(file).is_file():
+        if self.file_index.is_file(file):
             warned.append(f"File should be removed: {self._wrap_quotes(file)}")
         else:
             passed.append(f"File not found check: {self._wrap_quotes(file)}")
@@ -1,17 +1,28 @@
-import filecmp
+import hashlib
+import json
 import logging
 import os
 import re
 import shutil
 import tempfile
+import time
+from collections.abc import Generator
+from contextlib import contextmanager
 from pathlib import Path
 
 import yaml
 
+import nf_core
 import nf_core.pipelines.create.create
+from nf_core.utils import setup_nfcore_cachedir
 
 log = logging.getLogger(__name__)
 
+# Number of renderings of the pipeline template to keep in the cache
+TEMPLATE_CACHE_MAX_RENDERINGS = 20
+# Seconds after which renderings left behind by interrupted lint runs are removed
+TEMPLATE_CACHE_TMP_MAX_AGE = 24 * 60 * 60
+
 
 def files_unchanged(self) -> dict[str, list[str] | bool]:
     """Checks that certain pipeline files are not modified from template output.
@@ -113,13 +124,6 @@ def files_unchanged(self) -> dict[str, list[str] | bool]:
         [Path(".gitignore"), Path(".prettierignore")],
     ]
 
-    # Only show error messages from pipeline creation
-    logging.getLogger("nf_core.pipelines.create").setLevel(logging.ERROR)
-
-    # Generate a new pipeline with nf-core create that we can compare to
-    tmp_dir = Path(tempfile.TemporaryDirectory().name)
-    tmp_dir.mkdir(parents=True)
-
     # Create a template.yaml file for the pipeline creation
     if "manifest.author" in self.nf_config:
         names = self.nf_config["manifest.author"].strip("\"'")
@@ -133,105 +137,96 @@ def files_unchanged(self) -> dict[str, list[str] | bool]:
         "org": prefix,
     }
 
-    template_yaml_path = Path(tmp_dir, "template.yaml")
-
-    with open(template_yaml_path, "w") as fh:
-        yaml.dump(template_yaml, fh, default_flow_style=False)
-
-    test_pipeline_dir = Path(tmp_dir, f"{prefix}-{short_name}")
-    create_obj = nf_core.pipelines.create.create.PipelineCreate(
-        None, None, None, no_git=True, outdir=test_pipeline_dir, template_config=template_yaml_path
-    )
-    create_obj.init_pipeline()
-
-    # Helper functions for file paths
-    def _pf(file_path: str | Path) -> Path:
-        """Helper function - get file path for pipeline file"""
-        return Path(self.wf_path, file_path)
-
-    def _tf(file_path: str | Path) -> Path:
-        """Helper function - get file path for template file"""
-        return Path(test_pipeline_dir, file_path)
-
-    ignore_files = self.lint_config.get("files_unchanged", []) if self.lint_config is not None else []
-
-    # Files that must be completely unchanged from template
-    for files in files_exact:
-        # Ignore if file specified in linting config
-        if any([str(f) in ignore_files for f in files]):
-            ignored.append(f"File ignored due to lint config: {self._wrap_quotes(files)}")
-
-        # Ignore if we can't find the file
-        elif not any([_pf(f).is_file() for f in files]):
-            ignored.append(f"File does not exist: {self._wrap_quotes(files)}")
-
-        # Check that the file has an identical match
-        else:
-            for f in files:
-                try:
-                    if filecmp.cmp(_pf(f), _tf(f), shallow=True):
-                        passed.append(f"`{f}` matches the template")
-                    else:
-                        if f.name.endswith(".png") and int(os.stat(_pf(f)).st_size / 500) == int(
-                            os.stat(_tf(f)).st_size / 500
-                        ):
-                            # almost the same file, good enough for the logo
-                            log.debug(f"Files are almost the same. Will pass: {f}")
-                            passed.append(f"`{f}` matches the template")
-                        elif "files_unchanged" in self.fix:
-                            # Try to fix the problem by overwriting the pipeline file
-                            shutil.copy(_tf(f), _pf(f))
+    # Render the template files that we compare to, or reuse an earlier rendering with the same parameters
+    # Prettier also reads the .editorconfig file, so it needs to be rendered as well
+    template_files = [f for files in files_exact + files_partial for f in files] + [Path(".editorconfig")]
+    with _render_template_files(template_yaml, prefix, short_name, template_files) as test_pipeline_dir:
+        # Helper functions for file paths
+        def _pf(file_path: str | Path) -> Path:
+            """Helper function - get file path for pipeline file"""
+            return Path(self.wf_path, file_path)
+
+        def _tf(file_path: str | Path) -> Path:
+            """Helper function - get file path for template file"""
+            return Path(test_pipeline_dir, file_path)
+
+        ignore_files = self.lint_config.get("files_unchanged", []) if self.lint_config is not None else []
+
+        # Files that must be completely unchanged from template
+        for files in files_exact:
+            # Ignore if file specified in linting config
+            if any([str(f) in ignore_files for f in files]):
+                ignored.append(f"File ignored due to lint config: {self._wrap_quotes(files)}")
+
+            # Ignore if we can't find the file
+            elif not any([self.file_index.is_file(f) for f in files]):
+                ignored.append(f"File does not exist: {self._wrap_quotes(files)}")
+
+            # Check that the file has an identical match
+            else:
+                for f in files:
+                    try:
+                        if self.file_index.read_bytes(f) == _tf(f).read_bytes():
                             passed.append(f"`{f}` matches the template")
-                            fixed.append(f"`{f}` overwritten with template file")
-                        elif f.name in ["LICENSE", "LICENSE.md", "LICENCE", "LICENCE.md"]:
-                            # Report LICENSE as a warning since we are not using the manifest.author names
-                            # TODO: Lint the content of the LICENSE file except the line containing author names
-                            # to allow for people to opt-in listing author/maintainer names instead of using the "nf-core community"
-                            warned.append(f"`{f}` does not match the template")
-                            could_fix = True
                         else:
-                            failed.append(f"`{f}` does not match the template")
-                            could_fix = True
-                except FileNotFoundError:
-                    pass
-
-    # Files that can be added to, but that must contain the template contents
-    for files in files_partial:
-        # Ignore if file specified in linting config
-        if any([str(f) in ignore_files for f in files]):
-            ignored.append(f"File ignored due to lint config: {self._wrap_quotes(files)}")
-
-        # Ignore if we can't find the file
-        elif not any([_pf(f).is_file() for f in files]):
-            ignored.append(f"File does not exist: {self._wrap_quotes(files)}")
-
-        # Check that the file contains the template file contents
-        else:
-            for f in files:
-                try:
-                    with open(_pf(f)) as fh:
-                        pipeline_file = fh.read()
-                    with open(_tf(f)) as fh:
-                        template_file = fh.read()
-                    if template_file in pipeline_file:
-                        passed.append(f"`{f}` matches the template")
-                    else:
-                        if "files_unchanged" in self.fix:
-                            # Try to fix the problem by overwriting the pipeline file
-                            with open(_tf(f)) as fh:
-                                template_file = fh.read()
-                            with open(_pf(f), "w") as fh:
-                                fh.write(template_file)
+                            if f.name.endswith(".png") and int(self.file_index.size(f) / 500) == int(
+                                os.stat(_tf(f)).st_size / 500
+                            ):
+                                # almost the same file, good enough for the logo
+                                log.debug(f"Files are almost the same. Will pass: {f}")
+                                passed.append(f"`{f}` matches the template")
+                            elif "files_unchanged" in self.fix:
+                                # Try to fix the problem by overwriting the pipeline file
+                                shutil.copy(_tf(f), _pf(f))
+                                self.file_index.invalidate(f)
+                                passed.append(f"`{f}` matches the template")
+                                fixed.append(f"`{f}` overwritten with template file")
+                            elif f.name in ["LICENSE", "LICENSE.md", "LICENCE", "LICENCE.md"]:
+                                # Report LICENSE as a warning since we are not using the manifest.author names
+                                # TODO: Lint the content of the LICENSE file except the line containing author names
+                                # to allow for people to opt-in listing author/maintainer names instead of using the "nf-core community"
+                                warned.append(f"`{f}` does not match the template")
+                                could_fix = True
+                            else:
+                                failed.append(f"`{f}` does not match the template")
+                                could_fix = True
+                    except FileNotFoundError:
+                        pass
+
+        # Files that can be added to, but that must contain the template contents
+        for files in files_partial:
+            # Ignore if file specified in linting config
+            if any([str(f) in ignore_files for f in files]):
+                ignored.append(f"File ignored due to lint config: {self._wrap_quotes(files)}")
+
+            # Ignore if we can't find the file
+            elif not any([self.file_index.is_file(f) for f in files]):
+                ignored.append(f"File does not exist: {self._wrap_quotes(files)}")
+
+            # Check that the file contains the template file contents
+            else:
+                for f in files:
+                    try:
+                        pipeline_file = self.file_index.read_text(f)
+                        with open(_tf(f), encoding="latin1") as fh:
+                            template_file = fh.read()
+                        if template_file in pipeline_file:
                             passed.append(f"`{f}` matches the template")
-                            fixed.append(f"`{f}` overwritten with template file")
                         else:
-                            failed.append(f"`{f}` does not match the template")
-                            could_fix = True
-                except FileNotFoundError:
-                    pass
-
-    # cleaning up temporary dir
-    shutil.rmtree(tmp_dir)
+                            if "files_unchanged" in self.fix:
+                                # Try to fix the problem by overwriting the pipeline file
+                                with open(_tf(f)) as fh:
+                                    template_file = fh.read()
+                                with open(_pf(f), "w") as fh:
+                                    fh.write(template_file)
+                                self.file_index.invalidate(f)
+                                passed.append(f"`{f}` matches the template")
+                                fixed.append(f"`{f}` overwritten with template file")
+                            else:
+                                failed.append(f"`{f}` does not match the template")
+                                could_fix = True
+                    except FileNotFoundError:
+                        pass
 
     return {
         "passed": passed,
@@ -241,3 +236,102 @@ def files_unchanged(self) -> dict[str, list[str] | bool]:
         "fixed": fixed,
         "could_fix": could_fix,
     }
+
+
+@contextmanager
+def _render_template_files(
+    template_yaml: dict[str, str], prefix: str, short_name: str, files: list[Path]
+) -> Generator[Path, None, None]:
+    """Render the given files of the pipeline template, using a cached rendering if there is one.
+
+    Renderings are cached in the nf-core cache directory, keyed on the template
+    parameters and the nf-core/tools version, as the template is part of the installed package.
+    Renderings that are not cached are removed when the context is left.
+
+    Yields:
+        Path: The directory of the rendered pipeline
+    """
+    # Only show error messages from pipeline creation
+    logging.getLogger("nf_core.pipelines.create").setLevel(logging.ERROR)
+
+    cache_dir = setup_nfcore_cachedir("pipeline-template")
+    prune_template_cache(cache_dir)
+    tmp_dir = Path(tempfile.mkdtemp(dir=cache_dir, prefix="tmp-"))
+    template_yaml_path = Path(tmp_dir, "template.yaml")
+    with open(template_yaml_path, "w") as fh:
+        yaml.dump(template_yaml, fh, default_flow_style=False)
+
+    create_obj = nf_core.pipelines.create.create.PipelineCreate(
+        None,
+        None,
+        None,
+        no_git=True,
+        outdir=Path(tmp_dir, f"{prefix}-{short_name}"),
+        template_config=template_yaml_path,
+    )
+    jinja_params = {k: v for k, v in create_obj.jinja_params.items() if k != "outdir"}
+    cache_key = hashlib.sha256(
+        json.dumps(
+            {
+                "nf_core_version": nf_core.__version__,
+                "jinja_params": jinja_params,
+                "files": sorted(str(f) for f in files),
+            },
+            sort_keys=True,
+            default=str,
+        ).encode()
+    ).hexdigest()[:25]
+    rendered_dir = Path(cache_dir, cache_key)
+
+    try:
+        if rendered_dir.is_dir():
+            log.debug(f"Using cached pipeline template: {rendered_dir}")
+            # Mark the rendering as recently used
+            os.utime(rendered_dir)
+        elif not create_obj.render_template(only_files=files):
+            # Formatting differs between runs with and without prettier, so only formatted renderings are cached
+            log.debug("Not caching the pipeline template, as it could not be formatted with prettier")
+            rendered_dir = tmp_dir
+        else:
+            try:
+                # Renaming is atomic, so a concurrent lint run never sees a half-rendered template
+                tmp_dir.rename(rendered_dir)
+            except OSError:
+                # Another lint run rendered the same template in the meantime
+                pass
+        yield Path(rendered_dir, f"{prefix}-{short_name}")
+    finally:
+        # Does nothing if the rendering was moved into the cache
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def prune_template_cache(
+    cache_dir: Path,
+    max_renderings: int = TEMPLATE_CACHE_MAX_RENDERINGS,
+    max_tmp_age: float = TEMPLATE_CACHE_TMP_MAX_AGE,
+) -> None:
+    """Remove the least recently used renderings of the pipeline template from the cache.
+
+    Args:
+        cache_dir (Path): The cache directory of the pipeline template renderings
+        max_renderings (int): Maximum number of renderings to keep
+        max_tmp_age (float): Seconds after which renderings left behind by interrupted lint runs are removed
+    """
+    renderings = []
+    for path in cache_dir.iterdir():
+        try:
+            mtime = path.stat().st_mtime
+        except FileNotFoundError:
+            continue  # Removed by another process
+        if path.name.startswith("tmp-"):
+            # Renderings of other lint runs, which may still be in use, or of lint runs that were killed
+            if time.time() - mtime > max_tmp_age:
+                log.debug(f"Removing old pipeline template rendering: {path}")
+                shutil.rmtree(path, ignore_errors=True)
+        elif path.is_dir():
+            renderings.append((path, mtime))
+    # Most recently used first
+    renderings.sort(key=lambda r: r[1], reverse=True)
+    for path, _ in renderings[max_renderings:]:
+        log.debug(f"Removing old cached pipeline template: {path}")
+        shutil.rmtree(path, ignore_errors=True)
@@ -18,19 +18,18 @@ def included_configs(self):
 
     config_file = Path(self.wf_path / "nextflow.config")
 
-    with open(config_file) as fh:
-        config = fh.read()
-        if (
-            f"// includeConfig params.custom_config_base && (!System.getenv('NXF_OFFLINE') || !params.custom_config_base.startsWith('http')) ? \"${{params.custom_config_base}}/pipeline/{self.pipeline_name}.config\""
-            in config
-        ):
-            failed.append("Pipeline config does not include custom configs. Please uncomment the includeConfig line.")
-        elif (
-            f"includeConfig params.custom_config_base && (!System.getenv('NXF_OFFLINE') || !params.custom_config_base.startsWith('http')) ? \"${{params.custom_config_base}}/pipeline/{self.pipeline_name}.config\""
-            in config
-        ):
-            passed.append("Pipeline config includes custom configs.")
-        else:
-            warned.append("Pipeline config does not include custom configs. Please add the includeConfig line.")
+    config = self.file_index.read_text(config_file)
+    if (
+        f"// includeConfig params.custom_config_base && (!System.getenv('NXF_OFFLINE') || !params.custom_config_base.startsWith('http')) ? \"${{params.custom_config_base}}/pipeline/{self.pipeline_name}.config\""
+        in config
+    ):
+        failed.append("Pipeline config does not include custom configs. Please uncomment the includeConfig line.")
+    elif (
+        f"includeConfig params.custom_config_base && (!System.getenv('NXF_OFFLINE') || !params.custom_config_base.startsWith('http')) ? \"${{params.custom_config_base}}/pipeline/{self.pipeline_name}.config\""
+        in config
+    ):
+        passed.append("Pipeline config includes custom configs.")
+    else:
+        warned.append("Pipeline config does not include custom configs. Please add the includeConfig line.")
 
     return {"passed": passed, "failed": failed, "warned": warned}
@@ -32,7 +32,7 @@ def nfcore_yml(self) -> dict[str, list[str]]:
     ignore_configs = self.lint_config.get(".nf-core", []) if self.lint_config is not None else []
     for ext in (".yml", ".yaml"):
         try:
-            nf_core_yml = yaml.load(Path(self.wf_path) / f".nf-core{ext}")
+            nf_core_yml = yaml.load(self.file_index.read_bytes(Path(self.wf_path) / f".nf-core{ext}"))
             break
         except FileNotFoundError:
             continue
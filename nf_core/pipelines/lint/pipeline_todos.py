@@ -1,7 +1,6 @@
-import fnmatch
 import logging
-import os
-from pathlib import Path
+
+import nf_core.utils
 
 log = logging.getLogger(__name__)
 
@@ -34,40 +33,31 @@ def pipeline_todos(self, root_dir=None):
     warned = []
     file_paths = []
 
-    # Pipelines don't provide a path, so use the workflow path.
+    # Pipelines don't provide a path, so use the pipeline file index.
     # Modules run this function twice and provide a string path
     if root_dir is None:
-        root_dir = self.wf_path
+        file_index = self.file_index
+    else:
+        file_index = nf_core.utils.PipelineFiles(root_dir)
 
     # Ignore ro-crate-metadata.json to avoid warnings when TODOs are not deleted.
-    ignore = [".git", "ro-crate-metadata.json"]
-    if Path(root_dir, ".gitignore").is_file():
-        with open(Path(root_dir, ".gitignore"), encoding="latin1") as fh:
-            for line in fh:
-                ignore.append(Path(line.strip().rstrip("/")).name)
-    for root, dirs, files in os.walk(root_dir, topdown=True):
-        # Ignore files
-        for i_base in ignore:
-            i = str(Path(root, i_base))
-            dirs[:] = [d for d in dirs if not fnmatch.fnmatch(str(Path(root, d)), i)]
-            files[:] = [f for f in files if not fnmatch.fnmatch(str(Path(root, f)), i)]
-        for fname in files:
-            try:
-                with open(Path(root, fname), encoding="latin1") as fh:
-                    for line in fh:
-                        if "TODO nf-core" in line:
-                            line = (
-                                line.replace("<!--", "")
-                                .replace("-->", "")
-                                .replace("# TODO nf-core: ", "")
-                                .replace("// TODO nf-core: ", "")
-                                .replace("TODO nf-core: ", "")
-                                .strip()
-                            )
-                            warned.append(f"TODO string in `{fname}`: _{line}_")
-                            file_paths.append(Path(root, fname))
-            except FileNotFoundError:
-                log.debug(f"Could not open file {fname} in pipeline_todos lint test")
+    files = [fn for fn in file_index.walk_files() if fn.name != "ro-crate-metadata.json"]
+    for fn in files:
+        try:
+            for line in file_index.read_lines(fn):
+                if "TODO nf-core" in line:
+                    line = (
+                        line.replace("<!--", "")
+                        .replace("-->", "")
+                        .replace("# TODO nf-core: ", "")
+                        .replace("// TODO nf-core: ", "")
+                        .replace("TODO nf-core: ", "")
+                        .strip()
+                    )
+                    warned.append(f"TODO string in `{fn.name}`: _{line}_")
+                    file_paths.append(fn)
+        except FileNotFoundError:
+            log.debug(f"Could not open file {fn.name} in pipeline_todos lint test")
 
     if len(warned) == 0:
         passed.append("No TODO strings found")
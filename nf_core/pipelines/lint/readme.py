@@ -48,8 +48,7 @@ def readme(self):
     # Remove field that should be ignored according to the linting config
     ignore_configs = self.lint_config.get("readme", []) if self.lint_config is not None else []
 
-    with open(Path(self.wf_path, "README.md")) as fh:
-        content = fh.read()
+    content = self.file_index.read_text(Path(self.wf_path, "README.md"))
 
     if "nextflow_badge" not in ignore_configs:
         # Check that there is a readme badge showing the minimum required version of Nextflow
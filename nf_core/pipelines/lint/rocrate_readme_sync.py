@@ -52,6 +52,7 @@ def rocrate_readme_sync(self):
         metadata_dict.get("@graph")[0]["description"] = readme_content
         with metadata_file.open("w", encoding="utf-8") as f:
             json.dump(metadata_dict, f, indent=4)
+        self.file_index.invalidate(metadata_file)
         passed.append("RO-Crate description matches the `README.md`.")
         fixed.append("Mismatch fixed: RO-Crate description updated from `README.md`.")
     else:
@@ -40,7 +40,7 @@ def template_strings(self):
     # Files that should be ignored according to the linting config
     ignore_files = self.lint_config.get("template_strings", []) if self.lint_config is not None else []
 
-    files = self.list_files()
+    files = self.file_index.git_files()
     # Loop through files, searching for string
     num_matches = 0
     for fn in files:
@@ -53,15 +53,14 @@ def template_strings(self):
         if encoding is not None or (ftype is not None and any([ftype.startswith(ft) for ft in binary_ftypes])):
             continue
 
-        with open(fn, encoding="latin1") as fh:
-            lnum = 0
-            for line in fh:
-                lnum += 1
-                cc_matches = re.findall(r"[^$]{{[^:}]*}}", line)
-                if len(cc_matches) > 0:
-                    for cc_match in cc_matches:
-                        failed.append(f"Found a Jinja template string in `{fn}` L{lnum}: {cc_match}")
-                        num_matches += 1
+        lnum = 0
+        for line in self.file_index.read_lines(fn):
+            lnum += 1
+            cc_matches = re.findall(r"[^$]{{[^:}]*}}", line)
+            if len(cc_matches) > 0:
+                for cc_match in cc_matches:
+                    failed.append(f"Found a Jinja template string in `{fn}` L{lnum}: {cc_match}")
+                    num_matches += 1
     if num_matches == 0:
         passed.append(f"Did not find any Jinja template strings ({len(self.files)} files)")
 
@@ -0,0 +1,133 @@
+"""Persistent cache for the results of ``nf-core pipelines lint`` tests.
+
+Lint test results are stored together with the content hashes of the files
+that each test read. When a test is run again with the same nf-core/tools version,
+lint config and pipeline config and none of its input files have changed,
+the stored results are used instead of running the test.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+from pathlib import Path
+from typing import Any
+
+from nf_core import __version__
+from nf_core.utils import NFCORE_DIR, PipelineFiles, atomic_write, setup_nfcore_dir
+
+log = logging.getLogger(__name__)
+
+# Keys of lint test results that are stored in the cache
+CACHED_RESULT_KEYS = ["passed", "failed", "warned", "ignored", "could_fix"]
+
+
+class LintCache:
+    """Lint test results of one pipeline, persisted between runs.
+
+    Results can be stored by lint tests that run concurrently.
+
+    Args:
+        wf_path (Path): The path to the pipeline directory.
+        config (dict): Everything, other than file contents, that can change the results of a lint test,
+            e.g. the lint config and the pipeline config.
+    """
+
+    def __init__(self, wf_path: str | Path, config: dict[str, Any]) -> None:
+        self.wf_path = Path(wf_path).resolve()
+        self.config_hash = _sha256(
+            json.dumps(
+                {"nf_core_version": __version__, "wf_path": str(self.wf_path), **config}, sort_keys=True, default=str
+            )
+        )
+        self.cache_path = Path(NFCORE_DIR, "lint-cache", f"{_sha256(str(self.wf_path))[:25]}.json")
+        self.entries: dict[str, dict] = self._load()
+        # Input hashes computed during this run, as many lint tests share the same inputs
+        self._input_hashes: dict[str, str | None] = {}
+        self._lock = threading.RLock()
+
+    def __repr__(self) -> str:
+        return f"<LintCache for {self.wf_path}>"
+
+    def _load(self) -> dict[str, dict]:
+        """Load the cached lint results of this pipeline from disk"""
+        try:
+            with open(self.cache_path) as fh:
+                entries = json.load(fh)
+        except FileNotFoundError:
+            return {}
+        except (OSError, json.JSONDecodeError) as e:
+            log.debug(f"Ignoring unreadable lint cache '{self.cache_path}': {e}")
+            return {}
+        return entries if isinstance(entries, dict) else {}
+
+    def get(self, test_name: str, file_index: PipelineFiles) -> dict | None:
+        """Get the cached results of a lint test, if none of its inputs have changed.
+
+        Args:
+            test_name (str): Name of the lint test
+            file_index (PipelineFiles): Index of the files in the pipeline
+
+        Returns:
+            dict: The lint test results, or ``None`` if there is no valid cache entry
+        """
+        with self._lock:
+            entry = self.entries.get(test_name)
+            if entry is None or entry.get("config_hash") != self.config_hash:
+                return None
+            for input_name, input_hash in entry["inputs"].items():
+                if self._input_hash(file_index, input_name) != input_hash:
+                    log.debug(f"Lint cache for '{test_name}' is out of date: '{input_name}' has changed")
+                    return None
+            return entry["results"]
+
+    def put(self, test_name: str, file_index: PipelineFiles, inputs: set[str], results: dict) -> None:
+        """Store the results of a lint test.
+
+        Results of tests that fixed anything are not stored, as the test changed its own inputs.
+
+        Args:
+            test_name (str): Name of the lint test
+            file_index (PipelineFiles): Index of the files in the pipeline
+            inputs (set[str]): The files and file listings read by the lint test
+            results (dict): The lint test results
+        """
+        with self._lock:
+            if results.get("fixed"):
+                self.entries.pop(test_name, None)
+                self._input_hashes.clear()
+                return
+            self.entries[test_name] = {
+                "config_hash": self.config_hash,
+                "inputs": {input_name: self._input_hash(file_index, input_name) for input_name in sorted(inputs)},
+                "results": {k: v for k, v in results.items() if k in CACHED_RESULT_KEYS},
+            }
+
+    def save(self) -> None:
+        """Write the cache to disk"""
+        setup_nfcore_dir()
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            with self._lock:
+                content = json.dumps(self.entries, default=str)
+            atomic_write(self.cache_path, content)
+        except OSError as e:
+            log.debug(f"Could not write lint cache '{self.cache_path}': {e}")
+
+    def _input_hash(self, file_index: PipelineFiles, input_name: str) -> str | None:
+        """Hash one lint test input: either a file listing or the content of a file"""
+        if input_name not in self._input_hashes:
+            if input_name in ("git ls-files", "walk"):
+                files = file_index.git_files() if input_name == "git ls-files" else file_index.walk_files()
+                self._input_hashes[input_name] = _sha256("\n".join(file_index.relative_path(fn) for fn in files))
+            elif input_name.startswith("is_file:"):
+                self._input_hashes[input_name] = str(file_index.is_file(input_name.removeprefix("is_file:")))
+            elif file_index.is_file(input_name):
+                self._input_hashes[input_name] = hashlib.sha256(file_index.read_bytes(input_name)).hexdigest()
+            else:
+                self._input_hashes[input_name] = None
+        return self._input_hashes[input_name]
+
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
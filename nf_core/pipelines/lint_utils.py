@@ -1,6 +1,9 @@
 import json
 import logging
 import subprocess
+import threading
+from collections.abc import Generator
+from contextlib import contextmanager
 from pathlib import Path
 
 import rich
@@ -18,6 +21,11 @@ log = logging.getLogger(__name__)
 # Create a console used by all lint tests
 console = Console(force_terminal=nf_core.utils.rich_force_colors())
 
+# Files queued for prettier while inside deferred_prettier(), ``None`` when not deferring
+_deferred_prettier_files: list[str] | None = None
+# Guards _deferred_prettier_files, which files can be queued to from several threads
+_deferred_prettier_lock = threading.Lock()
+
 
 def print_results_plain_text(results_list, directory=None, component_type=None):
     """Print lint results in plain text format.
@@ -138,15 +146,56 @@ def check_git_repo() -> bool:
         return False
 
 
-def run_prettier_on_file(file: Path | str | list[str]) -> None:
+@contextmanager
+def deferred_prettier() -> Generator[None, None, None]:
+    """Format all files passed to :func:`run_prettier_on_file` in one prettier run at the end.
+
+    Every prettier run starts pre-commit, which is slow, so commands that write
+    many files queue them and format them all at once. Nested uses only format
+    the files when the outermost block ends. The files are not formatted inside
+    the block, so it should only wrap code that does not read them back.
+    """
+    global _deferred_prettier_files
+    with _deferred_prettier_lock:
+        outermost = _deferred_prettier_files is None
+        if outermost:
+            _deferred_prettier_files = []
+    if not outermost:
+        yield
+        return
+    try:
+        yield
+    finally:
+        with _deferred_prettier_lock:
+            files, _deferred_prettier_files = _deferred_prettier_files or [], None
+        # Skip duplicates and files that were removed again
+        files = [f for f in dict.fromkeys(files) if Path(f).is_file()]
+        if files:
+            log.debug(f"Running prettier on {len(files)} file{_s(files)}")
+            run_prettier_on_file(files)
+
+
+def run_prettier_on_file(file: Path | str | list[str], defer: bool = True) -> bool:
     """Run the pre-commit hook prettier on a file.
 
     Args:
         file (Path | str): A file identifier as a string or pathlib.Path.
+        defer (bool): Inside :func:`deferred_prettier`, queue the file to be formatted at the end of the block.
+            Set to ``False`` when the formatted file is needed right away.
+
+    Returns:
+        bool: True if the files were formatted, or queued to be formatted
 
     Warns:
         If Prettier is not installed, a warning is logged.
     """
+    if defer:
+        with _deferred_prettier_lock:
+            if _deferred_prettier_files is not None:
+                deferred_files = file if isinstance(file, list) else [file]
+                # Store absolute paths, as the working directory can change before the files are formatted
+                _deferred_prettier_files.extend(str(Path(f).absolute()) for f in deferred_files)
+                return True
 
     is_git = check_git_repo()
 
@@ -161,6 +210,7 @@ def run_prettier_on_file(file: Path | str | list[str]) -> None:
         try:
             proc = subprocess.run(args, capture_output=True, check=True)
             log.debug(f"{proc.stdout.decode()}")
+            return True
         except subprocess.CalledProcessError as e:
             if ": SyntaxError: " in e.stdout.decode():
                 log.critical(f"Can't format {file} because it has a syntax error.\n{e.stdout.decode()}")
@@ -168,6 +218,7 @@ def run_prettier_on_file(file: Path | str | list[str]) -> None:
                 all_lines = [line for line in e.stdout.decode().split("\n")]
                 files = "\n".join(all_lines[3:])
                 log.debug(f"The following files were modified by prettier:\n {files}")
+                return True
             else:
                 log.warning(
                     "There was an error running the prettier pre-commit hook.\n"
@@ -175,29 +226,86 @@ def run_prettier_on_file(file: Path | str | list[str]) -> None:
                 )
     else:
         log.debug("Not in a git repository, skipping pre-commit hook.")
+    return False
 
 
-def dump_json_with_prettier(file_name, file_content):
+def dump_json_with_prettier(file_name, file_content, defer=True):
     """Dump a JSON file and run prettier on it.
     Args:
         file_name (Path | str): A file identifier as a string or pathlib.Path.
         file_content (dict): Content to dump into the JSON file
+        defer (bool): Allow prettier to run later, see :func:`run_prettier_on_file`
     """
     with open(file_name, "w") as fh:
         json.dump(file_content, fh, indent=4)
-    run_prettier_on_file(file_name)
+    run_prettier_on_file(file_name, defer=defer)
+
 
+def format_json_like_prettier(content, tab_width: int = 4, print_width: int = 120) -> str:
+    """Format JSON content the same way as running prettier on the output of ``json.dump(content, fh, indent=4)``.
+
+    Objects that are not empty are always expanded, like prettier does when the input has a line break
+    after the opening brace. Arrays are kept on one line if they fit within ``print_width``,
+    otherwise they get one element per line.
+
+    Args:
+        content: The JSON content
+        tab_width (int): The indentation width
+        print_width (int): The maximum line width
+
+    Returns:
+        str: The formatted JSON, with a trailing newline
+    """
 
-def dump_yaml_with_prettier(file_name: Path | str, file_content: dict) -> None:
+    def flat(value) -> str | None:
+        """The value on a single line, or None if it needs line breaks"""
+        if isinstance(value, dict):
+            return None if value else "{}"
+        if isinstance(value, list):
+            # Prettier always breaks arrays of several arrays with more than one element
+            if len(value) > 1 and all(isinstance(item, list) and len(item) > 1 for item in value):
+                return None
+            items = [flat(item) for item in value]
+            if any(item is None for item in items):
+                return None
+            return "[" + ", ".join(str(item) for item in items) + "]"
+        return json.dumps(value)
+
+    def format_value(value, level: int, column: int, suffix: str) -> str:
+        """Format a value starting at a column, followed by a suffix on the same line"""
+        indent = " " * (tab_width * (level + 1))
+        if isinstance(value, dict) and value:
+            items = []
+            for i, (key, item) in enumerate(value.items()):
+                prefix = f"{indent}{json.dumps(key)}: "
+                item_suffix = "," if i < len(value) - 1 else ""
+                items.append(prefix + format_value(item, level + 1, len(prefix), item_suffix) + item_suffix)
+            return "{\n" + "\n".join(items) + "\n" + " " * (tab_width * level) + "}"
+        if isinstance(value, list) and value:
+            single_line = flat(value)
+            if single_line is not None and column + len(single_line) + len(suffix) <= print_width:
+                return single_line
+            items = []
+            for i, item in enumerate(value):
+                item_suffix = "," if i < len(value) - 1 else ""
+                items.append(indent + format_value(item, level + 1, len(indent), item_suffix) + item_suffix)
+            return "[\n" + "\n".join(items) + "\n" + " " * (tab_width * level) + "]"
+        return flat(value)  # type: ignore[return-value]
+
+    return format_value(content, 0, 0, "") + "\n"
+
+
+def dump_yaml_with_prettier(file_name: Path | str, file_content: dict, defer: bool = True) -> None:
     """Dump a YAML file and run prettier on it.
 
     Args:
         file_name (Path | str): A file identifier as a string or pathlib.Path.
         file_content (dict): Content to dump into the YAML file
+        defer (bool): Allow prettier to run later, see :func:`run_prettier_on_file`
     """
     with open(file_name, "w") as fh:
         yaml.safe_dump(file_content, fh)
-    run_prettier_on_file(file_name)
+    run_prettier_on_file(file_name, defer=defer)
 
 
 def ignore_file(lint_name: str, file_path: Path, dir_path: Path) -> list[list[str]]:
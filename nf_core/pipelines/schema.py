@@ -576,7 +576,7 @@ class PipelineSchema:
 
         with tempfile.NamedTemporaryFile(mode="w+") as fh:
             fh.write(output)
-            run_prettier_on_file(fh.name)
+            run_prettier_on_file(fh.name, defer=False)
             fh.seek(0)
             prettified_docs = fh.read()
 
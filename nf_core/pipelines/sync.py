@@ -327,7 +327,9 @@ class PipelineSync:
                 self.config_yml.template.outdir = "."
                 # Update nf-core version
                 self.config_yml.nf_core_version = nf_core.__version__
-                dump_yaml_with_prettier(self.config_yml_path, self.config_yml.model_dump(exclude_none=True))
+                dump_yaml_with_prettier(
+                    self.config_yml_path, self.config_yml.model_dump(exclude_none=True), defer=False
+                )
 
         except Exception as err:
             # Reset to where you were to prevent git getting messed up.
@@ -53,6 +53,7 @@ class SubworkflowLint(ComponentLint):
         no_pull=False,
         registry=None,
         hide_progress=False,
+        jobs=1,
     ):
         super().__init__(
             component_type="subworkflows",
@@ -64,6 +65,7 @@ class SubworkflowLint(ComponentLint):
             no_pull=no_pull,
             registry=registry,
             hide_progress=hide_progress,
+            jobs=jobs,
         )
 
     def lint(
@@ -187,9 +189,17 @@ class SubworkflowLint(ComponentLint):
                 test_name=subworkflows[0].component_name,
             )
 
-            for swf in subworkflows:
-                progress_bar.update(lint_progress, advance=1, test_name=swf.component_name)
-                self.lint_subworkflow(swf, progress_bar, registry=registry, local=local)
+            if self.jobs > 1:
+                self._lint_components_parallel(
+                    subworkflows,
+                    lambda swf: self.lint_subworkflow(swf, progress_bar, registry=registry, local=local),
+                    progress_bar,
+                    lint_progress,
+                )
+            else:
+                for swf in subworkflows:
+                    progress_bar.update(lint_progress, advance=1, test_name=swf.component_name)
+                    self.lint_subworkflow(swf, progress_bar, registry=registry, local=local)
 
     def lint_subworkflow(self, swf, progress_bar, registry, local=False):
         """
@@ -294,4 +304,4 @@ class SubworkflowLint(ComponentLint):
         with open(swf.meta_yml, "w") as fh:
             log.info(f"Updating {swf.meta_yml}")
             yaml.dump(meta_yaml_corrected, fh)
-            run_prettier_on_file(fh.name)
+            run_prettier_on_file(fh.name, defer=False)
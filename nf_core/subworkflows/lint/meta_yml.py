@@ -58,8 +58,12 @@ def meta_yml(subworkflow_lint_object, subworkflow, allow_missing: bool = False):
     # Confirm that the meta.yml file is valid according to the JSON schema
     valid_meta_yml = True
     try:
-        with open(Path(subworkflow_lint_object.modules_repo.local_repo_dir, "subworkflows/yaml-schema.json")) as fh:
-            schema = json.load(fh)
+        schema_contents = subworkflow_lint_object.modules_repo.read_file("subworkflows/yaml-schema.json")
+        if schema_contents is None:
+            raise LookupError(
+                f"'subworkflows/yaml-schema.json' not found in '{subworkflow_lint_object.modules_repo.remote_url}'"
+            )
+        schema = json.loads(schema_contents)
         jsonschema.validators.validate(instance=meta_yaml, schema=schema)
         subworkflow.passed.append(
             ("meta_yml", "meta_yml_valid", "Subworkflow `meta.yml` is valid", subworkflow.meta_yml)
@@ -42,12 +42,20 @@ def subworkflow_version(subworkflow_lint_object, subworkflow):
         subworkflow.branch = subworkflow_lint_object.modules_json.get_component_branch(
             "subworkflows", subworkflow.component_name, subworkflow.repo_url, subworkflow.org
         )
-        modules_repo = nf_core.modules.modules_repo.ModulesRepo(
-            remote_url=subworkflow.repo_url, branch=subworkflow.branch
-        )
+        if (subworkflow.repo_url, subworkflow.branch) == (
+            subworkflow_lint_object.modules_repo.remote_url,
+            subworkflow_lint_object.modules_repo.branch,
+        ):
+            modules_repo = subworkflow_lint_object.modules_repo
+        else:
+            modules_repo = nf_core.modules.modules_repo.ModulesRepo(
+                remote_url=subworkflow.repo_url, branch=subworkflow.branch
+            )
 
-        subworkflow_git_log = modules_repo.get_component_git_log(subworkflow.component_name, "subworkflows")
-        if version == next(subworkflow_git_log)["git_sha"]:
+        latest_version = modules_repo.get_latest_component_version(subworkflow.component_name, "subworkflows")
+        if latest_version is None:
+            raise UserWarning(f"Could not find the latest version of '{subworkflow.component_name}'")
+        if version == latest_version:
             subworkflow.passed.append(
                 (
                     "subworkflow_version",
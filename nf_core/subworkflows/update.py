@@ -16,6 +16,7 @@ class SubworkflowUpdate(ComponentUpdate):
         branch=None,
         no_pull=False,
         limit_output=False,
+        jobs=1,
     ):
         super().__init__(
             pipeline_dir,
@@ -31,4 +32,5 @@ class SubworkflowUpdate(ComponentUpdate):
             branch,
             no_pull,
             limit_output,
+            jobs,
         )
@@ -1,19 +1,33 @@
-import filecmp
+import functools
+import hashlib
+import json
 import logging
 import os
+import re
 import shutil
-from collections.abc import Iterable
+import stat
+import sys
+import threading
+import time
+from collections.abc import Generator, Iterable
 from configparser import NoOptionError, NoSectionError
+from contextlib import contextmanager
 from pathlib import Path
 
 import git
 from git.exc import GitCommandError
 
 from nf_core.components.constants import NF_CORE_MODULES_DEFAULT_BRANCH, NF_CORE_MODULES_NAME, NF_CORE_MODULES_REMOTE
-from nf_core.utils import load_tools_config
+from nf_core.utils import NFCORE_CACHE_DIR, atomic_write, copy_file_data, load_tools_config
+
+if sys.platform != "win32":
+    import fcntl
 
 log = logging.getLogger(__name__)
 
+# Files compared to find the version of an installed module/subworkflow
+COMPONENT_FILES = ["main.nf", "meta.yml"]
+
 
 class RemoteProgressbar(git.RemoteProgress):
     """
@@ -57,6 +71,361 @@ class RemoteProgressbar(git.RemoteProgress):
         self.progress_bar.update(self.tid, total=max_count, completed=cur_count, state=state)
 
 
+# Seconds after which unused worktrees of a local clone are removed
+WORKTREE_MAX_AGE = 24 * 60 * 60
+
+# Seconds after which unused modules/subworkflows are removed from the component store
+COMPONENT_STORE_MAX_AGE = 30 * 24 * 60 * 60
+
+# Open lock files of the local clones locked by this process, with the number of nested locks
+_clone_locks: dict[Path, tuple[int, int]] = {}
+
+# git.Repo objects are not thread-safe, so each thread reads git objects through its own
+_thread_repos = threading.local()
+
+
+def with_repo_lock(func):
+    """
+    Decorator holding :attr:`SyncedRepo.repo_lock` while the wrapped method runs.
+
+    Used for methods that use the shared local clone, so that they can be called from several threads.
+    """
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with SyncedRepo.repo_lock:
+            return func(*args, **kwargs)
+
+    return wrapper
+
+
+@contextmanager
+def clone_lock(local_repo_dir: str | Path) -> Generator[None, None, None]:
+    """
+    Locks a local clone against changes by other processes, e.g. other nf-core commands running
+    at the same time. The lock can be nested within a process.
+
+    Held while the clone is cloned, fetched or checked out. Reading from git objects does not need it.
+    Does not lock between processes on Windows.
+
+    Args:
+        local_repo_dir (str | Path): The directory of the local clone
+    """
+    lock_path = Path(f"{local_repo_dir}.lock")
+    with SyncedRepo.repo_lock:
+        if lock_path in _clone_locks:
+            fd, depth = _clone_locks[lock_path]
+        else:
+            lock_path.parent.mkdir(parents=True, exist_ok=True)
+            fd, depth = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o644), 0
+            if sys.platform != "win32":
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    log.info(f"Waiting for another nf-core command to finish updating '{local_repo_dir}'")
+                    fcntl.flock(fd, fcntl.LOCK_EX)
+        _clone_locks[lock_path] = (fd, depth + 1)
+        try:
+            yield
+        finally:
+            fd, depth = _clone_locks.pop(lock_path)
+            if depth > 1:
+                _clone_locks[lock_path] = (fd, depth - 1)
+            else:
+                # Closing the file releases the lock
+                os.close(fd)
+
+
+def remove_clone(local_repo_dir: str | Path) -> None:
+    """
+    Removes a local clone, together with its worktrees.
+
+    The worktrees in ``<local_repo_dir>-worktrees`` are registered in the git directory of the clone,
+    so they can not be used without it.
+
+    Args:
+        local_repo_dir (str | Path): The directory of the local clone
+    """
+    shutil.rmtree(local_repo_dir, ignore_errors=True)
+    shutil.rmtree(f"{local_repo_dir}-worktrees", ignore_errors=True)
+
+
+def git_blob_sha(path: str | Path) -> str | None:
+    """
+    Computes the SHA git would give a file as a blob object, without needing a git repository
+
+    Args:
+        path (str | Path): Path to the file
+
+    Returns:
+        (str | None): The blob SHA, or None if the file does not exist
+    """
+    try:
+        data = Path(path).read_bytes()
+    except FileNotFoundError:
+        return None
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+def write_tree(tree: git.Tree, path: Path) -> None:
+    """
+    Writes the files of a git tree object to a directory, keeping their file modes
+
+    Args:
+        tree (git.Tree): The tree to write
+        path (Path): The directory to write to. It is created if it does not exist
+    """
+    path.mkdir(parents=True, exist_ok=True)
+    for blob in tree.blobs:
+        if blob.mode == git.Blob.link_mode:
+            Path(path, blob.name).symlink_to(blob.data_stream.read().decode())
+        else:
+            with open(Path(path, blob.name), "wb") as fh:
+                blob.stream_data(fh)
+            Path(path, blob.name).chmod(stat.S_IMODE(blob.mode))
+    for subtree in tree.trees:
+        write_tree(subtree, Path(path, subtree.name))
+
+
+class ComponentBlobIndex:
+    """
+    The versions (as git blob SHAs) of the files of modules/subworkflows at each commit of a remote,
+    and the reverse: the latest commit of a branch with each version of the files of a module/subworkflow.
+
+    Commits never change, so entries are kept between sessions in the nf-core cache directory,
+    one file per remote. The reverse entries are updated when the branch has new commits.
+
+    Args:
+        remote_url (str): The git url of the remote repository
+    """
+
+    def __init__(self, remote_url: str) -> None:
+        self.remote_url = remote_url
+        self.path = Path(
+            NFCORE_CACHE_DIR, "component-index", f"{hashlib.sha256(remote_url.encode()).hexdigest()[:25]}.json"
+        )
+        self.entries: dict[str, dict[str, list[str | None]]] = {}
+        # By branch and component directory, see SyncedRepo.get_component_commits_by_files
+        self.commits_by_files: dict[str, dict] = {}
+        self.changed = False
+        try:
+            with open(self.path) as fh:
+                index = json.load(fh)
+            self.entries = index["blob_shas"]
+            self.commits_by_files = index["commits_by_files"]
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            log.debug(f"Ignoring unreadable component index '{self.path}': {e}")
+
+    def __repr__(self) -> str:
+        return f"ComponentBlobIndex({self.remote_url})"
+
+    def get(self, component_dir: str, commit: str) -> list[str | None] | None:
+        """
+        Returns the blob SHAs of the files in :data:`COMPONENT_FILES` of a component at a commit, if known
+        """
+        return self.entries.get(component_dir, {}).get(commit)
+
+    def add(self, component_dir: str, commit: str, blob_shas: list[str | None]) -> None:
+        """
+        Remembers the blob SHAs of the files in :data:`COMPONENT_FILES` of a component at a commit
+        """
+        self.entries.setdefault(component_dir, {})[commit] = blob_shas
+        self.changed = True
+
+    @staticmethod
+    def files_key(blob_shas: list[str | None]) -> str:
+        """
+        Returns the key of a version of the files in :data:`COMPONENT_FILES` of a component in :attr:`commits_by_files`
+        """
+        return " ".join(blob_sha or "-" for blob_sha in blob_shas)
+
+    def save(self) -> None:
+        """
+        Writes the index to disk, if anything was added
+        """
+        if not self.changed:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            atomic_write(self.path, json.dumps({"blob_shas": self.entries, "commits_by_files": self.commits_by_files}))
+            self.changed = False
+        except OSError as e:
+            log.debug(f"Could not write component index '{self.path}': {e}")
+
+
+class ComponentStore:
+    """
+    Content-addressed store of the files of modules/subworkflows, shared by all pipelines.
+
+    Files are stored once, by their git blob SHA. The files of a module/subworkflow at a commit
+    of a remote are stored as a list of blob SHAs, so installing a module/subworkflow that is in
+    the store needs neither the local clone nor a copy of the git objects.
+
+    Files are cloned copy-on-write into pipelines where the file system supports it, and copied otherwise,
+    so that changes to the files of a pipeline never reach the store. Stored files are still checked
+    against their blob SHA before they are used, and replaced from the local clone if they have changed.
+
+    Modules/subworkflows that have not been used for :data:`COMPONENT_STORE_MAX_AGE` seconds are removed
+    from the store, together with the files no other module/subworkflow uses, see :meth:`prune`.
+
+    Args:
+        remote_url (str): The git url of the remote repository
+    """
+
+    # Whether the store has been pruned by this process
+    pruned = False
+
+    def __init__(self, remote_url: str) -> None:
+        self.remote_url = remote_url
+        self.path = Path(NFCORE_CACHE_DIR, "component-store")
+        self.remote_hash = hashlib.sha256(remote_url.encode()).hexdigest()[:25]
+
+    def __repr__(self) -> str:
+        return f"ComponentStore({self.remote_url})"
+
+    def object_path(self, blob_sha: str) -> Path:
+        """
+        Returns the path of a stored file
+        """
+        return Path(self.path, "objects", blob_sha[:2], blob_sha[2:])
+
+    def tree_path(self, component_dir: str, commit: str) -> Path | None:
+        """
+        Returns the path of the file list of a module/subworkflow at a commit,
+        or None if the commit is not a full SHA and could point to other files later
+        """
+        if re.fullmatch(r"[0-9a-f]{40}", commit) is None:
+            return None
+        return Path(self.path, "trees", self.remote_hash, component_dir, f"{commit}.json")
+
+    def get(self, component_dir: str, commit: str) -> dict[str, list] | None:
+        """
+        Returns the files of a module/subworkflow at a commit, if it is in the store
+
+        Args:
+            component_dir (str): Path of the module/subworkflow, relative to the root of the repository
+            commit (str): The git SHA of the version
+
+        Returns:
+            (dict[str, list] | None): The blob SHA and mode of each file, by path relative to the module/subworkflow
+        """
+        tree_path = self.tree_path(component_dir, commit)
+        if tree_path is None:
+            return None
+        try:
+            with open(tree_path) as fh:
+                files = json.load(fh)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            log.debug(f"Ignoring unreadable component store entry '{tree_path}': {e}")
+            return None
+        # Mark the module/subworkflow as used, see prune
+        try:
+            os.utime(tree_path)
+        except OSError:
+            pass
+        return files
+
+    def add(self, component_dir: str, commit: str, tree: git.Tree) -> dict[str, list]:
+        """
+        Adds the files of a module/subworkflow at a commit to the store
+
+        Args:
+            component_dir (str): Path of the module/subworkflow, relative to the root of the repository
+            commit (str): The git SHA of the version
+            tree (git.Tree): The directory of the module/subworkflow at the commit
+
+        Returns:
+            (dict[str, list]): The blob SHA and mode of each file, by path relative to the module/subworkflow
+        """
+        if not ComponentStore.pruned:
+            ComponentStore.pruned = True
+            try:
+                self.prune()
+            except OSError as e:
+                log.debug(f"Could not prune the component store: {e}")
+        files: dict[str, list] = {}
+        for item in tree.traverse():
+            if not isinstance(item, git.Blob):
+                continue
+            object_path = self.object_path(item.hexsha)
+            if git_blob_sha(object_path) != item.hexsha:
+                object_path.parent.mkdir(parents=True, exist_ok=True)
+                atomic_write(object_path, item.data_stream.read())
+            files[Path(item.path).relative_to(tree.path).as_posix()] = [item.hexsha, item.mode]
+        tree_path = self.tree_path(component_dir, commit)
+        if tree_path is not None:
+            tree_path.parent.mkdir(parents=True, exist_ok=True)
+            atomic_write(tree_path, json.dumps(files))
+        return files
+
+    def prune(self, max_age: float = COMPONENT_STORE_MAX_AGE) -> None:
+        """
+        Removes the modules/subworkflows of all remotes that have not been used for a while from the store,
+        and then the stored files that are not used by any of the remaining ones
+
+        Args:
+            max_age (float): Seconds after which unused modules/subworkflows and files are removed
+        """
+        used_objects: set[str] = set()
+        for tree_path in Path(self.path, "trees").rglob("*.json"):
+            try:
+                if time.time() - tree_path.stat().st_mtime > max_age:
+                    log.debug(f"Removing unused component store entry '{tree_path}'")
+                    tree_path.unlink()
+                    continue
+                with open(tree_path) as fh:
+                    used_objects.update(blob_sha for blob_sha, _ in json.load(fh).values())
+            except FileNotFoundError:
+                continue  # Removed by another process
+            except (OSError, ValueError) as e:
+                log.debug(f"Removing unreadable component store entry '{tree_path}': {e}")
+                tree_path.unlink(missing_ok=True)
+        for object_path in Path(self.path, "objects").glob("*/*"):
+            try:
+                # Recently written files may belong to a module/subworkflow that is being added by another process
+                if (
+                    object_path.parent.name + object_path.name not in used_objects
+                    and time.time() - object_path.stat().st_mtime > max_age
+                ):
+                    log.debug(f"Removing unused component store file '{object_path}'")
+                    object_path.unlink()
+            except FileNotFoundError:
+                continue
+
+    def materialize(self, files: dict[str, list], path: Path) -> bool:
+        """
+        Writes stored files of a module/subworkflow to a directory
+
+        Args:
+            files (dict[str, list]): The files, as returned by :meth:`get`
+            path (Path): The directory to write to. It is created if it does not exist
+
+        Returns:
+            (bool): Whether the files were written. False if any of them is missing or has changed in the store
+        """
+        for blob_sha, _ in files.values():
+            if git_blob_sha(self.object_path(blob_sha)) != blob_sha:
+                log.debug(f"Stored file '{blob_sha}' is missing or has changed")
+                return False
+        for relpath, (blob_sha, mode) in files.items():
+            object_path = self.object_path(blob_sha)
+            dest = Path(path, relpath)
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            if mode == git.Blob.link_mode:
+                dest.symlink_to(object_path.read_text())
+                continue
+            # Replace the file instead of writing into it, as it may be hard linked to other files
+            dest.unlink(missing_ok=True)
+            with open(object_path, "rb") as fsrc, open(dest, "wb") as fdest:
+                copy_file_data(fsrc, fdest)
+            dest.chmod(stat.S_IMODE(mode))
+        return True
+
+
 class SyncedRepo:
     """
     An object to store details about a locally cached code repository.
@@ -64,6 +433,17 @@ class SyncedRepo:
 
     local_repo_statuses: dict[str, bool] = {}
     no_pull_global = False
+    # Guards the working trees of the local clones, which are shared by all objects in this process
+    repo_lock = threading.RLock()
+    # Created when first needed, as subclasses do not all call SyncedRepo.__init__
+    _blob_index: ComponentBlobIndex | None = None
+    # Commit of the tip of the branch, when a worktree is used instead of checking out the branch
+    worktree_sha: str | None = None
+    # The local clone, which local_repo_dir and repo point to unless a worktree is used
+    clone_dir: Path | None = None
+    clone_repo: git.Repo | None = None
+    # Latest commit of each module/subworkflow, by remote, component type and commit of the tip of the branch
+    _latest_versions: dict[tuple[str, str, str], dict[str, str]] = {}
 
     @staticmethod
     def local_repo_synced(repo_name):
@@ -149,6 +529,60 @@ class SyncedRepo:
     def __repr__(self) -> str:
         return f"SyncedRepo({self.remote_url}, {self.branch})"
 
+    @property
+    def branch_ref(self) -> str:
+        """
+        The git ref that is read for the tip of the branch
+        """
+        return self.worktree_sha or self.branch
+
+    @property
+    def object_repo(self) -> git.Repo:
+        """
+        A git.Repo of the local clone for reading git objects, private to the current thread
+        """
+        if self.repo is None:
+            raise ValueError("Repository not initialized")
+        repos: dict[str, git.Repo] = _thread_repos.__dict__.setdefault("repos", {})
+        if self.repo.working_dir not in repos:
+            repos[self.repo.working_dir] = git.Repo(self.repo.working_dir)
+        return repos[self.repo.working_dir]
+
+    @with_repo_lock
+    def get_worktree(self, commit: str) -> Path:
+        """
+        Returns a worktree of the local clone checked out at a commit, creating it if needed.
+
+        Worktrees share the git objects of the clone, but have their own working tree,
+        so several nf-core commands can use different commits at the same time.
+        A worktree is never changed after it was created, so it can be shared between commands.
+        Worktrees that have not been used for :data:`WORKTREE_MAX_AGE` seconds are removed.
+
+        Args:
+            commit (str): A git SHA, branch or tag
+
+        Returns:
+            (Path): The directory of the worktree
+        """
+        clone_repo = self.clone_repo or self.repo
+        clone_dir = self.clone_dir or self.local_repo_dir
+        if clone_repo is None or clone_dir is None:
+            raise ValueError("Repository not initialized")
+        sha = clone_repo.commit(commit).hexsha
+        worktrees_dir = Path(f"{clone_dir}-worktrees")
+        worktree_dir = Path(worktrees_dir, sha)
+        with clone_lock(clone_dir):
+            if not worktree_dir.is_dir():
+                log.debug(f"Creating worktree of '{self.remote_url}' at '{sha}'")
+                clone_repo.git.worktree("prune")
+                clone_repo.git.worktree("add", "--detach", str(worktree_dir), sha)
+            worktree_dir.touch()
+            for old_worktree in worktrees_dir.iterdir():
+                if old_worktree.is_dir() and time.time() - old_worktree.stat().st_mtime > WORKTREE_MAX_AGE:
+                    log.debug(f"Removing unused worktree '{old_worktree}'")
+                    clone_repo.git.worktree("remove", "--force", str(old_worktree))
+        return worktree_dir
+
     def setup_local_repo(self, remote_url, branch, hide_progress):
         pass
 
@@ -172,13 +606,16 @@ class SyncedRepo:
 
         return True
 
-    def setup_branch(self, branch):
+    def setup_branch(self, branch, worktree=False):
         """
         Verify that we have a branch and otherwise use the default one.
         The branch is then checked out to verify that it exists in the repo.
 
         Args:
             branch (str): Name of branch
+            worktree (bool): Use a worktree at the tip of the remote branch instead of checking out the branch.
+                Once a worktree is used, switching branches always switches to another worktree,
+                as worktrees are shared and must not be changed.
         """
         if branch is None:
             # Don't bother fetching default branch if we're using nf-core
@@ -189,6 +626,18 @@ class SyncedRepo:
         else:
             self.branch = branch
 
+        if worktree or self.worktree_sha is not None:
+            # Verify that the branch exists without checking it out, and switch to the worktree at its tip
+            clone_repo = self.clone_repo or self.repo
+            try:
+                sha = clone_repo.commit(f"origin/{self.branch}").hexsha
+            except (git.BadName, ValueError):
+                raise LookupError(f"Branch '{self.branch}' not found in '{self.remote_url}'")
+            self.local_repo_dir = self.get_worktree(sha)
+            self.repo = git.Repo(self.local_repo_dir)
+            self.worktree_sha = sha
+            return
+
         # Verify that the branch exists by checking it out
         self.branch_exists()
 
@@ -213,7 +662,8 @@ class SyncedRepo:
         """
         Verifies the active branch conforms to the correct directory structure
         """
-        dir_names = os.listdir(self.local_repo_dir)
+        # Read from the git objects, as a sparse checkout only contains the files at the root
+        dir_names = [tree.name for tree in self.get_tree(".").trees]
         if "modules" not in dir_names:
             err_str = f"Repository '{self.remote_url}' ({self.branch}) does not contain the 'modules/' directory"
             if "software" in dir_names:
@@ -222,23 +672,26 @@ class SyncedRepo:
                 )
             raise LookupError(err_str)
 
+    @with_repo_lock
     def checkout_branch(self):
         """
         Checks out the specified branch of the repository
         """
-        try:
-            self.repo.git.checkout(self.branch)
-        except GitCommandError as e:
-            if (
-                self.fullname
-                and "modules" in self.fullname
-                and "Your local changes to the following files would be overwritten by checkout" in str(e)
-            ):
-                log.debug(f"Overwriting local changes in '{self.local_repo_dir}'")
-                self.repo.git.checkout(self.branch, force=True)
-            else:
-                raise e
-
+        with clone_lock(self.local_repo_dir):
+            try:
+                self.repo.git.checkout(self.branch)
+            except GitCommandError as e:
+                if (
+                    self.fullname
+                    and "modules" in self.fullname
+                    and "Your local changes to the following files would be overwritten by checkout" in str(e)
+                ):
+                    log.debug(f"Overwriting local changes in '{self.local_repo_dir}'")
+                    self.repo.git.checkout(self.branch, force=True)
+                else:
+                    raise e
+
+    @with_repo_lock
     def checkout(self, commit):
         """
         Checks out the repository at the requested commit
@@ -246,30 +699,32 @@ class SyncedRepo:
         Args:
             commit (str): Git SHA of the commit
         """
-        try:
-            self.repo.git.checkout(commit)
-        except GitCommandError as e:
-            if (
-                self.fullname
-                and "modules" in self.fullname
-                and "Your local changes to the following files would be overwritten by checkout" in str(e)
-            ):
-                log.debug(f"Overwriting local changes in '{self.local_repo_dir}'")
-                self.repo.git.checkout(self.branch, force=True)
-            else:
-                raise e
-
-    def component_exists(self, component_name, component_type, checkout=True, commit=None):
+        with clone_lock(self.local_repo_dir):
+            try:
+                self.repo.git.checkout(commit)
+            except GitCommandError as e:
+                if (
+                    self.fullname
+                    and "modules" in self.fullname
+                    and "Your local changes to the following files would be overwritten by checkout" in str(e)
+                ):
+                    log.debug(f"Overwriting local changes in '{self.local_repo_dir}'")
+                    self.repo.git.checkout(self.branch, force=True)
+                else:
+                    raise e
+
+    def component_exists(self, component_name, component_type, commit=None):
         """
         Check if a module/subworkflow exists in the branch of the repo
 
         Args:
             component_name (str): The name of the module/subworkflow
+            commit (str): The git SHA to look at. Defaults to the tip of the branch
 
         Returns:
             (bool): Whether the module/subworkflow exists in this branch of the repository
         """
-        return component_name in self.get_avail_components(component_type, checkout=checkout, commit=commit)
+        return self.get_component_tree(component_name, component_type, commit) is not None
 
     def get_component_dir(self, component_name: str, component_type: str) -> Path:
         """
@@ -288,10 +743,119 @@ class SyncedRepo:
         else:
             raise ValueError(f"Invalid component type: {component_type}")
 
+    def get_tree(self, path: str | Path, commit: str | None = None) -> git.Tree | None:
+        """
+        Returns a directory of the repository at a commit, read from the git objects
+        without changing the working tree
+
+        Args:
+            path (str | Path): Path of the directory, relative to the root of the repository
+            commit (str): The git SHA to read from. Defaults to the tip of the branch
+
+        Returns:
+            (git.Tree | None): The directory, or None if it does not exist at this commit
+
+        Raises:
+            LookupError: If the commit does not exist
+        """
+        if self.repo is None:
+            raise ValueError("Repository not initialized")
+        try:
+            tree = self.object_repo.commit(commit or self.branch_ref).tree
+        except (git.BadName, ValueError):
+            # The commit may have been pushed after the local clone was last synced
+            if commit is None or not self.fetch_missing_commit(commit):
+                raise LookupError(f"Commit '{commit or self.branch_ref}' not found in '{self.remote_url}'")
+            try:
+                tree = self.object_repo.commit(commit).tree
+            except (git.BadName, ValueError):
+                raise LookupError(f"Commit '{commit}' not found in '{self.remote_url}'")
+        if Path(path) == Path("."):
+            return tree
+        try:
+            item = tree / Path(path).as_posix()
+        except KeyError:
+            return None
+        return item if isinstance(item, git.Tree) else None
+
+    def read_file(self, path: str | Path, commit: str | None = None) -> str | None:
+        """
+        Returns the contents of a file of the repository at a commit, read from the git objects
+
+        Args:
+            path (str | Path): Path of the file, relative to the root of the repository
+            commit (str): The git SHA to read from. Defaults to the tip of the branch
+
+        Returns:
+            (str | None): The contents of the file, or None if it does not exist at this commit
+        """
+        tree = self.get_tree(Path(path).parent, commit)
+        blob = next((blob for blob in tree.blobs if blob.name == Path(path).name), None) if tree is not None else None
+        if blob is None:
+            return None
+        return blob.data_stream.read().decode()
+
+    @with_repo_lock
+    def fetch_missing_blobs(self, tree: git.Tree) -> None:
+        """
+        Downloads all files of a tree that are missing from a partial clone in one request,
+        instead of letting git fetch them one at a time when they are read
+
+        Args:
+            tree (git.Tree): The tree whose files are needed
+        """
+        if self.repo is None:
+            raise ValueError("Repository not initialized")
+        with self.repo.config_reader() as git_config:
+            if not git_config.get_value('remote "origin"', "promisor", default=False):
+                return
+        try:
+            missing = [
+                line[1:]
+                for line in self.repo.git.rev_list(tree.hexsha, objects=True, missing="print").splitlines()
+                if line.startswith("?")
+            ]
+            if missing:
+                log.debug(f"Fetching {len(missing)} files of '{tree.path}' from '{self.remote_url}'")
+                self.repo.git(c="fetch.negotiationAlgorithm=noop").fetch(
+                    "origin",
+                    *missing,
+                    no_tags=True,
+                    no_write_fetch_head=True,
+                    recurse_submodules="no",
+                    filter="blob:none",
+                )
+        except GitCommandError as e:
+            # git fetches the missing files itself when they are read
+            log.debug(f"Could not fetch missing files of '{tree.path}': {e}")
+
+    def get_component_tree(
+        self, component_name: str | Path, component_type: str, commit: str | None = None
+    ) -> git.Tree | None:
+        """
+        Returns the directory of a module/subworkflow at a commit, if it is a module/subworkflow,
+        i.e. it has a 'main.nf' file
+
+        Args:
+            component_name (str): The name of the module/subworkflow
+            component_type (str): Either 'modules' or 'subworkflows'
+            commit (str): The git SHA to read from. Defaults to the tip of the branch
+
+        Returns:
+            (git.Tree | None): The directory of the module/subworkflow
+        """
+        tree = self.get_tree(Path(component_type, self.repo_path, component_name), commit)
+        if tree is None or not any(blob.name == "main.nf" for blob in tree.blobs):
+            return None
+        return tree
+
     def install_component(self, component_name: str, install_dir: str | Path, commit: str, component_type: str) -> bool:
         """
         Install the module/subworkflow files into a pipeline at the given commit
 
+        The files are read from the :class:`ComponentStore`, or from the git objects if they are not
+        in the store yet, so the working tree of the local copy is not changed.
+
         Args:
             component_name (str): The name of the module/subworkflow
             install_dir (str): The path where the module/subworkflow should be installed
@@ -301,24 +865,36 @@ class SyncedRepo:
         Returns:
             (bool): Whether the operation was successful or not
         """
-        # Check out the repository at the requested ref
+        store = ComponentStore(self.remote_url)
+        component_dir = Path(component_type, self.repo_path, component_name).as_posix()
+        files = store.get(component_dir, commit)
         try:
-            self.checkout(commit)
-        except git.GitCommandError:
+            if files is not None and store.materialize(files, Path(install_dir, component_name)):
+                return True
+        except OSError as e:
+            log.debug(f"Could not install '{component_dir}' from the component store: {e}")
+
+        try:
+            tree = self.get_component_tree(component_name, component_type, commit)
+        except LookupError:
             return False
 
         # Check if the module/subworkflow exists in the branch
-        if not self.component_exists(component_name, component_type, checkout=False):
+        if tree is None:
             log.error(
                 f"The requested {component_type[:-1]} does not exists in the branch '{self.branch}' of {self.remote_url}'"
             )
             return False
 
-        # Copy the files from the repo to the install folder
-        shutil.copytree(self.get_component_dir(component_name, component_type), Path(install_dir, component_name))
-
-        # Switch back to the tip of the branch
-        self.checkout_branch()
+        # Write the files from the repo to the install folder
+        self.fetch_missing_blobs(tree)
+        try:
+            files = store.add(component_dir, commit, tree)
+            if store.materialize(files, Path(install_dir, component_name)):
+                return True
+        except OSError as e:
+            log.debug(f"Could not add '{component_dir}' to the component store: {e}")
+        write_tree(tree, Path(install_dir, component_name))
         return True
 
     def component_files_identical(self, component_name, base_path, commit, component_type):
@@ -327,26 +903,162 @@ class SyncedRepo:
         Args:
             component_name (str): The name of the module or subworkflow
             base_path (str): The path to the module/subworkflow in the pipeline
+            commit (str): The git SHA to compare with. Defaults to the tip of the branch
 
         Returns:
             (bool): Whether the pipeline files are identical to the repo files
         """
-        if commit is None:
-            self.checkout_branch()
+        component_dir = Path(component_type, self.repo_path, component_name)
+        # Use the blob SHAs in the component store if the component was installed from it
+        stored_files = ComponentStore(self.remote_url).get(component_dir.as_posix(), commit) if commit else None
+        if stored_files is not None:
+            remote_shas = [stored_files[file][0] if file in stored_files else None for file in COMPONENT_FILES]
         else:
-            self.checkout(commit)
-        component_files = ["main.nf", "meta.yml"]
-        files_identical = {file: True for file in component_files}
-        component_dir = self.get_component_dir(component_name, component_type)
-        for file in component_files:
-            try:
-                files_identical[file] = filecmp.cmp(Path(component_dir, file), Path(base_path, file))
-            except FileNotFoundError:
+            remote_shas = self.get_blob_shas(component_dir, COMPONENT_FILES, commit)
+        files_identical = {file: True for file in COMPONENT_FILES}
+        for file, remote_sha in zip(COMPONENT_FILES, remote_shas):
+            local_sha = git_blob_sha(Path(base_path, file))
+            if remote_sha is None or local_sha is None:
                 log.debug(f"Could not open file: {Path(component_dir, file)}")
                 continue
-        self.checkout_branch()
+            files_identical[file] = local_sha == remote_sha
         return files_identical
 
+    def get_blob_shas(self, directory: str | Path, files: list[str], commit: str | None = None) -> list[str | None]:
+        """
+        Returns the git blob SHAs of files in a directory of the repository at a commit
+
+        Args:
+            directory (str | Path): Path of the directory, relative to the root of the repository
+            files (list[str]): Names of the files in the directory
+            commit (str): The git SHA to read from. Defaults to the tip of the branch
+
+        Returns:
+            (list[str | None]): The blob SHAs, None for files that do not exist
+        """
+        tree = self.get_tree(directory, commit)
+        blobs = {blob.name: blob.hexsha for blob in tree.blobs} if tree is not None else {}
+        return [blobs.get(file) for file in files]
+
+    def find_component_commit(
+        self, component_name: str | Path, base_path: str | Path, component_type: str, depth: int = 1000
+    ) -> str | None:
+        """
+        Finds the latest commit where the module/subworkflow files in a pipeline are identical to the ones in the remote.
+
+        Gives the same result as checking :meth:`component_files_identical` for every commit of the component,
+        but looks up the files in the reverse index of :meth:`get_component_commits_by_files`, which is kept
+        in a :class:`ComponentBlobIndex` for the next time. Only files missing from the pipeline or from some
+        versions of the component need a walk through the history of the component.
+
+        Args:
+            component_name (str): The name of the module/subworkflow
+            base_path (str): The path to the module/subworkflow in the pipeline
+            component_type (str): Either 'modules' or 'subworkflows'
+            depth (int): The maximum number of commits of the component to check
+
+        Returns:
+            (str | None): The SHA of the commit, or None if no commit matches
+        """
+        if self.repo is None:
+            raise ValueError("Repository not initialized")
+        local_shas = [git_blob_sha(Path(base_path, file)) for file in COMPONENT_FILES]
+        commits_by_files = self.get_component_commits_by_files(component_name, component_type, depth)
+        commit_sha = commits_by_files["commits"].get(ComponentBlobIndex.files_key(local_shas))
+        if commit_sha is not None or (None not in local_shas and not commits_by_files["partial"]):
+            return commit_sha
+
+        # Files missing on either side are not compared, like in component_files_identical()
+        with SyncedRepo.repo_lock:
+            component_dir = str(Path(component_type, self.repo_path, component_name))
+            try:
+                for commit in self.get_component_git_log(component_name, component_type, depth=depth):
+                    remote_shas = self.get_component_blob_shas(component_dir, commit["git_sha"])
+                    if all(
+                        local_sha is None or remote_sha is None or local_sha == remote_sha
+                        for local_sha, remote_sha in zip(local_shas, remote_shas)
+                    ):
+                        return commit["git_sha"]
+                return None
+            finally:
+                if self._blob_index is not None:
+                    self._blob_index.save()
+
+    def get_component_blob_shas(self, component_dir: str, commit: str) -> list[str | None]:
+        """
+        Returns the blob SHAs of the files in :data:`COMPONENT_FILES` of a module/subworkflow at a commit,
+        from the :class:`ComponentBlobIndex` if they are in it
+        """
+        if self._blob_index is None:
+            self._blob_index = ComponentBlobIndex(self.remote_url)
+        blob_shas = self._blob_index.get(component_dir, commit)
+        if blob_shas is None:
+            blob_shas = self.get_blob_shas(component_dir, COMPONENT_FILES, commit)
+            self._blob_index.add(component_dir, commit, blob_shas)
+        return blob_shas
+
+    @with_repo_lock
+    def get_component_commits_by_files(self, component_name: str | Path, component_type: str, depth: int) -> dict:
+        """
+        Returns the latest commit of the branch with each version of the files in :data:`COMPONENT_FILES`
+        of a module/subworkflow, by :meth:`ComponentBlobIndex.files_key`.
+
+        Built with one walk through the history of the component, and kept in the :class:`ComponentBlobIndex`.
+        When the branch has moved on, only the new commits are added.
+
+        Args:
+            component_name (str): The name of the module/subworkflow
+            component_type (str): Either 'modules' or 'subworkflows'
+            depth (int): The maximum number of commits of the component to walk through
+
+        Returns:
+            (dict): The commits by version under "commits", and under "partial" whether any version lacks some of the files
+        """
+        if self._blob_index is None:
+            self._blob_index = ComponentBlobIndex(self.remote_url)
+        component_dir = str(Path(component_type, self.repo_path, component_name))
+        head_commit = self.object_repo.commit(self.branch_ref)
+        head = head_commit.hexsha
+        key = f"{self.branch} {component_dir}"
+        entry = self._blob_index.commits_by_files.get(key)
+        if entry is not None and entry["head"] == head and entry["depth"] == depth:
+            return entry
+
+        new_commits: list[str] | None = None
+        if entry is not None and entry["depth"] == depth:
+            try:
+                if self.object_repo.is_ancestor(entry["head"], head_commit):
+                    paths = [component_dir] + (
+                        [str(Path("modules", component_name))] if component_type == "modules" else []
+                    )
+                    new_commits = [
+                        c.hexsha for c in self.object_repo.iter_commits(f"{entry['head']}..{head}", paths=paths)
+                    ]
+            except git.GitCommandError:
+                # The previous tip of the branch was force-pushed away
+                pass
+        if new_commits is not None and entry is not None:
+            commits = dict(entry["commits"])
+            partial = entry["partial"]
+            # Oldest first, so that the latest commit with each version is kept
+            for commit_sha in reversed(new_commits):
+                blob_shas = self.get_component_blob_shas(component_dir, commit_sha)
+                commits[ComponentBlobIndex.files_key(blob_shas)] = commit_sha
+                partial = partial or None in blob_shas
+        else:
+            commits = {}
+            partial = False
+            # Latest first, in the order of component_files_identical() checks by find_component_commit
+            for commit in self.get_component_git_log(component_name, component_type, depth=depth):
+                blob_shas = self.get_component_blob_shas(component_dir, commit["git_sha"])
+                commits.setdefault(ComponentBlobIndex.files_key(blob_shas), commit["git_sha"])
+                partial = partial or None in blob_shas
+        entry = {"head": head, "depth": depth, "commits": commits, "partial": partial}
+        self._blob_index.commits_by_files[key] = entry
+        self._blob_index.changed = True
+        self._blob_index.save()
+        return entry
+
     def ensure_git_user_config(self, default_name: str, default_email: str) -> None:
         if self.repo is None:
             raise ValueError("Repository not initialized")
@@ -380,19 +1092,22 @@ class SyncedRepo:
         """
         if self.repo is None:
             raise ValueError("Repository not initialized")
-        self.checkout_branch()
         component_path = Path(component_type, self.repo_path, component_name)
 
-        commits_new_iter = self.repo.iter_commits(max_count=depth, paths=component_path)
-        commits_old_iter = []
+        commits_new_iter = self.object_repo.iter_commits(self.branch_ref, max_count=depth, paths=component_path)
+        commits_old_iter: Iterable[git.Commit] = []
         if component_type == "modules":
             # Grab commits also from previous modules structure
             old_component_path = Path("modules", component_name)
-            commits_old_iter = self.repo.iter_commits(max_count=depth, paths=old_component_path)
+            commits_old_iter = self.object_repo.iter_commits(self.branch_ref, max_count=depth, paths=old_component_path)
 
         try:
-            commits_old = [{"git_sha": commit.hexsha, "trunc_message": commit.message} for commit in commits_old_iter]
-            commits_new = [{"git_sha": commit.hexsha, "trunc_message": commit.message} for commit in commits_new_iter]
+            commits_old = [
+                {"git_sha": commit.hexsha, "trunc_message": str(commit.message)} for commit in commits_old_iter
+            ]
+            commits_new = [
+                {"git_sha": commit.hexsha, "trunc_message": str(commit.message)} for commit in commits_new_iter
+            ]
         except git.GitCommandError as e:
             log.error(
                 f"Git error: {e}\n"
@@ -404,11 +1119,98 @@ class SyncedRepo:
 
         return commits
 
+    @with_repo_lock
+    def get_latest_component_versions(self, component_type: str) -> dict[str, str]:
+        """
+        Finds the latest commit of every module/subworkflow in the repository with one walk
+        through the history of the branch, instead of one 'git log' per component.
+
+        The result is cached for the commit at the tip of the branch, in memory and in the
+        nf-core cache directory, so it is only computed again when the remote has changed.
+
+        Args:
+            component_type (str): Either 'modules' or 'subworkflows'
+
+        Returns:
+            (dict[str, str]): The SHA of the latest commit of each module/subworkflow, by name
+        """
+        if self.repo is None:
+            raise ValueError("Repository not initialized")
+        head = self.object_repo.commit(self.branch_ref).hexsha
+        key = (self.remote_url, component_type, head)
+        if key in SyncedRepo._latest_versions:
+            return SyncedRepo._latest_versions[key]
+
+        cache_path = Path(
+            NFCORE_CACHE_DIR,
+            "component-index",
+            f"{hashlib.sha256(self.remote_url.encode()).hexdigest()[:25]}-latest-{component_type}.json",
+        )
+        try:
+            with open(cache_path) as fh:
+                cached = json.load(fh)
+            if cached.get("commit") == head and cached.get("repo_path") == self.repo_path:
+                SyncedRepo._latest_versions[key] = cached["versions"]
+                return cached["versions"]
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, AttributeError, KeyError) as e:
+            log.debug(f"Ignoring unreadable latest versions cache '{cache_path}': {e}")
+
+        components_path = Path(component_type, self.repo_path)
+        components = set(self.get_avail_components(component_type, head))
+        versions: dict[str, str] = {}
+        # Stream the log, so that the walk can stop once every component has been seen
+        proc = self.object_repo.git.log(
+            head, "--format=commit %H", "--name-only", "--no-renames", "--", str(components_path), as_process=True
+        )
+        commit_sha = None
+        try:
+            for line in proc.stdout:
+                line = line.decode().rstrip("\n")
+                if line.startswith("commit "):
+                    commit_sha = line[len("commit ") :]
+                elif line and commit_sha is not None:
+                    # The component is the longest parent directory of the file that is a component
+                    parts = Path(line).relative_to(components_path).parts
+                    for i in range(len(parts) - 1, 0, -1):
+                        component = "/".join(parts[:i])
+                        if component in components:
+                            versions.setdefault(component, commit_sha)
+                            break
+                    if len(versions) == len(components):
+                        break
+            else:
+                # Raises an error if git failed
+                proc.wait()
+        except git.GitCommandError as e:
+            log.error(
+                f"Git error: {e}\n"
+                "To solve this, you can try to remove the cloned rempository and run the command again.\n"
+                f"This repository is typically found at `{self.local_repo_dir}`"
+            )
+            raise UserWarning
+        finally:
+            proc.proc.kill()
+            proc.proc.wait()
+
+        SyncedRepo._latest_versions[key] = versions
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            atomic_write(cache_path, json.dumps({"commit": head, "repo_path": self.repo_path, "versions": versions}))
+        except OSError as e:
+            log.debug(f"Could not write latest versions cache '{cache_path}': {e}")
+        return versions
+
     def get_latest_component_version(self, component_name, component_type):
         """
         Returns the latest commit in the repository
         """
         try:
+            version = self.get_latest_component_versions(component_type).get(str(component_name))
+            if version is not None:
+                return version
+            # Components that are only in the old modules structure
             git_logs = list(self.get_component_git_log(component_name, component_type, depth=1))
             if not git_logs:
                 return None
@@ -417,14 +1219,30 @@ class SyncedRepo:
             log.debug(f"Could not get latest version of {component_name}: {e}")
             return None
 
+    def fetch_missing_commit(self, commit: str) -> bool:
+        """
+        Updates the local clone when a requested commit is missing from it
+
+        Args:
+            commit (str): The requested commit
+
+        Returns:
+            (bool): True if the local clone was updated, so that the commit can be looked up again
+        """
+        return False
+
     def sha_exists_on_branch(self, sha):
         """
         Verifies that a given commit sha exists on the branch
         """
         if self.repo is None:
             raise ValueError("Repository not initialized")
-        self.checkout_branch()
-        return sha in (commit.hexsha for commit in self.repo.iter_commits())
+        if sha in (commit.hexsha for commit in self.object_repo.iter_commits(self.branch_ref)):
+            return True
+        # The commit may have been pushed after the local clone was last synced
+        return self.fetch_missing_commit(sha) and sha in (
+            commit.hexsha for commit in self.object_repo.iter_commits(self.branch_ref)
+        )
 
     def get_commit_info(self, sha):
         """
@@ -439,8 +1257,7 @@ class SyncedRepo:
         """
         if self.repo is None:
             raise ValueError("Repository not initialized")
-        self.checkout_branch()
-        for commit in self.repo.iter_commits():
+        for commit in self.object_repo.iter_commits(self.branch_ref):
             if commit.hexsha == sha:
                 message = commit.message.splitlines()[0]
                 date_obj = commit.committed_datetime
@@ -448,26 +1265,28 @@ class SyncedRepo:
                 return message, date
         raise LookupError(f"Commit '{sha}' not found in the '{self.remote_url}'")
 
-    def get_avail_components(self, component_type: str, checkout: bool = True, commit: str | None = None) -> list[str]:
+    def get_avail_components(self, component_type: str, commit: str | None = None) -> list[str]:
         """
         Gets the names of the modules/subworkflows in the repository. They are detected by
         checking which directories have a 'main.nf' file
 
+        Args:
+            component_type (str): Either 'modules' or 'subworkflows'
+            commit (str): The git SHA to look at. Defaults to the tip of the branch
+
         Returns:
             ([ str ]): The module/subworkflow names
         """
-        if checkout:
-            self.checkout_branch()
-        if commit is not None:
-            self.checkout(commit)
-        # Get directory
-        if component_type == "modules":
-            directory = self.modules_dir
-        elif component_type == "subworkflows":
-            directory = self.subworkflows_dir
+        if component_type not in ["modules", "subworkflows"]:
+            raise ValueError(f"Invalid component type: {component_type}")
+        directory = self.get_tree(Path(component_type, self.repo_path), commit)
+        if directory is None:
+            return []
         # Module/Subworkflow directories are characterized by having a 'main.nf' file
         avail_component_names = [
-            str(Path(dirpath).relative_to(directory)) for dirpath, _, files in os.walk(directory) if "main.nf" in files
+            str(Path(item.path).parent.relative_to(directory.path))
+            for item in directory.traverse()
+            if isinstance(item, git.Blob) and item.name == "main.nf"
         ]
         return avail_component_names
 
@@ -481,15 +1300,6 @@ class SyncedRepo:
         Returns:
             (str): The contents of the file in text format
         """
-        self.checkout_branch()
-        if component_type == "modules":
-            path = Path(self.modules_dir, module_name, "meta.yml")
-        elif component_type == "subworkflows":
-            path = Path(self.subworkflows_dir, module_name, "meta.yml")
-        else:
+        if component_type not in ["modules", "subworkflows"]:
             raise ValueError(f"Invalid component type: {component_type}")
-        if not path.exists():
-            return None
-        with open(path) as fh:
-            contents = fh.read()
-        return contents
+        return self.read_file(Path(component_type, self.repo_path, module_name, "meta.yml"))
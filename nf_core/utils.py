@@ -4,6 +4,7 @@ Common utility functions for the nf-core python package.
 
 import ast
 import concurrent.futures
+import contextlib
 import datetime
 import errno
 import fnmatch
@@ -16,13 +17,15 @@ import os
 import random
 import re
 import shlex
+import shutil
 import subprocess
 import sys
+import threading
 import time
 from collections.abc import Callable, Generator
 from contextlib import contextmanager
 from pathlib import Path
-from typing import TYPE_CHECKING, Any, Literal
+from typing import IO, TYPE_CHECKING, Any, Literal
 
 import git
 import prompt_toolkit.styles
@@ -42,6 +45,9 @@ import nf_core
 if TYPE_CHECKING:
     from nf_core.pipelines.schema import PipelineSchema
 
+if sys.platform != "win32":
+    import fcntl
+
 log = logging.getLogger(__name__)
 
 # ASCII nf-core logo
@@ -93,6 +99,13 @@ NFCORE_CACHE_DIR = Path(
 )
 NFCORE_DIR = Path(os.environ.get("XDG_CONFIG_HOME", os.path.join(os.getenv("HOME") or "", ".config")), "nfcore")
 
+# Limits for the `nextflow config` results cached in $NXF_HOME/nf-core, least recently used are removed first
+WF_CONFIG_CACHE_MAX_FILES = 200
+WF_CONFIG_CACHE_MAX_BYTES = 50 * 1024 * 1024
+
+# Linux ioctl to clone a file copy-on-write, see ioctl_ficlone(2)
+FICLONE = 0x40049409
+
 
 def unquote(s: str) -> str:
     """
@@ -161,6 +174,173 @@ def rich_force_colors():
     return None
 
 
+class PipelineFiles:
+    """Index of the files in a pipeline directory, shared by the pipeline lint tests.
+
+    File listings, sizes and contents are read from disk the first time they
+    are requested and then served from memory, so that each file is opened at
+    most once per lint run.
+
+    Args:
+        wf_path (Path): The path to the pipeline directory.
+    """
+
+    def __init__(self, wf_path: str | Path) -> None:
+        self.wf_path = Path(wf_path)
+        self._lock = threading.RLock()
+        self._git_files: list[Path] | None = None
+        self._walked_files: list[Path] | None = None
+        self._is_file: dict[Path, bool] = {}
+        self._sizes: dict[Path, int] = {}
+        self._contents: dict[Path, bytes] = {}
+        self._recorder = threading.local()
+
+    def __repr__(self) -> str:
+        return f"<PipelineFiles at {self.wf_path}>"
+
+    @contextmanager
+    def record_reads(self) -> Generator[set[str], None, None]:
+        """Collect everything read through the index by the current thread.
+
+        Yields a set that is filled with the paths (relative to the pipeline directory)
+        of the files that were read, ``"is_file:<path>"`` for files that were only checked
+        for existence, plus ``"git ls-files"`` and ``"walk"`` if the file listings were used.
+        """
+        reads: set[str] = set()
+        self._recorder.reads = reads
+        try:
+            yield reads
+        finally:
+            self._recorder.reads = None
+
+    def git_files(self) -> list[Path]:
+        """Get a list of all files in the pipeline tracked by git.
+
+        Falls back to all files in the directory if it is not a git repository.
+        """
+        self._record("git ls-files")
+        with self._lock:
+            if self._git_files is None:
+                files = []
+                try:
+                    # First, try to get the list of files using git
+                    git_ls_files = subprocess.check_output(["git", "ls-files"], cwd=self.wf_path).splitlines()
+                    for fn in git_ls_files:
+                        full_fn = self.wf_path / fn.decode("utf-8")
+                        if self.is_file(full_fn):
+                            files.append(full_fn)
+                        else:
+                            log.debug(f"`git ls-files` returned '{full_fn}' but could not open it!")
+                except subprocess.CalledProcessError:
+                    # Failed, so probably not initialised as a git repository - just a list of all files
+                    files = []
+                    for file_path in self.wf_path.rglob("*"):
+                        if self.is_file(file_path):
+                            # Append the file path to the list
+                            files.append(file_path)
+                    if len(files) == 0:
+                        log.debug(f"No files found in pipeline: {self.wf_path}")
+                self._git_files = files
+            return list(self._git_files)
+
+    def gitignore_patterns(self) -> list[str]:
+        """Get the file and directory names ignored by the pipeline ``.gitignore`` file"""
+        gitignore = Path(self.wf_path, ".gitignore")
+        if not self.is_file(gitignore):
+            return []
+        return [Path(line.strip().rstrip("/")).name for line in self.read_lines(gitignore)]
+
+    def walk_files(self) -> list[Path]:
+        """Get a list of all files on disk in the pipeline directory.
+
+        Skips the ``.git`` directory and any file or directory whose name
+        matches an entry in the ``.gitignore`` file.
+        """
+        self._record("walk")
+        with self._lock:
+            if self._walked_files is None:
+                ignore = [".git"] + self.gitignore_patterns()
+                files = []
+                for root, dirs, fnames in os.walk(self.wf_path, topdown=True):
+                    dirs[:] = [d for d in dirs if not any(fnmatch.fnmatch(d, i) for i in ignore)]
+                    files += [Path(root, f) for f in fnames if not any(fnmatch.fnmatch(f, i) for i in ignore)]
+                self._walked_files = files
+            return list(self._walked_files)
+
+    def is_file(self, path: str | Path) -> bool:
+        """Check whether a path in the pipeline is a file"""
+        path = self._fp(path)
+        self._record(f"is_file:{self.relative_path(path)}")
+        with self._lock:
+            if path not in self._is_file:
+                self._is_file[path] = path.is_file()
+            return self._is_file[path]
+
+    def size(self, path: str | Path) -> int:
+        """Get the size of a file in bytes"""
+        path = self._fp(path)
+        self._record(path)
+        with self._lock:
+            if path not in self._sizes:
+                self._sizes[path] = len(self._contents[path]) if path in self._contents else path.stat().st_size
+            return self._sizes[path]
+
+    def is_binary(self, path: str | Path) -> bool:
+        """Check whether a file is binary, based on its name"""
+        return bool(is_file_binary(self._fp(path)))
+
+    def read_bytes(self, path: str | Path) -> bytes:
+        """Get the raw content of a file.
+
+        Raises:
+            FileNotFoundError: If the file does not exist
+        """
+        path = self._fp(path)
+        self._record(path)
+        with self._lock:
+            if path not in self._contents:
+                self._contents[path] = path.read_bytes()
+            return self._contents[path]
+
+    def read_text(self, path: str | Path) -> str:
+        """Get the content of a file, decoded as latin1 and with universal newlines.
+
+        Only the raw bytes are kept in memory, the text is decoded on every call.
+
+        Raises:
+            FileNotFoundError: If the file does not exist
+        """
+        return self.read_bytes(path).decode("latin1").replace("\r\n", "\n").replace("\r", "\n")
+
+    def read_lines(self, path: str | Path) -> list[str]:
+        """Get the lines of a file, as iterating over the open file would return them"""
+        return io.StringIO(self.read_text(path)).readlines()
+
+    def invalidate(self, path: str | Path) -> None:
+        """Forget everything known about a file, after it has been written to"""
+        path = self._fp(path)
+        with self._lock:
+            for cache in (self._is_file, self._sizes, self._contents):
+                cache.pop(path, None)
+
+    def relative_path(self, path: str | Path) -> str:
+        """Get the path of a file relative to the pipeline directory"""
+        try:
+            return str(self._fp(path).relative_to(self.wf_path))
+        except ValueError:
+            return str(path)
+
+    def _fp(self, fn: str | Path) -> Path:
+        """Get the full path to a file in the pipeline"""
+        return Path(self.wf_path, fn)
+
+    def _record(self, path: str | Path) -> None:
+        """Add a read to the set collected by :meth:`record_reads`, if any"""
+        reads = getattr(self._recorder, "reads", None)
+        if reads is not None:
+            reads.add(path if isinstance(path, str) else self.relative_path(path))
+
+
 class Pipeline:
     """Object to hold information about a local pipeline.
 
@@ -172,6 +352,7 @@ class Pipeline:
         conda_package_info (dict): The conda package(s) information, based on the API requests to Anaconda cloud.
         nf_config (dict): The Nextflow pipeline configuration file content.
         files (list): A list of files found during the linting process.
+        file_index (PipelineFiles): Cached listing and contents of the files in the pipeline.
         git_sha (str): The git sha for the repo commit / current GitHub pull-request (`$GITHUB_PR_COMMIT`)
         minNextflowVersion (str): The minimum required Nextflow version to run the pipeline.
         wf_path (str): Path to the pipeline directory.
@@ -192,6 +373,7 @@ class Pipeline:
         self.pipeline_prefix: str | None = None
         self.schema_obj: PipelineSchema | None = None
         self.repo: git.Repo | None = None
+        self.file_index = PipelineFiles(self.wf_path)
 
         try:
             self.repo = git.Repo(self.wf_path)
@@ -227,27 +409,7 @@ class Pipeline:
 
     def list_files(self) -> list[Path]:
         """Get a list of all files in the pipeline"""
-        files = []
-        try:
-            # First, try to get the list of files using git
-            git_ls_files = subprocess.check_output(["git", "ls-files"], cwd=self.wf_path).splitlines()
-            for fn in git_ls_files:
-                full_fn = Path(self.wf_path) / fn.decode("utf-8")
-                if full_fn.is_file():
-                    files.append(full_fn)
-                else:
-                    log.debug(f"`git ls-files` returned '{full_fn}' but could not open it!")
-        except subprocess.CalledProcessError:
-            # Failed, so probably not initialised as a git repository - just a list of all files
-            files = []
-            for file_path in self.wf_path.rglob("*"):
-                if file_path.is_file():
-                    # Append the file path to the list
-                    files.append(file_path)
-            if len(files) == 0:
-                log.debug(f"No files found in pipeline: {self.wf_path}")
-
-        return files
+        return self.file_index.git_files()
 
     def load_pipeline_config(self) -> bool:
         """Get the nextflow config for this pipeline
@@ -382,18 +544,15 @@ def fetch_wf_config(wf_path: Path, cache_config: bool = True) -> dict:
         if not cache_basedir.is_dir():
             cache_basedir.mkdir(parents=True, exist_ok=True)
 
-    # If we're given a workflow object with a commit, see if we have a cached copy
+    # Make a filename based on the contents of all files that the config depends on
     cache_fn = None
-    # Make a filename based on file contents
     concat_hash = ""
-    for fn in ["nextflow.config", "main.nf"]:
-        try:
-            with open(wf_path / fn, "rb") as fh:
-                concat_hash += hashlib.sha256(fh.read()).hexdigest()
-        except FileNotFoundError:
-            pass
+    for fn in wf_config_files(wf_path, nxf_home):
+        with open(fn, "rb") as fh:
+            concat_hash += f"{fn}:{hashlib.sha256(fh.read()).hexdigest()}\n"
     # Hash the hash
     if len(concat_hash) > 0:
+        concat_hash += f"NXF_VER:{os.environ.get('NXF_VER', '')}"
         bighash = hashlib.sha256(concat_hash.encode("utf-8")).hexdigest()
         cache_fn = f"wf-config-cache-{bighash[:25]}.json"
 
@@ -404,6 +563,8 @@ def fetch_wf_config(wf_path: Path, cache_config: bool = True) -> dict:
             try:
                 with open(cache_path) as fh:
                     config = json.load(fh)
+                # Mark the cache file as recently used, so that it is removed last
+                os.utime(cache_path)
                 return config
             except json.JSONDecodeError as e:
                 # Log warning but don't raise - just regenerate the cache
@@ -413,6 +574,8 @@ def fetch_wf_config(wf_path: Path, cache_config: bool = True) -> dict:
                     cache_path.unlink()
                 except OSError:
                     pass  # If we can't delete it, just continue
+            except OSError as e:
+                log.debug(f"Unable to use config cache '{cache_path}': {e}")
     log.debug("No config cache found")
 
     # Call `nextflow config`
@@ -456,16 +619,156 @@ def fetch_wf_config(wf_path: Path, cache_config: bool = True) -> dict:
     # in others folders than tmp when doing tests in general
     if cache_path and cache_config:
         log.debug(f"Saving config cache: {cache_path}")
-        with open(cache_path, "w") as fh:
-            json.dump(config, fh, indent=4)
+        atomic_write(cache_path, json.dumps(config, indent=4))
+        prune_wf_config_cache(cache_path.parent)
 
     return config
 
 
+def wf_config_files(wf_path: Path, nxf_home: Path | None = None) -> list[Path]:
+    """Get the files that the output of ``nextflow config`` for a workflow depends on.
+
+    These are ``nextflow.config``, ``main.nf``, all config files in the ``conf`` directory,
+    all config files included from these with a local path, and the user's ``$NXF_HOME/config``.
+
+    Args:
+        wf_path (Path): Nextflow workflow file system path.
+        nxf_home (Path): Nextflow home directory.
+
+    Returns:
+        list[Path]: The files that exist, in a stable order
+    """
+    wf_path = Path(wf_path)
+    include_pattern = re.compile(r"""includeConfig\s*\(?\s*['"]([^'"]+)['"]""")
+    to_check = [Path(wf_path, "nextflow.config"), Path(wf_path, "main.nf"), *sorted(wf_path.glob("conf/**/*.config"))]
+    if nxf_home is not None:
+        to_check.append(Path(nxf_home, "config"))
+    found: list[Path] = []
+    while to_check:
+        fn = to_check.pop(0)
+        if fn in found or not fn.is_file():
+            continue
+        found.append(fn)
+        if fn.suffix != ".config":
+            continue
+        with open(fn, errors="replace") as fh:
+            for include in include_pattern.findall(fh.read()):
+                for var in ("${projectDir}", "$projectDir", "${baseDir}", "$baseDir"):
+                    include = include.replace(var, str(wf_path))
+                # Remote configs and paths built from other variables can't be checked
+                if "$" in include or "://" in include:
+                    continue
+                to_check.append(Path(fn.parent, include))
+    return found
+
+
+def atomic_write(path: str | Path, data: str | bytes, mode: int | None = None) -> None:
+    """Write a file through a temporary file next to it, which is renamed over the file when it is complete.
+
+    Concurrent readers, e.g. other nf-core commands, never see a partially written file.
+
+    Args:
+        path (str | Path): The file to write
+        data (str | bytes): The content of the file
+        mode (int | None): The permissions of the file, if not the default ones
+    """
+    path = Path(path)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(tmp_path, "wb" if isinstance(data, bytes) else "w") as fh:
+            fh.write(data)
+        if mode is not None:
+            tmp_path.chmod(mode)
+        os.replace(tmp_path, path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+def copy_file_data(src: IO[bytes], dest: IO[bytes]) -> None:
+    """Copy the content of a file to an empty file, without passing the data through Python where possible.
+
+    The data is shared copy-on-write if the file system supports it (e.g. btrfs, XFS).
+    Otherwise it is copied in the kernel with `copy_file_range`, which can use server-side
+    copies on network file systems, or with `sendfile`. Other platforms copy it in chunks.
+
+    Args:
+        src (IO[bytes]): The file to copy, opened for reading
+        dest (IO[bytes]): The empty copy, opened for writing
+    """
+    src.flush()
+    dest.flush()
+    if sys.platform == "linux":
+        with contextlib.suppress(OSError):
+            fcntl.ioctl(dest.fileno(), FICLONE, src.fileno())
+            return
+    size = os.fstat(src.fileno()).st_size
+    copied = 0
+    if hasattr(os, "copy_file_range"):
+        with contextlib.suppress(OSError):
+            while copied < size:
+                count = os.copy_file_range(src.fileno(), dest.fileno(), size - copied, copied, copied)
+                if count == 0:
+                    break
+                copied += count
+    if copied < size and sys.platform == "linux":
+        with contextlib.suppress(OSError):
+            # sendfile writes at the position of the copy
+            os.lseek(dest.fileno(), copied, os.SEEK_SET)
+            while copied < size:
+                count = os.sendfile(dest.fileno(), src.fileno(), copied, size - copied)
+                if count == 0:
+                    break
+                copied += count
+    src.seek(copied)
+    dest.seek(copied)
+    shutil.copyfileobj(src, dest)
+
+
+def prune_wf_config_cache(
+    cache_dir: Path, max_files: int = WF_CONFIG_CACHE_MAX_FILES, max_bytes: int = WF_CONFIG_CACHE_MAX_BYTES
+) -> None:
+    """Remove the least recently used ``nextflow config`` results from the cache.
+
+    Args:
+        cache_dir (Path): The cache directory, usually ``$NXF_HOME/nf-core``
+        max_files (int): Maximum number of cached results to keep
+        max_bytes (int): Maximum total size of the cached results to keep
+    """
+    cache_files = []
+    for fn in cache_dir.glob("wf-config-cache-*.json"):
+        try:
+            cache_files.append((fn, fn.stat()))
+        except FileNotFoundError:
+            pass  # Removed by another process
+    # Most recently used first
+    cache_files.sort(key=lambda f: f[1].st_mtime, reverse=True)
+    total_bytes = 0
+    for i, (fn, stat) in enumerate(cache_files):
+        total_bytes += stat.st_size
+        if i >= max_files or total_bytes > max_bytes:
+            log.debug(f"Removing old config cache: {fn}")
+            fn.unlink(missing_ok=True)
+
+
 def run_cmd(executable: str, cmd: str) -> tuple[bytes, bytes] | None:
-    """Run a specified command and capture the output. Handle errors nicely."""
+    """Run a specified command and capture the output. Handle errors nicely.
+
+    Nextflow queries are answered by the Nextflow helper (see :mod:`nf_core.nextflow_helper`) if it is running.
+    """
     full_cmd = f"{executable} {cmd}"
     log.debug(f"Running command: {full_cmd}")
+    if executable == "nextflow":
+        from nf_core.nextflow_helper import query_helper
+
+        helper_result = query_helper(shlex.split(cmd))
+        if helper_result is not None:
+            returncode, stdout, stderr = helper_result
+            if returncode == 0:
+                return (stdout, stderr)
+            log.debug(f"Command '{full_cmd}' returned non-zero error code '{returncode}':\n[red]> {stderr.decode()}")
+            raise RuntimeError(
+                f"Command '{full_cmd}' returned non-zero error code '{returncode}':\n[red]> {stderr.decode()}{stdout.decode()}"
+            )
     try:
         proc = subprocess.run(shlex.split(full_cmd), capture_output=True, check=True)
         return (proc.stdout, proc.stderr)
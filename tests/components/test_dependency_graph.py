@@ -0,0 +1,63 @@
+"""Tests for the dependency graph of subworkflows"""
+
+from pathlib import Path
+from unittest import mock
+
+import nf_core.components.dependency_graph
+from nf_core.components.dependency_graph import ComponentGraph
+
+
+def write_subworkflow(pipeline_dir: Path, name: str, includes: list[str]) -> Path:
+    subworkflow_dir = Path(pipeline_dir, "subworkflows", "nf-core", name)
+    subworkflow_dir.mkdir(parents=True)
+    lines = []
+    for include in includes:
+        if "/" in include:
+            lines.append(f"include {{ {include.replace('/', '_').upper()} }} from '../../../modules/{include}/main'")
+        else:
+            lines.append(f"include {{ {include.upper()} }} from '../{include}/main'")
+    Path(subworkflow_dir, "main.nf").write_text("\n".join(lines) + "\n")
+    return subworkflow_dir
+
+
+def test_includes_parsed_once_per_content(tmp_path):
+    """Test that subworkflows with the same files are only parsed once by a graph"""
+    first = write_subworkflow(tmp_path / "first", "bam_stats", ["samtools/stats", "samtools/idxstats"])
+    second = write_subworkflow(tmp_path / "second", "bam_stats", ["samtools/stats", "samtools/idxstats"])
+    graph = ComponentGraph(tmp_path / "first")
+    with mock.patch.object(
+        nf_core.components.dependency_graph,
+        "get_components_to_install",
+        wraps=nf_core.components.dependency_graph.get_components_to_install,
+    ) as parse:
+        modules, subworkflows = graph.includes(first)
+        modules[0]["git_remote"] = "https://github.com/nf-core/modules.git"
+        assert graph.includes(second) == (
+            [{"name": "samtools/stats"}, {"name": "samtools/idxstats"}],
+            [],
+        )
+        parse.assert_called_once()
+        # Other graphs parse the includes themselves
+        ComponentGraph(tmp_path / "second").includes(second)
+    assert parse.call_count == 2
+
+
+def test_walk_includes(tmp_path):
+    """Test that nested subworkflows are walked once, after the subworkflows including them"""
+    write_subworkflow(tmp_path, "bam_stats", ["samtools/stats"])
+    write_subworkflow(tmp_path, "bam_sort", ["samtools/sort", "bam_stats"])
+    top = write_subworkflow(tmp_path, "fastq_align", ["bwa/mem", "bam_sort", "bam_stats", "bam_missing"])
+
+    walk = [
+        (including_dir.name, component_type, component["name"])
+        for including_dir, component_type, component in ComponentGraph(tmp_path).walk_includes(top)
+    ]
+    assert walk == [
+        ("fastq_align", "subworkflows", "bam_sort"),
+        ("fastq_align", "subworkflows", "bam_stats"),
+        ("fastq_align", "subworkflows", "bam_missing"),
+        ("fastq_align", "modules", "bwa/mem"),
+        ("bam_sort", "subworkflows", "bam_stats"),
+        ("bam_sort", "modules", "samtools/sort"),
+        ("bam_stats", "modules", "samtools/stats"),
+    ]
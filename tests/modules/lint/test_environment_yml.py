@@ -30,9 +30,17 @@ class DummyModule(NFCoreComponent):
         self.warned = []
 
 
+class DummyRepo:
+    def __init__(self, local_repo_dir):
+        self.local_repo_dir = local_repo_dir
+
+    def read_file(self, path):
+        return (self.local_repo_dir / path).read_text()
+
+
 class DummyLint(ComponentLint):
     def __init__(self, tmp_path):
-        self.modules_repo = type("repo", (), {"local_repo_dir": tmp_path})
+        self.modules_repo = DummyRepo(tmp_path)
         self.passed = []
         self.failed = []
 
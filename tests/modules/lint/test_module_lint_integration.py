@@ -33,6 +33,19 @@ class TestModulesLintIntegration(TestModules):
         assert len(module_lint.passed) > 0
         assert len(module_lint.warned) >= 0
 
+    def test_modules_lint_parallel(self):
+        """Test that linting modules in parallel gives the same results in the same order"""
+        self.mods_install.install("trimgalore")
+        self.mods_install.install("tabix/tabix")
+        module_lint = nf_core.modules.lint.ModuleLint(directory=self.pipeline_dir)
+        module_lint.lint(print_results=False, all_modules=True)
+        parallel_module_lint = nf_core.modules.lint.ModuleLint(directory=self.pipeline_dir, jobs=4)
+        parallel_module_lint.lint(print_results=False, all_modules=True)
+        for results_type in ["passed", "warned", "failed"]:
+            assert [
+                (r.component_name, r.lint_test, r.message) for r in getattr(parallel_module_lint, results_type)
+            ] == [(r.component_name, r.lint_test, r.message) for r in getattr(module_lint, results_type)]
+
     def test_modules_lint_new_modules(self):
         """lint a new module"""
         module_lint = nf_core.modules.lint.ModuleLint(directory=self.nfcore_modules)
@@ -1,9 +1,11 @@
 from pathlib import Path
+from unittest import mock
 
 import pytest
 
 from nf_core.modules.install import ModuleInstall
 from nf_core.modules.modules_json import ModulesJson
+from nf_core.modules.modules_repo import ModulesRepo
 
 from ..test_modules import TestModules
 from ..utils import (
@@ -11,6 +13,7 @@ from ..utils import (
     GITLAB_BRANCH_TEST_BRANCH,
     GITLAB_REPO,
     GITLAB_URL,
+    OLD_TRIMGALORE_SHA,
     with_temporary_folder,
 )
 
@@ -44,6 +47,31 @@ class TestModulesCreate(TestModules):
         self.mods_install.install("trimgalore")
         assert self.mods_install.install("trimgalore") is True
 
+    def test_modules_install_old_version_keeps_working_tree(self):
+        """Test that installing an old version reads the files without checking out the commit"""
+        modules_repo = self.mods_install.modules_repo
+        head_before = modules_repo.repo.head.commit.hexsha
+        install_obj = ModuleInstall(self.pipeline_dir, sha=OLD_TRIMGALORE_SHA)
+        assert install_obj.install("trimgalore") is True
+        assert modules_repo.repo.head.commit.hexsha == head_before
+        assert not modules_repo.repo.is_dirty()
+        module_path = Path(self.pipeline_dir, "modules", "nf-core", "trimgalore")
+        assert all(
+            modules_repo.component_files_identical("trimgalore", module_path, OLD_TRIMGALORE_SHA, "modules").values()
+        )
+
+    @with_temporary_folder
+    def test_modules_install_partial_clone(self, tmpdir):
+        """Test installing a module from a blobless, sparse clone of the modules repository"""
+        with mock.patch("nf_core.modules.modules_repo.NFCORE_DIR", tmpdir):
+            modules_repo = ModulesRepo(remote_url=GITLAB_URL)
+            # Only the files at the root are checked out
+            assert not Path(modules_repo.local_repo_dir, "modules").exists()
+            assert modules_repo.repo.git.config("remote.origin.partialclonefilter") == "blob:none"
+            assert "fastqc" in modules_repo.get_avail_components("modules")
+            assert modules_repo.install_component("fastqc", Path(tmpdir, "modules"), modules_repo.branch, "modules")
+            assert Path(tmpdir, "modules", "fastqc", "main.nf").is_file()
+
     def test_modules_install_from_gitlab(self):
         """Test installing a module from GitLab"""
         assert self.mods_install_gitlab.install("fastqc") is True
@@ -2,6 +2,9 @@ import copy
 import json
 import shutil
 from pathlib import Path
+from unittest import mock
+
+import git
 
 from nf_core.components.constants import (
     NF_CORE_MODULES_DEFAULT_BRANCH,
@@ -11,6 +14,7 @@ from nf_core.components.constants import (
 from nf_core.modules.modules_json import ModulesJson
 from nf_core.modules.modules_repo import ModulesRepo
 from nf_core.modules.patch import ModulePatch
+from nf_core.synced_repo import git_blob_sha
 
 from ..test_modules import TestModules
 
@@ -148,6 +152,25 @@ class TestModulesCreate(TestModules):
         for f in files:
             assert Path(fastqc_path, f).exists()
 
+    @mock.patch("nf_core.modules.modules_json.RACY_CHANGE_SECONDS", -60)
+    def test_mod_json_up_to_date_unchanged(self):
+        """Checks that the modules.json is not checked again if nothing has changed since the last check"""
+        with mock.patch("nf_core.utils.NFCORE_CACHE_DIR", Path(self.tmp_dir, "cache")):
+            ModulesJson(self.pipeline_dir).check_up_to_date()
+            with mock.patch.object(ModulesJson, "unsynced_components") as unsynced_components:
+                ModulesJson(self.pipeline_dir).check_up_to_date()
+            unsynced_components.assert_not_called()
+
+            # A changed module is checked again
+            with open(Path(self.pipeline_dir, "modules", NF_CORE_MODULES_NAME, "fastqc", "main.nf"), "a") as fh:
+                fh.write("\n")
+            mod_json_obj = ModulesJson(self.pipeline_dir)
+            with mock.patch.object(
+                ModulesJson, "unsynced_components", return_value=([], [], {})
+            ) as unsynced_components:
+                mod_json_obj.check_up_to_date()
+            unsynced_components.assert_called_once()
+
     def test_mod_json_up_to_date_reinstall_fails(self):
         """
         Try reinstalling a module where the git_sha is invalid
@@ -168,6 +191,27 @@ class TestModulesCreate(TestModules):
         # Check that the module has been removed from the modules.json
         assert "fastqc" not in mod_json["repos"][NF_CORE_MODULES_REMOTE]["modules"]["nf-core"]
 
+    def test_mod_json_find_correct_commit_sha(self):
+        """Test finding the commit of an installed module from its file contents"""
+        mod_json_obj = ModulesJson(self.pipeline_dir)
+        modules_repo = ModulesRepo()
+        fastqc_path = Path(self.pipeline_dir, "modules", NF_CORE_MODULES_NAME, "fastqc")
+        commit_sha = mod_json_obj.find_correct_commit_sha("modules", "fastqc", fastqc_path, modules_repo)
+        assert commit_sha is not None
+        assert all(modules_repo.component_files_identical("fastqc", fastqc_path, commit_sha, "modules").values())
+
+        # The second search uses the component index instead of the git objects
+        assert modules_repo._blob_index is not None
+        assert modules_repo._blob_index.path.exists()
+        with mock.patch.object(modules_repo.repo, "commit", side_effect=AssertionError):
+            assert mod_json_obj.find_correct_commit_sha("modules", "fastqc", fastqc_path, modules_repo) == commit_sha
+
+    def test_git_blob_sha(self):
+        """Test that file hashes are the same as the ones git uses"""
+        main_nf = Path(self.pipeline_dir, "main.nf")
+        assert git_blob_sha(main_nf) == git.Repo(self.pipeline_dir).git.hash_object(main_nf)
+        assert git_blob_sha(Path(self.pipeline_dir, "INVALID_FILE")) is None
+
     def test_mod_json_repo_present(self):
         """Tests the repo_present function"""
         mod_json_obj = ModulesJson(self.pipeline_dir)
@@ -197,6 +241,68 @@ class TestModulesCreate(TestModules):
         )
         assert mod_json_obj.get_module_version("INVALID_MODULE", NF_CORE_MODULES_REMOTE, NF_CORE_MODULES_NAME) is None
 
+    def test_mod_json_index(self):
+        """Test that lookups through the index of entries follow changes to the modules.json"""
+        mod_json_obj = ModulesJson(self.pipeline_dir)
+        assert mod_json_obj.component_present("fastqc", NF_CORE_MODULES_REMOTE, NF_CORE_MODULES_NAME, "modules")
+        assert mod_json_obj.get_dependent_components("modules", "SUBWORKFLOW_NAME", {}) == {}
+
+        mod_json_obj.update("modules", ModulesRepo(), "MODULE_NAME", "GIT_SHA", ["SUBWORKFLOW_NAME"], write_file=False)
+        assert mod_json_obj.get_module_version("MODULE_NAME", NF_CORE_MODULES_REMOTE, NF_CORE_MODULES_NAME) == "GIT_SHA"
+        assert mod_json_obj.get_installed_by_entries("modules", "MODULE_NAME") == ["SUBWORKFLOW_NAME"]
+        assert mod_json_obj.get_dependent_components("modules", "SUBWORKFLOW_NAME", {}) == {
+            "MODULE_NAME": (NF_CORE_MODULES_REMOTE, NF_CORE_MODULES_NAME, "modules")
+        }
+
+        mod_json_obj.remove_entry(
+            "modules", "MODULE_NAME", NF_CORE_MODULES_REMOTE, NF_CORE_MODULES_NAME, removed_by="SUBWORKFLOW_NAME"
+        )
+        assert not mod_json_obj.component_present(
+            "MODULE_NAME", NF_CORE_MODULES_REMOTE, NF_CORE_MODULES_NAME, "modules"
+        )
+        assert mod_json_obj.get_dependent_components("modules", "SUBWORKFLOW_NAME", {}) == {}
+
+    def test_mod_json_dependent_components_two_repos(self):
+        """Test that dependent components are only found in the install dir of each repo"""
+        other_remote = "https://github.com/other-org/modules.git"
+        mod_json_obj = ModulesJson(self.pipeline_dir)
+        mod_json = mod_json_obj.get_modules_json()
+        entry = {"branch": "main", "git_sha": "GIT_SHA", "installed_by": ["SUBWORKFLOW_NAME"]}
+        mod_json["repos"][NF_CORE_MODULES_REMOTE]["modules"][NF_CORE_MODULES_NAME]["MODULE_NAME"] = entry
+        mod_json["repos"][other_remote] = {
+            "modules": {"other-org": {"OTHER_MODULE": entry}, "stale-dir": {"STALE_MODULE": entry}},
+            "subworkflows": {"other-org": {"OTHER_SUBWORKFLOW": entry}},
+        }
+        mod_json_obj.modules_json = mod_json
+
+        repo_paths = {NF_CORE_MODULES_REMOTE: NF_CORE_MODULES_NAME, other_remote: "other-org"}
+        with mock.patch("nf_core.modules.modules_json.ModulesRepo") as modules_repo:
+            modules_repo.side_effect = lambda url: mock.Mock(repo_path=repo_paths[url])
+            assert mod_json_obj.get_dependent_components("modules", "SUBWORKFLOW_NAME", {}) == {
+                "MODULE_NAME": (NF_CORE_MODULES_REMOTE, NF_CORE_MODULES_NAME, "modules"),
+                "OTHER_MODULE": (other_remote, "other-org", "modules"),
+            }
+            assert mod_json_obj.get_dependent_components("subworkflows", "SUBWORKFLOW_NAME", {}) == {
+                "MODULE_NAME": (NF_CORE_MODULES_REMOTE, NF_CORE_MODULES_NAME, "modules"),
+                "OTHER_MODULE": (other_remote, "other-org", "modules"),
+                "OTHER_SUBWORKFLOW": (other_remote, "other-org", "subworkflows"),
+            }
+
+    def test_mod_json_index_resolve_missing_installation(self):
+        """Test that entries removed because they could not be reinstalled are removed from the index"""
+        mod_json_obj = ModulesJson(self.pipeline_dir)
+        mod_json_obj.update("modules", ModulesRepo(), "MODULE_NAME", "GIT_SHA", ["modules"], write_file=False)
+        assert mod_json_obj.component_present("MODULE_NAME", NF_CORE_MODULES_REMOTE, NF_CORE_MODULES_NAME, "modules")
+
+        # Entries without a branch can not be reinstalled
+        missing_installation = {
+            NF_CORE_MODULES_REMOTE: {"modules": {NF_CORE_MODULES_NAME: {"MODULE_NAME": {"git_sha": "GIT_SHA"}}}}
+        }
+        mod_json_obj.resolve_missing_installation(missing_installation, "modules")
+        assert not mod_json_obj.component_present(
+            "MODULE_NAME", NF_CORE_MODULES_REMOTE, NF_CORE_MODULES_NAME, "modules"
+        )
+
     def test_mod_json_dump(self):
         """Tests the dump function"""
         mod_json_obj = ModulesJson(self.pipeline_dir)
@@ -217,6 +323,11 @@ class TestModulesCreate(TestModules):
                 raise UserWarning(f"Unable to load JSON file '{mod_json_path}' due to error {e}")
         assert mod_json == mod_json_new
 
+        # Check that an unchanged file is not written again
+        with mock.patch("nf_core.modules.modules_json.os.replace") as replace:
+            mod_json_obj.dump()
+        replace.assert_not_called()
+
     def test_mod_json_with_empty_modules_value(self):
         # Load module.json and remove the modules entry
         mod_json_obj = ModulesJson(self.pipeline_dir)
@@ -0,0 +1,328 @@
+"""Tests for setting up the local clone of a modules repository"""
+
+import json
+import os
+import shutil
+import sys
+import time
+from pathlib import Path
+from unittest import mock
+
+import git
+import pytest
+
+from nf_core.modules.modules_repo import SYNC_STATUS_FILE, ModulesRepo
+from nf_core.modules.patch import ModulePatch
+from nf_core.modules.update import ModuleUpdate
+from nf_core.synced_repo import ComponentStore, SyncedRepo, clone_lock
+
+if sys.platform != "win32":
+    import fcntl
+
+
+def commit_file(repo: git.Repo, path: str, content: str) -> None:
+    Path(repo.working_dir, path).parent.mkdir(parents=True, exist_ok=True)
+    Path(repo.working_dir, path).write_text(content)
+    repo.index.add([path])
+    repo.index.commit(f"Update {path}")
+
+
+@pytest.fixture
+def remote_repo(tmp_path):
+    """A modules repository to clone from, with one module"""
+    repo = git.Repo.init(tmp_path / "remote", initial_branch="main")
+    commit_file(repo, ".nf-core.yml", "repository_type: modules\norg_path: nf-core\n")
+    commit_file(repo, "modules/nf-core/fastqc/main.nf", "process FASTQC {}\n")
+    return repo
+
+
+@pytest.fixture
+def modules_repo(tmp_path, remote_repo, monkeypatch):
+    """Returns a function that creates a ModulesRepo for remote_repo, as a new nf-core command would"""
+    monkeypatch.setattr("nf_core.modules.modules_repo.NFCORE_DIR", tmp_path / "nfcore")
+    monkeypatch.setattr("nf_core.modules.modules_utils.repo_full_name_from_remote", lambda url: "nf-core/modules")
+    monkeypatch.setattr("nf_core.utils.fetch_wf_config", lambda *args, **kwargs: {})
+    monkeypatch.setattr("nf_core.synced_repo.NFCORE_CACHE_DIR", tmp_path / "cache")
+    monkeypatch.setattr(SyncedRepo, "local_repo_statuses", {})
+    monkeypatch.setattr(SyncedRepo, "_latest_versions", {})
+    monkeypatch.setattr(ModulesRepo, "fetched_repos", set())
+    monkeypatch.setattr(ComponentStore, "pruned", False)
+
+    def new_modules_repo():
+        SyncedRepo.local_repo_statuses.clear()
+        ModulesRepo.fetched_repos.clear()
+        return ModulesRepo(f"file://{remote_repo.working_dir}", branch="main", hide_progress=True)
+
+    return new_modules_repo
+
+
+def test_modules_repo_fetch_skipped_within_ttl(modules_repo, remote_repo, monkeypatch):
+    """Test that the remote is not fetched again within the TTL"""
+    monkeypatch.setenv("NFCORE_MODULES_SYNC_TTL", "300")
+    first = modules_repo()
+    assert Path(first.repo.git_dir, SYNC_STATUS_FILE).is_file()
+    commit_file(remote_repo, "modules/nf-core/fastp/main.nf", "process FASTP {}\n")
+
+    with mock.patch.object(git.Remote, "fetch") as fetch:
+        second = modules_repo()
+    fetch.assert_not_called()
+    assert "fastp" not in second.get_avail_components("modules")
+
+
+def test_modules_repo_fetch_after_ttl(modules_repo, remote_repo, monkeypatch):
+    """Test that the remote is only fetched after the TTL if it has changed"""
+    monkeypatch.setenv("NFCORE_MODULES_SYNC_TTL", "0")
+    modules_repo()
+    with mock.patch.object(git.Remote, "fetch") as fetch:
+        modules_repo()
+    fetch.assert_not_called()
+
+    commit_file(remote_repo, "modules/nf-core/fastp/main.nf", "process FASTP {}\n")
+    assert "fastp" in modules_repo().get_avail_components("modules")
+
+
+def test_modules_repo_deleted_branch(modules_repo, remote_repo, monkeypatch):
+    """Test that a branch deleted from the remote is pruned, so that it does not cause a fetch on every run"""
+    monkeypatch.setenv("NFCORE_MODULES_SYNC_TTL", "0")
+    remote_repo.create_head("old")
+    modules_repo()
+    remote_repo.delete_head("old")
+    modules_repo()
+    with mock.patch.object(git.Remote, "fetch") as fetch:
+        modules_repo()
+    fetch.assert_not_called()
+
+
+@pytest.mark.parametrize("worktrees", [False, True])
+def test_modules_repo_fetch_missing_commit(modules_repo, remote_repo, monkeypatch, worktrees):
+    """Test that the remote is fetched within the TTL when a requested commit is not in the local clone"""
+    if worktrees:
+        monkeypatch.setenv("NFCORE_MODULES_WORKTREES", "1")
+    modules_repo()
+    commit_file(remote_repo, "modules/nf-core/fastp/main.nf", "process FASTP {}\n")
+    new_sha = remote_repo.head.commit.hexsha
+
+    repo = modules_repo()
+    assert repo.verify_sha(False, new_sha)
+    assert repo.get_component_tree("fastp", "modules", new_sha) is not None
+    assert "fastp" in repo.get_avail_components("modules")
+    # The remote is only fetched once
+    with mock.patch.object(git.Remote, "fetch") as fetch:
+        assert not repo.sha_exists_on_branch("0" * 40)
+    fetch.assert_not_called()
+
+
+def test_modules_repo_worktrees(modules_repo, remote_repo, monkeypatch):
+    """Test using worktrees at the tip of the branch instead of checking out the branch in the clone"""
+    monkeypatch.setenv("NFCORE_MODULES_WORKTREES", "1")
+    monkeypatch.setenv("NFCORE_MODULES_SYNC_TTL", "0")
+    first = modules_repo()
+    assert first.worktree_sha == remote_repo.head.commit.hexsha
+    assert Path(first.local_repo_dir).name == first.worktree_sha
+
+    commit_file(remote_repo, "modules/nf-core/fastp/main.nf", "process FASTP {}\n")
+    second = modules_repo()
+    assert second.worktree_sha == remote_repo.head.commit.hexsha
+    assert second.local_repo_dir != first.local_repo_dir
+    assert "fastp" in second.get_avail_components("modules")
+    # The first worktree is not changed by the update
+    assert first.repo.head.commit.hexsha == first.worktree_sha
+    assert "fastp" not in first.get_avail_components("modules")
+
+
+def test_modules_repo_broken_clone_with_worktrees(modules_repo, remote_repo, monkeypatch):
+    """Test that the worktrees of a broken clone are removed together with the clone"""
+    monkeypatch.setenv("NFCORE_MODULES_WORKTREES", "1")
+    first = modules_repo()
+    shutil.rmtree(Path(first.clone_dir, ".git"))
+
+    with mock.patch("rich.prompt.Confirm.ask", return_value=True):
+        second = modules_repo()
+    assert second.worktree_sha == first.worktree_sha
+    # The worktree was created again for the new clone
+    assert git.Repo(second.local_repo_dir).head.commit.hexsha == second.worktree_sha
+    assert "fastqc" in second.get_avail_components("modules")
+
+
+def test_patch_and_update_in_worktrees(modules_repo, remote_repo, tmp_path, monkeypatch):
+    """Test that patch and update switch to a worktree of the branch a module was installed from"""
+    monkeypatch.setenv("NFCORE_MODULES_WORKTREES", "1")
+    monkeypatch.setattr("nf_core.modules.modules_json.ModulesJson.check_up_to_date", lambda self: None)
+    remote_url = f"file://{remote_repo.working_dir}"
+    remote_repo.git.checkout("-b", "dev")
+    commit_file(remote_repo, "modules/nf-core/fastqc/main.nf", "process FASTQC {\n    dev\n}\n")
+    installed_sha = remote_repo.head.commit.hexsha
+    commit_file(remote_repo, "modules/nf-core/fastqc/main.nf", "process FASTQC {\n    dev\n    update\n}\n")
+    dev_sha = remote_repo.head.commit.hexsha
+    remote_repo.git.checkout("main")
+
+    pipeline_dir = tmp_path / "pipeline"
+    module_dir = pipeline_dir / "modules" / "nf-core" / "fastqc"
+    module_dir.mkdir(parents=True)
+    (module_dir / "main.nf").write_text("process FASTQC {\n    dev\n}\n")
+    for path in ["main.nf", "nextflow.config"]:
+        (pipeline_dir / path).touch()
+    (pipeline_dir / ".nf-core.yml").write_text("repository_type: pipeline\n")
+    modules_json = {
+        "name": "pipeline",
+        "homePage": "",
+        "repos": {
+            remote_url: {
+                "modules": {
+                    "nf-core": {"fastqc": {"branch": "dev", "git_sha": installed_sha, "installed_by": ["modules"]}}
+                }
+            }
+        },
+    }
+    (pipeline_dir / "modules.json").write_text(json.dumps(modules_json))
+
+    with mock.patch("questionary.confirm") as confirm:
+        confirm.return_value.unsafe_ask.return_value = True
+        update = ModuleUpdate(pipeline_dir, show_diff=False, remote_url=remote_url, branch="main")
+        assert update.update("fastqc")
+    assert update.modules_repo.worktree_sha == dev_sha
+    assert Path(update.modules_repo.local_repo_dir).name == dev_sha
+    assert (module_dir / "main.nf").read_text() == "process FASTQC {\n    dev\n    update\n}\n"
+
+    (module_dir / "main.nf").write_text("process FASTQC {\n    dev\n    patched\n}\n")
+    patch = ModulePatch(pipeline_dir, remote_url=remote_url, branch="main")
+    patch.patch("fastqc")
+    assert patch.modules_repo.worktree_sha == dev_sha
+    assert "+    patched" in (module_dir / "fastqc.diff").read_text()
+
+    # The branches of the clone are not checked out, and worktrees are not nested
+    clone = git.Repo(tmp_path / "nfcore" / "nf-core" / "modules")
+    assert clone.active_branch.name == "main"
+    worktrees = {path.name for path in (tmp_path / "nfcore" / "nf-core" / "modules-worktrees").iterdir()}
+    assert worktrees == {remote_repo.commit("main").hexsha, dev_sha}
+    assert not list((tmp_path / "nfcore" / "nf-core" / "modules-worktrees").glob("*.lock"))
+
+
+def test_get_latest_component_versions(modules_repo, remote_repo):
+    """Test that the latest versions from one walk of the history match the git log of each module"""
+    commit_file(remote_repo, "modules/nf-core/samtools/sort/main.nf", "process SAMTOOLS_SORT {}\n")
+    commit_file(remote_repo, "modules/nf-core/fastqc/tests/main.nf.test", "nextflow_process {}\n")
+    commit_file(remote_repo, "modules/nf-core/samtools/sort/meta.yml", "name: samtools_sort\n")
+    repo = modules_repo()
+
+    versions = repo.get_latest_component_versions("modules")
+    assert versions.keys() == {"fastqc", "samtools/sort"}
+    for component, version in versions.items():
+        assert version == next(iter(repo.get_component_git_log(component, "modules")))["git_sha"]
+        assert repo.get_latest_component_version(component, "modules") == version
+
+    # The versions are read from the cache until the remote changes
+    SyncedRepo._latest_versions.clear()
+    cached_repo = modules_repo()
+    with mock.patch.object(SyncedRepo, "get_avail_components") as get_avail_components:
+        assert cached_repo.get_latest_component_versions("modules") == versions
+    get_avail_components.assert_not_called()
+    commit_file(remote_repo, "modules/nf-core/fastqc/main.nf", "process FASTQC { }\n")
+    with mock.patch.dict("os.environ", {"NFCORE_MODULES_SYNC_TTL": "0"}):
+        new_versions = modules_repo().get_latest_component_versions("modules")
+    assert new_versions == {**versions, "fastqc": remote_repo.head.commit.hexsha}
+
+
+def test_find_component_commit(modules_repo, remote_repo, tmp_path, monkeypatch):
+    """Test that installed versions are found with one lookup in the reverse index, which follows new commits"""
+    monkeypatch.setenv("NFCORE_MODULES_SYNC_TTL", "0")
+    first_sha = remote_repo.head.commit.hexsha
+    commit_file(remote_repo, "modules/nf-core/fastqc/meta.yml", "name: fastqc\n")
+    commit_file(remote_repo, "modules/nf-core/fastqc/main.nf", "process FASTQC { v2 }\n")
+    second_sha = remote_repo.head.commit.hexsha
+    commit_file(remote_repo, "modules/nf-core/fastp/main.nf", "process FASTP {}\n")
+    repo = modules_repo()
+    assert repo.install_component("fastqc", tmp_path / "pipeline", second_sha, "modules")
+    module_dir = tmp_path / "pipeline" / "fastqc"
+    assert repo.find_component_commit("fastqc", module_dir, "modules") == second_sha
+
+    with mock.patch.object(SyncedRepo, "get_component_git_log") as get_component_git_log:
+        assert modules_repo().find_component_commit("fastqc", module_dir, "modules") == second_sha
+        # Files missing from the pipeline are not compared
+        (module_dir / "meta.yml").unlink()
+        (module_dir / "main.nf").write_text("process FASTQC {}\n")
+        get_component_git_log.return_value = iter([{"git_sha": second_sha}, {"git_sha": first_sha}])
+        assert modules_repo().find_component_commit("fastqc", module_dir, "modules") == first_sha
+        get_component_git_log.reset_mock()
+
+        # Only the new commits are added when the branch moves on
+        commit_file(remote_repo, "modules/nf-core/fastqc/main.nf", "process FASTQC { v3 }\n")
+        third_sha = remote_repo.head.commit.hexsha
+        (module_dir / "main.nf").write_text("process FASTQC { v3 }\n")
+        (module_dir / "meta.yml").write_text("name: fastqc\n")
+        assert modules_repo().find_component_commit("fastqc", module_dir, "modules") == third_sha
+        get_component_git_log.assert_not_called()
+
+        # The first version has no meta.yml, so unknown versions are compared with each commit
+        (module_dir / "main.nf").write_text("process FASTQC { changed }\n")
+        get_component_git_log.return_value = iter(
+            [{"git_sha": third_sha}, {"git_sha": second_sha}, {"git_sha": first_sha}]
+        )
+        assert modules_repo().find_component_commit("fastqc", module_dir, "modules") is None
+
+
+def test_install_component_from_store(modules_repo, remote_repo, tmp_path):
+    """Test that installed modules are shared through the component store, and that changed stored files are replaced"""
+    commit = remote_repo.head.commit.hexsha
+    repo = modules_repo()
+    assert repo.install_component("fastqc", tmp_path / "first", commit, "modules")
+
+    with mock.patch.object(SyncedRepo, "get_component_tree") as get_component_tree:
+        assert repo.install_component("fastqc", tmp_path / "second", commit, "modules")
+        assert all(repo.component_files_identical("fastqc", tmp_path / "second" / "fastqc", commit, "modules").values())
+    get_component_tree.assert_not_called()
+    first, second = Path(tmp_path, "first", "fastqc", "main.nf"), Path(tmp_path, "second", "fastqc", "main.nf")
+    assert first.read_text() == "process FASTQC {}\n"
+    assert not first.samefile(second)
+
+    # Changing an installed file in place does not change the stored file
+    first.write_text("process FASTQC { changed }\n")
+    with mock.patch.object(SyncedRepo, "get_component_tree") as get_component_tree:
+        assert repo.install_component("fastqc", tmp_path / "third", commit, "modules")
+    get_component_tree.assert_not_called()
+    assert Path(tmp_path, "third", "fastqc", "main.nf").read_text() == "process FASTQC {}\n"
+
+    # Changed stored files are replaced from the clone
+    store = ComponentStore(repo.remote_url)
+    for object_path in Path(store.path, "objects").glob("*/*"):
+        object_path.write_text("changed")
+    assert repo.install_component("fastqc", tmp_path / "fourth", commit, "modules")
+    assert Path(tmp_path, "fourth", "fastqc", "main.nf").read_text() == "process FASTQC {}\n"
+
+
+def test_component_store_prune(modules_repo, remote_repo, tmp_path):
+    """Test that modules that have not been used for a while are removed from the component store, with their files"""
+    commit_file(remote_repo, "modules/nf-core/fastp/main.nf", "process FASTP {}\n")
+    commit = remote_repo.head.commit.hexsha
+    repo = modules_repo()
+    assert repo.install_component("fastqc", tmp_path / "pipeline", commit, "modules")
+    assert repo.install_component("fastp", tmp_path / "pipeline", commit, "modules")
+    store = ComponentStore(repo.remote_url)
+    fastqc_tree = store.tree_path(f"modules/{repo.repo_path}/fastqc", commit)
+    fastp_tree = store.tree_path(f"modules/{repo.repo_path}/fastp", commit)
+    assert fastqc_tree is not None and fastp_tree is not None
+    fastp_object = store.object_path(store.get(f"modules/{repo.repo_path}/fastp", commit)["main.nf"][0])
+
+    # Only the files of fastp are old enough to be removed
+    old = time.time() - 60
+    for path in [fastp_tree, *Path(store.path, "objects").glob("*/*")]:
+        os.utime(path, (old, old))
+    store.prune(max_age=30)
+    assert fastqc_tree.is_file()
+    assert not fastp_tree.exists()
+    assert not fastp_object.exists()
+    assert store.get(f"modules/{repo.repo_path}/fastqc", commit) is not None
+    assert store.materialize(store.get(f"modules/{repo.repo_path}/fastqc", commit), tmp_path / "other" / "fastqc")
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="Processes are not locked out on Windows")
+def test_clone_lock(tmp_path):
+    """Test that the clone lock can be nested and locks out other processes"""
+    with clone_lock(tmp_path / "clone"):
+        with clone_lock(tmp_path / "clone"):
+            pass
+        with open(tmp_path / "clone.lock") as fh:
+            with pytest.raises(BlockingIOError):
+                fcntl.flock(fh, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    with open(tmp_path / "clone.lock") as fh:
+        fcntl.flock(fh, fcntl.LOCK_EX | fcntl.LOCK_NB)
@@ -159,6 +159,16 @@ class TestModulesInstall(TestModules):
             current_git_sha = mod_json["repos"][NF_CORE_MODULES_REMOTE]["modules"][NF_CORE_MODULES_NAME][mod]["git_sha"]
             assert correct_git_sha == current_git_sha
 
+    def test_update_all_parallel(self):
+        """Updates all modules present in the pipeline, preparing the updates in parallel"""
+        update_obj = ModuleUpdate(self.pipeline_dir, update_all=True, show_diff=False, jobs=4)
+        assert update_obj.update() is True
+
+        mod_json = ModulesJson(self.pipeline_dir).get_modules_json()
+        for mod, mod_entry in mod_json["repos"][NF_CORE_MODULES_REMOTE]["modules"][NF_CORE_MODULES_NAME].items():
+            correct_git_sha = update_obj.modules_repo.get_latest_component_version(mod, "modules")
+            assert mod_entry["git_sha"] == correct_git_sha
+
     def test_update_with_config_fixed_version(self):
         """Try updating when there are entries in the .nf-core.yml"""
         # Install trimgalore at the latest version
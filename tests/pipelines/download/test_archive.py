@@ -0,0 +1,121 @@
+import bz2
+import io
+import os
+import shutil
+import subprocess
+import tarfile
+import unittest
+import zlib
+from pathlib import Path
+from zipfile import ZipFile
+
+import pytest
+
+import nf_core.utils
+from nf_core.pipelines.download.archive import DownloadArchive
+from nf_core.pipelines.download.utils import IMAGE_MANIFEST_FILENAME
+
+from ...utils import with_temporary_folder
+
+
+class DownloadArchiveTest(unittest.TestCase):
+    def make_download(self, outdir: Path) -> Path:
+        """Create a download directory, with images of several compression blocks"""
+        download_dir = outdir / "nf-core-pipeline"
+        (download_dir / "1_0" / "conf").mkdir(parents=True)
+        (download_dir / "1_0" / "main.nf").write_text("workflow {}\n")
+        (download_dir / "1_0" / "conf" / "base.config").write_text("process {}\n")
+        (download_dir / "singularity-images").mkdir()
+        (download_dir / "singularity-images" / "image.img").write_bytes(os.urandom(1024 * 1024) * 3)
+        (download_dir / "singularity-images" / "other.img").write_bytes(b"other" * 100000)
+        (download_dir / "singularity-images" / "quay.io-image.img").symlink_to("image.img")
+        # Not archived
+        (download_dir / "singularity-images" / IMAGE_MANIFEST_FILENAME).write_text("{}")
+        (download_dir / "singularity-images" / f"{IMAGE_MANIFEST_FILENAME}.lock").touch()
+        (download_dir / "singularity-images" / "partial.img.partial.0").write_bytes(b"partial")
+        (download_dir / "singularity-images" / "partial.img.partial.json").write_text("{}")
+        return download_dir
+
+    def archived_paths(self, download_dir: Path) -> list[Path]:
+        """The paths of the download that are expected in the archive"""
+        return [
+            path
+            for path in download_dir.rglob("*")
+            if not path.name.startswith(IMAGE_MANIFEST_FILENAME) and ".partial." not in path.name
+        ]
+
+    def write_archive(self, outdir: Path, compress_type: str) -> tuple[Path, Path]:
+        download_dir = self.make_download(outdir)
+        output_filename = outdir / f"nf-core-pipeline.{compress_type}"
+        archive = DownloadArchive(output_filename, compress_type, download_dir, threads=3)
+        # Images are added as they arrive, the rest when the archive is closed
+        archive.add(download_dir / "singularity-images" / "image.img")
+        md5 = archive.close()
+        assert md5 == nf_core.utils.file_md5(output_filename)
+        return download_dir, output_filename
+
+    def check_tar(self, download_dir: Path, tar_data: bytes) -> None:
+        with tarfile.open(fileobj=io.BytesIO(tar_data)) as tar:
+            names = tar.getnames()
+            assert names[:3] == [
+                "nf-core-pipeline",
+                "nf-core-pipeline/singularity-images",
+                "nf-core-pipeline/singularity-images/image.img",
+            ]
+            assert sorted(names) == sorted(
+                ["nf-core-pipeline"]
+                + [
+                    str(Path("nf-core-pipeline", path.relative_to(download_dir)))
+                    for path in self.archived_paths(download_dir)
+                ]
+            )
+            for path in self.archived_paths(download_dir):
+                member = tar.getmember(str(Path("nf-core-pipeline", path.relative_to(download_dir))))
+                if path.is_symlink():
+                    assert member.linkname == "image.img"
+                elif path.is_file():
+                    extracted = tar.extractfile(member)
+                    assert extracted is not None
+                    assert extracted.read() == path.read_bytes()
+
+    @with_temporary_folder
+    def test_archive_tar_gz(self, outdir):
+        download_dir, output_filename = self.write_archive(Path(outdir), "tar.gz")
+        # The blocks form a single gzip stream
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        tar_data = decompressor.decompress(output_filename.read_bytes())
+        assert decompressor.eof and not decompressor.unused_data
+        self.check_tar(download_dir, tar_data)
+
+    @with_temporary_folder
+    def test_archive_tar_bz2(self, outdir):
+        download_dir, output_filename = self.write_archive(Path(outdir), "tar.bz2")
+        # The blocks are separate bzip2 streams
+        self.check_tar(download_dir, bz2.decompress(output_filename.read_bytes()))
+
+    @pytest.mark.skipif(shutil.which("zstd") is None, reason="zstd is not installed")
+    @with_temporary_folder
+    def test_archive_tar_zst(self, outdir):
+        download_dir, output_filename = self.write_archive(Path(outdir), "tar.zst")
+        tar_data = subprocess.run(["zstd", "-d", "-c", output_filename], capture_output=True, check=True).stdout
+        self.check_tar(download_dir, tar_data)
+
+    @with_temporary_folder
+    def test_archive_zip(self, outdir):
+        download_dir, output_filename = self.write_archive(Path(outdir), "zip")
+        with ZipFile(output_filename) as zip_file:
+            assert sorted(zip_file.namelist()) == sorted(
+                str(path).lstrip("/") for path in self.archived_paths(download_dir) if path.is_file()
+            )
+            for path in self.archived_paths(download_dir):
+                if path.is_file():
+                    assert zip_file.read(str(path).lstrip("/")) == path.read_bytes()
+
+    @with_temporary_folder
+    def test_archive_abort(self, outdir):
+        download_dir = self.make_download(Path(outdir))
+        output_filename = Path(outdir) / "nf-core-pipeline.tar.gz"
+        archive = DownloadArchive(output_filename, "tar.gz", download_dir, threads=2)
+        archive.add(download_dir / "singularity-images" / "image.img")
+        archive.abort()
+        assert not output_filename.exists()
@@ -1,18 +1,24 @@
 """Tests for the download subcommand of nf-core tools"""
 
+import hashlib
+import http.server
+import json
 import logging
 import os
 import shutil
+import threading
 import unittest
 from pathlib import Path
 from unittest import mock
 
 import pytest
 import requests
+import responses
 import rich.progress_bar
 import rich.table
 import rich.text
 
+import nf_core.pipelines.download.singularity
 from nf_core.pipelines.download import DownloadWorkflow
 from nf_core.pipelines.download.container_fetcher import ContainerProgress
 from nf_core.pipelines.download.singularity import (
@@ -21,7 +27,7 @@ from nf_core.pipelines.download.singularity import (
     SingularityFetcher,
     SingularityProgress,
 )
-from nf_core.pipelines.download.utils import DownloadError
+from nf_core.pipelines.download.utils import IMAGE_MANIFEST_FILENAME, DownloadError, ImageManifest
 
 from ...utils import TEST_DATA_DIR, with_temporary_folder
 
@@ -250,6 +256,96 @@ class SingularityTest(unittest.TestCase):
             workflow_directory=Path("pipeline-dummy"),
         )
 
+    @with_temporary_folder
+    @mock.patch("nf_core.pipelines.download.singularity.SingularityFetcher.fetch_remote_containers")
+    @mock.patch("nf_core.pipelines.download.singularity.SingularityFetcher.gather_registries")
+    @mock.patch("nf_core.pipelines.download.singularity.SingularityFetcher.check_and_set_implementation")
+    def test_fetch_containers_checks_cache_manifest(
+        self, tmp_path, mock_check_and_set_implementation, mock_gather_registries, mock_fetch_remote_containers
+    ):
+        tmp_path = Path(tmp_path)
+        cache_dir = tmp_path / "cache"
+        cache_dir.mkdir()
+        mock_gather_registries.return_value = set()
+        container = "https://depot.galaxyproject.org/singularity/image:1.0--0"
+        with mock.patch.dict(os.environ, {"NXF_SINGULARITY_CACHEDIR": str(cache_dir)}):
+            singularity_fetcher = SingularityFetcher(
+                outdir=tmp_path,
+                container_library=[],
+                registry_set=[],
+                container_cache_utilisation="copy",
+                hide_progress=True,
+            )
+        singularity_fetcher.registry_set = set()
+        cache_path = cache_dir / singularity_fetcher.get_container_filename(container)
+        output_path = tmp_path / "singularity-images" / cache_path.name
+        output_path.parent.mkdir()
+        cache_path.write_bytes(b"image")
+        ImageManifest(cache_dir).add(cache_path, hashlib.sha256(b"image").hexdigest())
+
+        # An unchanged cached image is copied, together with its checksum
+        singularity_fetcher.fetch_containers([container], [], workflow_directory=tmp_path)
+        mock_fetch_remote_containers.assert_not_called()
+        assert output_path.read_bytes() == b"image"
+        assert ImageManifest(output_path.parent).checksum(output_path) == hashlib.sha256(b"image").hexdigest()
+
+        # A cached image that has changed since it was downloaded is fetched again
+        output_path.unlink()
+        cache_path.write_bytes(b"truncated")
+        singularity_fetcher.fetch_containers([container], [], workflow_directory=tmp_path)
+        mock_fetch_remote_containers.assert_called_once_with([(container, cache_path)], parallel=4)
+        assert ImageManifest(cache_dir).load() == {}
+
+    @with_temporary_folder
+    @mock.patch("nf_core.pipelines.download.singularity.SingularityFetcher.fetch_remote_containers")
+    @mock.patch("nf_core.pipelines.download.singularity.SingularityFetcher.gather_registries")
+    @mock.patch("nf_core.pipelines.download.singularity.SingularityFetcher.check_and_set_implementation")
+    def test_fetch_containers_copies_while_fetching(
+        self, tmp_path, mock_check_and_set_implementation, mock_gather_registries, mock_fetch_remote_containers
+    ):
+        tmp_path = Path(tmp_path)
+        cache_dir = tmp_path / "cache"
+        cache_dir.mkdir()
+        mock_gather_registries.return_value = set()
+        containers = [f"https://depot.galaxyproject.org/singularity/image{i}:1.0--0" for i in range(3)]
+        with mock.patch.dict(
+            os.environ, {"NXF_SINGULARITY_CACHEDIR": str(cache_dir), "NFCORE_DOWNLOAD_IMAGE_LINKS": "hardlink"}
+        ):
+            singularity_fetcher = SingularityFetcher(
+                outdir=tmp_path,
+                container_library=[],
+                registry_set=[],
+                container_cache_utilisation="copy",
+                hide_progress=True,
+            )
+        singularity_fetcher.registry_set = set()
+        filenames = [singularity_fetcher.get_container_filename(container) for container in containers]
+        output_dir = tmp_path / "singularity-images"
+        output_dir.mkdir()
+        (cache_dir / filenames[0]).write_bytes(b"cached")
+
+        def fetch_remote_containers(containers_remote_fetch, parallel):
+            # The cached image is copied without waiting for the fetch
+            singularity_fetcher.copy_futures[0].result()
+            assert (output_dir / filenames[0]).is_file()
+            assert containers_remote_fetch == [
+                (containers[1], cache_dir / filenames[1]),
+                (containers[2], cache_dir / filenames[2]),
+            ]
+            # A fetched image is copied before the other images have been fetched
+            (cache_dir / filenames[1]).write_bytes(b"fetched")
+            singularity_fetcher.container_fetched(cache_dir / filenames[1])
+            singularity_fetcher.copy_futures[-1].result()
+            assert (output_dir / filenames[1]).read_bytes() == b"fetched"
+
+        mock_fetch_remote_containers.side_effect = fetch_remote_containers
+        singularity_fetcher.fetch_containers(containers, [], workflow_directory=tmp_path)
+        mock_fetch_remote_containers.assert_called_once()
+        # Images are hard linked from the cache, and images that could not be fetched are not copied
+        assert (output_dir / filenames[0]).samefile(cache_dir / filenames[0])
+        assert (output_dir / filenames[1]).samefile(cache_dir / filenames[1])
+        assert not (output_dir / filenames[2]).exists()
+
     #
     # Tests for the 'symlink_registries' function
     #
@@ -710,6 +806,211 @@ class FileDownloaderTest(unittest.TestCase):
                 downloader.download_file(src_url, output_path)
             assert not (output_path).exists()
 
+    @staticmethod
+    def ranged_response(data: bytes, interrupt_at: int | None = None):
+        """Returns a response callback serving data with range requests, cutting off the first full response"""
+
+        def callback(request):
+            headers = {"ETag": '"image"', "Accept-Ranges": "bytes"}
+            if "Range" not in request.headers:
+                return (200, {**headers, "Content-Length": str(len(data))}, data[:interrupt_at])
+            start, end = (int(byte) for byte in request.headers["Range"].removeprefix("bytes=").split("-"))
+            headers["Content-Range"] = f"bytes {start}-{end}/{len(data)}"
+            return (206, headers, data[start : end + 1])
+
+        return callback
+
+    @with_temporary_folder
+    def test_file_download_resume(self, outdir):
+        outdir = Path(outdir)
+        src_url = "https://depot.galaxyproject.org/singularity/image.img"
+        data = bytes(range(256)) * 200
+        with ContainerProgress() as progress, responses.RequestsMock() as rsps:
+            downloader = FileDownloader(progress)
+
+            # The interrupted download is resumed from the last complete chunk
+            rsps.add_callback(responses.GET, src_url, callback=self.ranged_response(data, interrupt_at=20000))
+            downloader.download_file(src_url, outdir / "image.img")
+            assert (outdir / "image.img").read_bytes() == data
+            assert [call.request.headers.get("Range") for call in rsps.calls] == [None, f"bytes=16384-{len(data) - 1}"]
+            assert sorted(outdir.iterdir()) == [
+                outdir / IMAGE_MANIFEST_FILENAME,
+                outdir / f"{IMAGE_MANIFEST_FILENAME}.lock",
+                outdir / "image.img",
+            ]
+            assert ImageManifest(outdir).checksum(outdir / "image.img") == hashlib.sha256(data).hexdigest()
+
+            # A download interrupted in an earlier run is resumed from its partial file
+            rsps.calls.reset()
+            (outdir / "image.img.partial.0").write_bytes(data[:1000])
+            state = {"url": src_url, "size": len(data), "validator": '"image"', "parts": [[0, len(data) - 1]]}
+            (outdir / "image.img.partial.json").write_text(json.dumps(state))
+            downloader.download_file(src_url, outdir / "image.img")
+            assert (outdir / "image.img").read_bytes() == data
+            assert rsps.calls[-1].request.headers["Range"] == f"bytes=1000-{len(data) - 1}"
+            assert rsps.calls[-1].request.headers["If-Range"] == '"image"'
+            assert ImageManifest(outdir).checksum(outdir / "image.img") == hashlib.sha256(data).hexdigest()
+
+    @with_temporary_folder
+    def test_file_download_retry(self, outdir):
+        outdir = Path(outdir)
+        src_url = "https://depot.galaxyproject.org/singularity/image.img"
+        data = bytes(range(256)) * 200
+        ranged_response = self.ranged_response(data, interrupt_at=20000)
+        busy = [503, 429]
+
+        def busy_server(request):
+            if "Range" in request.headers and busy:
+                return (busy.pop(0), {"Retry-After": "5"} if busy else {}, b"")
+            return ranged_response(request)
+
+        with (
+            ContainerProgress() as progress,
+            responses.RequestsMock() as rsps,
+            mock.patch("time.sleep") as sleep,
+        ):
+            # Busy servers are retried with backoff, keeping the downloaded data
+            rsps.add_callback(responses.GET, src_url, callback=busy_server)
+            FileDownloader(progress).download_file(src_url, outdir / "image.img")
+            assert (outdir / "image.img").read_bytes() == data
+            assert [call.args for call in sleep.call_args_list] == [(2.0,), (5.0,), (8.0,)]
+            assert [call.request.headers.get("Range") for call in rsps.calls][-1] == f"bytes=16384-{len(data) - 1}"
+
+            # The first request is retried as well, and error pages are not written to the image
+            rsps.reset()
+            sleep.reset_mock()
+            (outdir / "image.img").unlink()
+            rsps.add(responses.GET, src_url, status=502, body=b"<html>Bad Gateway</html>")
+            rsps.add(responses.GET, src_url, body=data, headers={"Content-Length": str(len(data))})
+            FileDownloader(progress).download_file(src_url, outdir / "image.img")
+            assert (outdir / "image.img").read_bytes() == data
+            assert [call.args for call in sleep.call_args_list] == [(2.0,)]
+
+            rsps.reset()
+            (outdir / "image.img").unlink()
+            rsps.add(responses.GET, src_url, status=404, body=b"<html>Not Found</html>")
+            with pytest.raises(requests.exceptions.HTTPError):
+                FileDownloader(progress).download_file(src_url, outdir / "image.img")
+            assert sorted(outdir.iterdir()) == [
+                outdir / IMAGE_MANIFEST_FILENAME,
+                outdir / f"{IMAGE_MANIFEST_FILENAME}.lock",
+            ]
+
+            # Other errors keep the partial download, so that it can be resumed later
+            rsps.reset()
+            rsps.add(responses.GET, src_url, status=404)
+            (outdir / "image.img.partial.0").write_bytes(data[:1000])
+            state = {"url": src_url, "size": len(data), "validator": '"image"', "parts": [[0, len(data) - 1]]}
+            (outdir / "image.img.partial.json").write_text(json.dumps(state))
+            with pytest.raises(requests.exceptions.HTTPError):
+                FileDownloader(progress).download_file(src_url, outdir / "image.img")
+            assert (outdir / "image.img.partial.0").read_bytes() == data[:1000]
+
+            # A changed file discards the partial download
+            rsps.reset()
+            rsps.add(responses.GET, src_url, status=412)
+            with pytest.raises(DownloadError):
+                FileDownloader(progress).download_file(src_url, outdir / "image.img")
+            assert not (outdir / "image.img.partial.0").exists()
+            assert not (outdir / "image.img.partial.json").exists()
+
+    @with_temporary_folder
+    def test_file_download_weak_etag(self, outdir):
+        outdir = Path(outdir)
+        src_url = "https://depot.galaxyproject.org/singularity/image.img"
+        data = bytes(range(256)) * 200
+        headers = {"ETag": 'W/"image"', "Last-Modified": "Wed, 21 Oct 2015 07:28:00 GMT", "Accept-Ranges": "bytes"}
+        with ContainerProgress() as progress, responses.RequestsMock() as rsps:
+            rsps.add(responses.GET, src_url, body=data[:20000], headers={**headers, "Content-Length": str(len(data))})
+            rsps.add(responses.GET, src_url, body=data[16384:], status=206, headers=headers)
+            FileDownloader(progress).download_file(src_url, outdir / "image.img")
+            assert (outdir / "image.img").read_bytes() == data
+            assert rsps.calls[-1].request.headers["If-Range"] == "Wed, 21 Oct 2015 07:28:00 GMT"
+
+    @with_temporary_folder
+    def test_file_download_parallel_ranges(self, outdir):
+        outdir = Path(outdir)
+        src_url = "https://depot.galaxyproject.org/singularity/image.img"
+        data = bytes(range(256)) * 200
+        with (
+            ContainerProgress() as progress,
+            responses.RequestsMock() as rsps,
+            mock.patch.object(nf_core.pipelines.download.singularity, "RANGED_DOWNLOAD_MIN_SIZE", 1000),
+        ):
+            rsps.add_callback(responses.GET, src_url, callback=self.ranged_response(data))
+            FileDownloader(progress, parallel_ranges=3).download_file(src_url, outdir / "image.img")
+            assert (outdir / "image.img").read_bytes() == data
+            assert sorted(call.request.headers.get("Range", "") for call in rsps.calls) == [
+                "",
+                "bytes=0-17066",
+                "bytes=17067-34133",
+                "bytes=34134-51199",
+            ]
+            assert sorted(outdir.iterdir()) == [
+                outdir / IMAGE_MANIFEST_FILENAME,
+                outdir / f"{IMAGE_MANIFEST_FILENAME}.lock",
+                outdir / "image.img",
+            ]
+            assert ImageManifest(outdir).checksum(outdir / "image.img") == hashlib.sha256(data).hexdigest()
+
+    @with_temporary_folder
+    def test_parallel_downloads_share_session(self, outdir):
+        outdir = Path(outdir)
+        downloads = [
+            (f"https://depot.galaxyproject.org/singularity/image{i}.img", outdir / f"image{i}.img") for i in range(3)
+        ]
+        with ContainerProgress() as progress, responses.RequestsMock() as rsps:
+            for url, _ in downloads:
+                rsps.add(responses.GET, url, body=b"image")
+            downloader = FileDownloader(progress, parallel_ranges=2)
+            with mock.patch.object(requests, "get") as requests_get:
+                assert sorted(downloader.download_files_in_parallel(downloads, parallel_downloads=3)) == downloads
+            requests_get.assert_not_called()
+            # One keep-alive connection per byte range of each parallel download, for each server
+            pool_config = downloader.session.get_adapter(downloads[0][0]).poolmanager.connection_pool_kw
+            assert pool_config["maxsize"] == 6
+            assert pool_config["block"] is True
+
+    @with_temporary_folder
+    def test_downloads_reuse_connections(self, outdir):
+        outdir = Path(outdir)
+        # Client address of each connection to the server
+        connections = []
+
+        class ImageHandler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                connections.append(self.client_address)
+
+            def do_GET(self):
+                self.send_response(200)
+                self.send_header("Content-Length", "5")
+                self.end_headers()
+                self.wfile.write(b"image")
+
+            def log_message(self, *args):
+                pass
+
+        with http.server.ThreadingHTTPServer(("127.0.0.1", 0), ImageHandler) as server:
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            try:
+                downloads = [
+                    (f"http://127.0.0.1:{server.server_port}/singularity/image{i}.img", outdir / f"image{i}.img")
+                    for i in range(4)
+                ]
+                with ContainerProgress() as progress:
+                    downloader = FileDownloader(progress)
+                    downloader.download_file(*downloads[0])
+                    assert downloader.download_files_in_parallel(downloads[1:3], parallel_downloads=1) == downloads[1:3]
+                    assert downloader.download_files_in_parallel(downloads[3:], parallel_downloads=1) == downloads[3:]
+            finally:
+                server.shutdown()
+        assert all((outdir / f"image{i}.img").read_bytes() == b"image" for i in range(4))
+        # All downloads used the same keep-alive connection
+        assert len(connections) == 1
+
     #
     # Test for 'download_files_in_parallel'
     #
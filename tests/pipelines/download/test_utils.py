@@ -1,5 +1,8 @@
+import hashlib
 import os
 import subprocess
+import sys
+import threading
 import unittest
 from pathlib import Path
 
@@ -7,11 +10,15 @@ import pytest
 
 from nf_core.pipelines.download.utils import (
     DownloadError,
+    ImageManifest,
     intermediate_file,
 )
 
 from ...utils import with_temporary_folder
 
+if sys.platform != "win32":
+    import fcntl
+
 
 class DownloadUtilsTest(unittest.TestCase):
     @pytest.fixture(autouse=True)
@@ -80,3 +87,59 @@ class DownloadUtilsTest(unittest.TestCase):
         with pytest.raises(DownloadError):
             with intermediate_file(output_path) as tmp:
                 pass
+
+    #
+    # Test for 'utils.ImageManifest'
+    #
+    @with_temporary_folder
+    def test_image_manifest(self, outdir):
+        outdir = Path(outdir)
+        image_path = outdir / "image.img"
+        image_path.write_bytes(b"image")
+        sha256 = hashlib.sha256(b"image").hexdigest()
+
+        # Images without an entry are unknown
+        assert ImageManifest.verify(image_path) is None
+        ImageManifest(outdir).add(image_path, sha256)
+        assert ImageManifest(outdir).checksum(image_path) == sha256
+        assert ImageManifest.verify(image_path) is True
+
+        # Symbolic links are checked against the entry of their target
+        (outdir / "registry-image.img").symlink_to("image.img")
+        assert ImageManifest.verify(outdir / "registry-image.img") is True
+
+        # Images with another modification time are checked against their checksum
+        stat = image_path.stat()
+        os.utime(image_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        assert ImageManifest(outdir).checksum(image_path) is None
+        assert ImageManifest.verify(image_path) is True
+        assert ImageManifest(outdir).checksum(image_path) == sha256
+        image_path.write_bytes(b"IMAGE")
+        assert ImageManifest.verify(image_path) is False
+
+        # Changed images don't match their entry
+        image_path.write_bytes(b"changed")
+        assert ImageManifest(outdir).checksum(image_path) is None
+        assert ImageManifest.verify(image_path) is False
+
+        ImageManifest(outdir).discard([image_path])
+        assert ImageManifest.verify(image_path) is None
+
+    @pytest.mark.skipif(sys.platform == "win32", reason="Processes are not locked out on Windows")
+    @with_temporary_folder
+    def test_image_manifest_process_lock(self, outdir):
+        outdir = Path(outdir)
+        image_path = outdir / "image.img"
+        image_path.write_bytes(b"image")
+        manifest = ImageManifest(outdir)
+
+        # The manifest is not updated while another process holds the lock
+        with open(manifest.lock_path, "w") as fh:
+            fcntl.flock(fh, fcntl.LOCK_EX)
+            thread = threading.Thread(target=manifest.add, args=(image_path, "sha256"))
+            thread.start()
+            thread.join(0.5)
+            assert thread.is_alive()
+            assert manifest.load() == {}
+        thread.join()
+        assert manifest.checksum(image_path) == "sha256"
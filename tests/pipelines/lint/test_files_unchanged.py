@@ -1,5 +1,10 @@
+import importlib
+import os
+import time
 from pathlib import Path
+from unittest import mock
 
+import nf_core.pipelines.create.create
 import nf_core.pipelines.lint
 
 from ..test_lint import TestLint
@@ -26,3 +31,51 @@ class TestLintFilesUnchanged(TestLint):
         assert len(results["failed"]) > 0
         assert str(failing_file) in results["failed"][0]
         assert results["could_fix"]
+
+    def test_files_unchanged_cached_template(self):
+        """The template is only rendered once for the same pipeline parameters"""
+        self.lint_obj._load()
+        self.lint_obj.files_unchanged()
+        with mock.patch.object(nf_core.pipelines.create.create.PipelineCreate, "render_template") as render_template:
+            results = self.lint_obj.files_unchanged()
+        render_template.assert_not_called()
+        assert len(results.get("failed", [])) == 0
+        assert len(results.get("passed", [])) > 0
+
+
+# The lint test function shadows its module in nf_core.pipelines.lint
+files_unchanged_module = importlib.import_module("nf_core.pipelines.lint.files_unchanged")
+
+
+def test_template_cached_only_when_formatted(tmp_path):
+    """A rendering of the template that prettier could not format is not cached"""
+    template_yaml = {"name": "testpipeline", "description": "Test", "author": "Me", "org": "nf-core"}
+    files = [Path("docs", "README.md")]
+    cache_dir = tmp_path / "pipeline-template"
+    with mock.patch("nf_core.utils.NFCORE_CACHE_DIR", tmp_path):
+        with mock.patch("nf_core.pipelines.create.create.run_prettier_on_file", return_value=False):
+            with files_unchanged_module._render_template_files(
+                template_yaml, "nf-core", "testpipeline", files
+            ) as rendered:
+                assert Path(rendered, "docs", "README.md").is_file()
+                assert [path.name.startswith("tmp-") for path in cache_dir.iterdir()] == [True]
+        # The uncached rendering is removed once it is no longer used
+        assert list(cache_dir.iterdir()) == []
+
+        with mock.patch("nf_core.pipelines.create.create.run_prettier_on_file", return_value=True):
+            with files_unchanged_module._render_template_files(
+                template_yaml, "nf-core", "testpipeline", files
+            ) as cached:
+                assert Path(cached, "docs", "README.md").is_file()
+        assert Path(cached, "docs", "README.md").is_file()
+        assert [path.name for path in cache_dir.iterdir()] == [cached.parent.name]
+        assert not cached.parent.name.startswith("tmp-")
+
+
+def test_prune_template_cache(tmp_path):
+    """Only the most recently used renderings, and recent renderings of running lint runs, are kept"""
+    for name, age in {"old": 10, "older": 20, "new": 0, "tmp-recent": 0, "tmp-abandoned": 100}.items():
+        Path(tmp_path, name).mkdir()
+        os.utime(Path(tmp_path, name), (time.time() - age, time.time() - age))
+    files_unchanged_module.prune_template_cache(tmp_path, max_renderings=2, max_tmp_age=50)
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["new", "old", "tmp-recent"]
@@ -1,8 +1,12 @@
 """Some tests covering the linting code."""
 
 import json
+import logging
+import time
 from pathlib import Path
+from unittest import mock
 
+import rich.progress
 import yaml
 
 import nf_core.pipelines.create.create
@@ -75,6 +79,80 @@ class TestPipelinesLint(TestLint):
         assert len(lint_obj.failed) == 0
         assert len(lint_obj.ignored) == len(lint_obj.lint_tests)
 
+    def test_lint_pipeline_parallel(self):
+        """Check that running lint tests in parallel gives the same results, in the same order"""
+        lint_obj = nf_core.pipelines.lint.PipelineLint(self.pipeline_dir)
+        lint_obj._load()
+        lint_obj._lint_pipeline()
+
+        parallel_lint_obj = nf_core.pipelines.lint.PipelineLint(self.pipeline_dir, jobs=4)
+        parallel_lint_obj._load()
+        parallel_lint_obj._lint_pipeline()
+
+        assert parallel_lint_obj.passed == lint_obj.passed
+        assert parallel_lint_obj.warned == lint_obj.warned
+        assert parallel_lint_obj.failed == lint_obj.failed
+        assert parallel_lint_obj.ignored == lint_obj.ignored
+
+    def test_lint_pipeline_parallel_logs(self):
+        """Check that the log messages of lint tests run in parallel are printed in the order of the tests"""
+        lint_obj = nf_core.pipelines.lint.PipelineLint(self.pipeline_dir, jobs=4)
+        lint_obj.progress_bar = rich.progress.Progress(disable=True)
+        test_names = ["files_exist", "merge_markers", "pipeline_todos", "readme"]
+
+        def run_lint_test(test_name):
+            # The first lint test finishes last
+            time.sleep(0.1 * (len(test_names) - test_names.index(test_name)))
+            logging.getLogger("nf_core.pipelines.lint").info(f"Running {test_name}")
+            return {"passed": [test_name]}
+
+        with (
+            mock.patch.object(lint_obj, "_run_lint_test", side_effect=run_lint_test),
+            self.assertLogs("nf_core.pipelines.lint", level="INFO") as logs,
+        ):
+            lint_progress = lint_obj.progress_bar.add_task("Running lint checks", test_name="")
+            results = lint_obj._run_lint_tests_parallel(test_names, lint_progress)
+        assert sorted(results) == sorted(test_names)
+        assert [record.getMessage() for record in logs.records] == [f"Running {name}" for name in test_names]
+
+    @with_temporary_folder
+    def test_lint_pipeline_cache(self, tmp_dir):
+        """Check that cached lint results are reused until one of their input files changes"""
+        with mock.patch("nf_core.pipelines.lint_cache.NFCORE_DIR", tmp_dir):
+            lint_obj = nf_core.pipelines.lint.PipelineLint(self.pipeline_dir, cache=True)
+            lint_obj._load()
+            lint_obj._lint_pipeline()
+            assert lint_obj.cached_tests == []
+
+            cached_lint_obj = nf_core.pipelines.lint.PipelineLint(self.pipeline_dir, cache=True)
+            cached_lint_obj._load()
+            cached_lint_obj._lint_pipeline()
+            assert "files_exist" in cached_lint_obj.cached_tests
+            # Only the tests that read their inputs through the file index are cached
+            assert sorted(cached_lint_obj.cached_tests) == sorted(
+                set(cached_lint_obj.indexed_lint_tests) & set(cached_lint_obj.lint_tests)
+            )
+            assert cached_lint_obj.passed == lint_obj.passed
+            assert cached_lint_obj.warned == lint_obj.warned
+            assert cached_lint_obj.failed == lint_obj.failed
+
+            # Adding a merge marker only invalidates the tests that read the changed file
+            with open(Path(self.pipeline_dir, "main.nf"), "a") as fh:
+                fh.write("\n>>>>>>>\n")
+            changed_lint_obj = nf_core.pipelines.lint.PipelineLint(self.pipeline_dir, cache=True)
+            changed_lint_obj._load()
+            changed_lint_obj._lint_pipeline()
+            assert "files_exist" in changed_lint_obj.cached_tests
+            assert "merge_markers" not in changed_lint_obj.cached_tests
+            assert len(changed_lint_obj.failed) > len(lint_obj.failed)
+
+            # The version of a release is read from the environment
+            with mock.patch.dict("os.environ", {"GITHUB_REF": "refs/tags/1.0.0"}):
+                release_lint_obj = nf_core.pipelines.lint.PipelineLint(self.pipeline_dir, cache=True)
+                release_lint_obj._load()
+                release_lint_obj._lint_pipeline()
+            assert release_lint_obj.cached_tests == []
+
     @with_temporary_folder
     def test_json_output(self, tmp_dir):
         """
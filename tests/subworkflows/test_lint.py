@@ -19,6 +19,18 @@ class TestSubworkflowsLint(TestSubworkflows):
         assert len(subworkflow_lint.passed) > 0
         assert len(subworkflow_lint.warned) >= 0
 
+    def test_subworkflows_lint_parallel(self):
+        """Test that linting subworkflows in parallel gives the same results in the same order"""
+        self.subworkflow_install.install("fastq_align_bowtie2")
+        subworkflow_lint = nf_core.subworkflows.SubworkflowLint(directory=self.pipeline_dir)
+        subworkflow_lint.lint(print_results=False, all_subworkflows=True)
+        parallel_subworkflow_lint = nf_core.subworkflows.SubworkflowLint(directory=self.pipeline_dir, jobs=4)
+        parallel_subworkflow_lint.lint(print_results=False, all_subworkflows=True)
+        for results_type in ["passed", "warned", "failed"]:
+            assert [
+                (r.component_name, r.lint_test, r.message) for r in getattr(parallel_subworkflow_lint, results_type)
+            ] == [(r.component_name, r.lint_test, r.message) for r in getattr(subworkflow_lint, results_type)]
+
     def test_subworkflows_lint_empty(self):
         """Test linting a pipeline with no subworkflows installed"""
         self.subworkflow_remove.remove("utils_nextflow_pipeline", force=True)
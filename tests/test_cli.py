@@ -297,6 +297,9 @@ class TestCli(unittest.TestCase):
             params["json"],
             "hide-progress" in params,
             False,  # plain_text
+            1,  # jobs
+            False,  # cache
+            False,  # show_cached
         )
 
     def test_lint_no_dir(self):
@@ -358,6 +361,19 @@ class TestCli(unittest.TestCase):
         assert error_txt in captured_logs.output[-1]
         assert captured_logs.records[-1].levelname == "ERROR"
 
+    @mock.patch("nf_core.utils.is_pipeline_directory")
+    @mock.patch("nf_core.utils.fetch_wf_config", return_value={"manifest.name": "nf-core/test"})
+    def test_pipelines_config(self, mock_fetch_wf_config, mock_is_pipeline):
+        """Test that the pipeline config is printed, unless only warming the cache"""
+        result = self.invoke_cli(["pipelines", "config"])
+        mock_fetch_wf_config.assert_called_once_with(Path("."))
+        assert result.exit_code == 0
+        assert "manifest.name = nf-core/test" in result.output
+
+        result = self.invoke_cli(["pipelines", "config", "--warm"])
+        assert result.exit_code == 0
+        assert "manifest.name" not in result.output
+
     @mock.patch("nf_core.pipelines.schema.PipelineSchema.get_schema_path")
     def test_schema_lint(self, mock_get_schema_path):
         """Test nf-core pipelines schema lint defaults to nextflow_schema.json"""
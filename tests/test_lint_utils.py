@@ -1,4 +1,9 @@
+import concurrent.futures
+import json
 import shutil
+import subprocess
+from pathlib import Path
+from unittest import mock
 
 import git
 import pytest
@@ -63,3 +68,58 @@ def test_run_prettier_on_syntax_error_file(syntax_error_json, caplog):
     nf_core.pipelines.lint_utils.run_prettier_on_file(syntax_error_json)
     expected_critical_log = "SyntaxError: Unexpected token (1:10)"
     assert expected_critical_log in caplog.text
+
+
+def test_deferred_prettier(malformed_json, formatted_json):
+    with mock.patch("nf_core.pipelines.lint_utils.subprocess.run", wraps=subprocess.run) as run:
+        with nf_core.pipelines.lint_utils.deferred_prettier():
+            nf_core.pipelines.lint_utils.run_prettier_on_file(malformed_json)
+            nf_core.pipelines.lint_utils.run_prettier_on_file(formatted_json)
+            assert malformed_json.read_text() == JSON_MALFORMED
+        assert [call.args[0][0] for call in run.call_args_list].count("pre-commit") == 1
+    assert malformed_json.read_text() == JSON_FORMATTED
+    assert formatted_json.read_text() == JSON_FORMATTED
+
+
+def test_deferred_prettier_threads(tmp_path):
+    """Files queued from several threads are all formatted at the end, and files are formatted right away outside"""
+    files = [tmp_path / f"file_{i}.json" for i in range(20)]
+    with (
+        mock.patch("nf_core.pipelines.lint_utils.check_git_repo", return_value=True),
+        mock.patch("nf_core.pipelines.lint_utils.subprocess.run") as run,
+    ):
+        with nf_core.pipelines.lint_utils.deferred_prettier():
+            with concurrent.futures.ThreadPoolExecutor(max_workers=4) as pool:
+                list(pool.map(nf_core.pipelines.lint_utils.run_prettier_on_file, files))
+            for file in files:
+                file.write_text(JSON_MALFORMED)
+            run.assert_not_called()
+        run.assert_called_once()
+        assert sorted(run.call_args.args[0][-len(files) :]) == sorted(str(file) for file in files)
+
+        run.reset_mock()
+        nf_core.pipelines.lint_utils.run_prettier_on_file(files[0])
+        run.assert_called_once()
+
+
+def test_format_json_like_prettier():
+    modules_json_path = Path(__file__).parent / "data" / "mock_pipeline_containers" / "modules.json"
+    modules_json = modules_json_path.read_text()
+    assert nf_core.pipelines.lint_utils.format_json_like_prettier(json.loads(modules_json)) == modules_json
+
+    content = {"empty": {}, "short": ["a", "b"], "long": ["x" * 60, "y" * 60], "nested": [[1, 2], [3, 4]], "none": None}
+    assert nf_core.pipelines.lint_utils.format_json_like_prettier(content) == (
+        "{\n"
+        '    "empty": {},\n'
+        '    "short": ["a", "b"],\n'
+        '    "long": [\n'
+        f'        "{"x" * 60}",\n'
+        f'        "{"y" * 60}"\n'
+        "    ],\n"
+        '    "nested": [\n'
+        "        [1, 2],\n"
+        "        [3, 4]\n"
+        "    ],\n"
+        '    "none": null\n'
+        "}\n"
+    )
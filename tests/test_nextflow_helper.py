@@ -0,0 +1,94 @@
+"""Tests for the resident Nextflow helper."""
+
+import json
+import threading
+from pathlib import Path
+
+import pytest
+
+import nf_core.nextflow_helper
+import nf_core.utils
+
+
+@pytest.fixture
+def fake_nextflow(tmp_path, monkeypatch):
+    """A `nextflow` executable that counts how often it was started"""
+    bin_dir = Path(tmp_path, "bin")
+    bin_dir.mkdir()
+    nextflow = Path(bin_dir, "nextflow")
+    nextflow.write_text(f'#!/bin/sh\necho run >> {tmp_path}/calls\necho "nextflow version 25.04.0"\n')
+    nextflow.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{bin_dir}:{Path('/usr/bin')}:{Path('/bin')}")
+    return Path(tmp_path, "calls")
+
+
+@pytest.fixture
+def helper(tmp_path, monkeypatch):
+    socket_path = Path(tmp_path, "helper.sock")
+    monkeypatch.setattr(nf_core.nextflow_helper, "SOCKET_PATH", socket_path)
+    helper = nf_core.nextflow_helper.NextflowHelper(socket_path)
+    thread = threading.Thread(target=helper.serve)
+    thread.start()
+    yield helper
+    nf_core.nextflow_helper.stop_helper(socket_path)
+    thread.join()
+
+
+def test_run_cmd_without_helper(fake_nextflow, tmp_path, monkeypatch):
+    monkeypatch.setattr(nf_core.nextflow_helper, "SOCKET_PATH", Path(tmp_path, "missing.sock"))
+    for _ in range(2):
+        stdout, _ = nf_core.utils.run_cmd("nextflow", "-v")
+        assert stdout == b"nextflow version 25.04.0\n"
+    assert len(fake_nextflow.read_text().splitlines()) == 2
+
+
+def test_run_cmd_with_helper(fake_nextflow, helper):
+    for _ in range(2):
+        stdout, _ = nf_core.utils.run_cmd("nextflow", "-v")
+        assert stdout == b"nextflow version 25.04.0\n"
+    assert len(fake_nextflow.read_text().splitlines()) == 1
+
+
+def test_helper_reruns_config_after_change(fake_nextflow, helper, tmp_path):
+    wf_path = Path(tmp_path, "pipeline")
+    wf_path.mkdir()
+    Path(wf_path, "nextflow.config").write_text("params.foo = 1\n")
+    nf_core.utils.run_cmd("nextflow", f"config -flat {wf_path}")
+    nf_core.utils.run_cmd("nextflow", f"config -flat {wf_path}")
+    assert len(fake_nextflow.read_text().splitlines()) == 1
+
+    Path(wf_path, "nextflow.config").write_text("params.foo = 22\n")
+    nf_core.utils.run_cmd("nextflow", f"config -flat {wf_path}")
+    assert len(fake_nextflow.read_text().splitlines()) == 2
+
+
+def test_helper_does_not_keep_failures(tmp_path, helper, monkeypatch):
+    bin_dir = Path(tmp_path, "bin")
+    bin_dir.mkdir()
+    nextflow = Path(bin_dir, "nextflow")
+    nextflow.write_text(f"#!/bin/sh\necho run >> {tmp_path}/calls\nexit 1\n")
+    nextflow.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{bin_dir}:{Path('/usr/bin')}:{Path('/bin')}")
+    for _ in range(2):
+        assert helper.run_query(["-v"], str(tmp_path), {})["returncode"] == 1
+    assert len(Path(tmp_path, "calls").read_text().splitlines()) == 2
+    assert not helper.results and not helper.query_locks
+
+
+def test_helper_results_are_limited(fake_nextflow, helper, tmp_path, monkeypatch):
+    monkeypatch.setattr(nf_core.nextflow_helper, "MAX_RESULTS", 2)
+    for cwd in ["a", "b", "a", "c"]:
+        Path(tmp_path, cwd).mkdir(exist_ok=True)
+        helper.run_query(["-v"], str(Path(tmp_path, cwd)), {})
+    assert len(fake_nextflow.read_text().splitlines()) == 3
+    # The least recently used output is removed first
+    assert [json.loads(key)[1] for key in helper.results] == [str(Path(tmp_path, "a")), str(Path(tmp_path, "c"))]
+    assert not helper.query_locks
+
+
+def test_stale_socket_is_replaced(tmp_path):
+    socket_path = Path(tmp_path, "helper.sock")
+    socket_path.touch()
+    helper = nf_core.nextflow_helper.NextflowHelper(socket_path)
+    helper.server_close()
+    assert socket_path.exists()
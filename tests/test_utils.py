@@ -26,6 +26,111 @@ def test_strip_ansi_codes():
     assert stripped == "ls examplefile.zip"
 
 
+def test_pipeline_files_walk_files(tmp_path):
+    """Test that the pipeline file index skips files ignored by .gitignore"""
+    Path(tmp_path, ".gitignore").write_text("results/\n*.log\n")
+    Path(tmp_path, "results").mkdir()
+    Path(tmp_path, "results", "output.txt").touch()
+    Path(tmp_path, "run.log").touch()
+    Path(tmp_path, "main.nf").touch()
+    files = nf_core.utils.PipelineFiles(tmp_path).walk_files()
+    assert sorted(files) == [Path(tmp_path, ".gitignore"), Path(tmp_path, "main.nf")]
+
+
+def test_pipeline_files_read_once(tmp_path):
+    """Test that the pipeline file index reads each file only once until invalidated"""
+    tmp_fn = Path(tmp_path, "testfile")
+    tmp_fn.write_bytes(b"line one\r\nline two\n")
+    file_index = nf_core.utils.PipelineFiles(tmp_path)
+    assert file_index.read_lines("testfile") == ["line one\n", "line two\n"]
+    assert file_index.size("testfile") == 19
+
+    tmp_fn.write_text("changed\n")
+    assert file_index.read_text("testfile") == "line one\nline two\n"
+    file_index.invalidate("testfile")
+    assert file_index.read_text("testfile") == "changed\n"
+
+
+def test_wf_config_files(tmp_path):
+    """Test that config files included from nextflow.config are part of the config cache key"""
+    Path(tmp_path, "conf").mkdir()
+    Path(tmp_path, "nextflow.config").write_text(
+        "includeConfig 'conf/base.config'\nincludeConfig \"${projectDir}/extra.config\"\n"
+        "includeConfig params.custom_config_base ? \"${params.custom_config_base}/nfcore_custom.config\" : '/dev/null'\n"
+    )
+    Path(tmp_path, "conf", "base.config").write_text("process.cpus = 1\n")
+    Path(tmp_path, "extra.config").write_text("includeConfig 'more.config'\n")
+    Path(tmp_path, "more.config").write_text("params.foo = 1\n")
+    assert nf_core.utils.wf_config_files(tmp_path) == [
+        Path(tmp_path, "nextflow.config"),
+        Path(tmp_path, "conf", "base.config"),
+        Path(tmp_path, "extra.config"),
+        Path(tmp_path, "more.config"),
+    ]
+
+
+@mock.patch("nf_core.utils.run_cmd")
+def test_fetch_wf_config_included_config_changed(mock_run_cmd, tmp_path, monkeypatch):
+    """Test that changing an included config file invalidates the config cache"""
+    monkeypatch.setenv("NXF_HOME", str(tmp_path / "nxf_home"))
+    Path(tmp_path, "nxf_home").mkdir()
+    wf_path = Path(tmp_path, "pipeline")
+    Path(wf_path, "conf").mkdir(parents=True)
+    Path(wf_path, "nextflow.config").write_text("includeConfig 'conf/base.config'\n")
+    Path(wf_path, "conf", "base.config").write_text("params.foo = 1\n")
+    mock_run_cmd.return_value = (b"params.foo = 1", b"")
+    assert nf_core.utils.fetch_wf_config(wf_path) == {"params.foo": "1"}
+    assert nf_core.utils.fetch_wf_config(wf_path) == {"params.foo": "1"}
+    assert mock_run_cmd.call_count == 1
+
+    Path(wf_path, "conf", "base.config").write_text("params.foo = 2\n")
+    mock_run_cmd.return_value = (b"params.foo = 2", b"")
+    assert nf_core.utils.fetch_wf_config(wf_path) == {"params.foo": "2"}
+    assert mock_run_cmd.call_count == 2
+
+
+def test_prune_wf_config_cache(tmp_path):
+    """Test that the least recently used config cache files are removed first"""
+    for i in range(5):
+        cache_fn = Path(tmp_path, f"wf-config-cache-{i}.json")
+        cache_fn.write_text("{}")
+        os.utime(cache_fn, (i, i))
+    nf_core.utils.prune_wf_config_cache(tmp_path, max_files=2)
+    assert sorted(fn.name for fn in tmp_path.iterdir()) == ["wf-config-cache-3.json", "wf-config-cache-4.json"]
+
+
+def test_atomic_write(tmp_path):
+    """Test that files are replaced as a whole, and that no temporary files are left behind"""
+    nf_core.utils.atomic_write(tmp_path / "file.json", "{}")
+    nf_core.utils.atomic_write(tmp_path / "file.json", b"[]", mode=0o755)
+    assert (tmp_path / "file.json").read_text() == "[]"
+    assert (tmp_path / "file.json").stat().st_mode & 0o777 == 0o755
+    with mock.patch("os.replace", side_effect=OSError), pytest.raises(OSError):
+        nf_core.utils.atomic_write(tmp_path / "file.json", "{}")
+    assert [fn.name for fn in tmp_path.iterdir()] == ["file.json"]
+    assert (tmp_path / "file.json").read_text() == "[]"
+
+
+def test_copy_file_data(tmp_path):
+    """Test that files are copied with each of the ways to copy them in the kernel, and without"""
+    data = os.urandom(300000)
+    (tmp_path / "image.img").write_bytes(data)
+
+    def copy(name):
+        with open(tmp_path / "image.img", "rb") as src, open(tmp_path / name, "wb") as dest:
+            nf_core.utils.copy_file_data(src, dest)
+        assert (tmp_path / name).read_bytes() == data
+
+    copy("default.img")
+    # Fall back to the other ways of copying when the file system doesn't support one
+    with mock.patch("fcntl.ioctl", side_effect=OSError):
+        copy("copy_file_range.img")
+        with mock.patch("os.copy_file_range", side_effect=OSError, create=True):
+            copy("sendfile.img")
+            with mock.patch("os.sendfile", side_effect=OSError, create=True):
+                copy("chunks.img")
+
+
 class TestUtils(TestPipelines):
     """Class for utils tests"""
 